@@ -1,6 +1,8 @@
 from fastapi import APIRouter
-from app.api.routes import search
+from app.api.routes import search, ingestion, sources
 
 api_router = APIRouter()
 api_router.include_router(search.router)
+api_router.include_router(ingestion.router)
+api_router.include_router(sources.router)
 
@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from app.core.config import settings
+from app.core.database import get_database
+from app.services.ingestion.scheduler import get_ingestion_scheduler
+from app.services.ingestion.domain_scheduler import domain_scheduler
+
+router = APIRouter(prefix="/ingestion", tags=["ingestion"])
+
+
+@router.get("/status")
+async def ingestion_status():
+    """Background ingestion lag, throughput and per-feed watermarks"""
+    if not settings.INGESTION_SCHEDULER_ENABLED:
+        return {"enabled": False}
+    
+    db = get_database()
+    watermarks = await db.ingestion_watermarks.find().to_list(length=1000)
+    
+    return {
+        "enabled": True,
+        **get_ingestion_scheduler().get_metrics(),
+        "watermarks": watermarks
+    }
+
+
+@router.get("/domains")
+async def domain_stats():
+    """Per-domain scraper success rate, latency and circuit-breaker state"""
+    return domain_scheduler.get_stats()
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from typing import List
 from app.core.database import get_database
 from app.schemas.article import SearchRequest, ArticleResponse, ClusterResponse, AnalyzeRequest
+from app.models.article import ARTICLE_RESPONSE_PROJECTION
 from app.services.agents.orchestrator import AgentOrchestrator
+from app.services.search.text_search import search_articles as text_search
 from bson import ObjectId
 from bson.errors import InvalidId
 
@@ -10,21 +12,26 @@ router = APIRouter(prefix="/search", tags=["search"])
 
 
 @router.post("", response_model=List[ArticleResponse])
-async def search_articles(request: SearchRequest):
-    """Search for articles by query"""
-    db = get_database()
-    
-    # Simple text search in MongoDB
-    query_pattern = {"$regex": request.query, "$options": "i"}
+async def search_articles(request: SearchRequest, response: Response):
+    """Search for articles by query, most relevant first
     
-    cursor = db.articles.find({
-        "$or": [
-            {"title": query_pattern},
-            {"text": query_pattern}
-        ]
-    }).limit(request.limit)
+    Uses the articles text index. When more results exist, the X-Next-Cursor
+    response header holds the ``cursor`` to send for the next page.
+    """
+    try:
+        articles, next_cursor = await text_search(
+            query=request.query,
+            date_from=request.date_from,
+            date_to=request.date_to,
+            sources=request.sources,
+            limit=request.limit,
+            cursor=request.cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    articles = await cursor.to_list(length=request.limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     # Convert ObjectId to string for response
     for article in articles:
@@ -43,7 +50,10 @@ async def analyze_query(request: AnalyzeRequest):
             query=request.query,
             date_from=request.date_from,
             date_to=request.date_to,
-            sources=request.sources
+            sources=request.sources,
+            refresh_llm=request.refresh_llm_cache,
+            llm_token_budget=request.llm_token_budget,
+            llm_deadline=request.llm_deadline
         )
         return result
     except Exception as e:
@@ -64,7 +74,10 @@ async def get_cluster(cluster_id: str):
         raise HTTPException(status_code=404, detail="Cluster not found")
     
     # Get articles for this cluster
-    articles = await db.articles.find({"cluster_id": cluster_id}).to_list(length=100)
+    articles = await db.articles.find(
+        {"cluster_id": cluster_id},
+        ARTICLE_RESPONSE_PROJECTION
+    ).to_list(length=100)
     for article in articles:
         article["id"] = str(article["_id"])
     
@@ -80,7 +93,7 @@ async def get_article(article_id: str):
     db = get_database()
     
     try:
-        article = await db.articles.find_one({"_id": ObjectId(article_id)})
+        article = await db.articles.find_one({"_id": ObjectId(article_id)}, ARTICLE_RESPONSE_PROJECTION)
     except InvalidId:
         raise HTTPException(status_code=404, detail="Invalid article ID")
     
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Query
+from typing import Optional
+from datetime import datetime, timedelta
+from app.services.bias.source_aggregates import SourceAggregates, window_start
+
+router = APIRouter(prefix="/sources", tags=["sources"])
+
+
+@router.get("/bias")
+async def source_bias(
+    window: str = Query("all", pattern="^(daily|weekly|all)$"),
+    days: Optional[int] = Query(None, ge=1, description="Only buckets from the last N days")
+):
+    """Per-source mean and variance of tone, bias index and transparency"""
+    since = None
+    if days is not None:
+        since = window_start(window, datetime.utcnow() - timedelta(days=days))
+    
+    return await SourceAggregates().get_aggregates(window=window, since=since)
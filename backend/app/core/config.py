@@ -25,9 +25,35 @@ class Settings(BaseSettings):
     # Groq API
     GROQ_API_KEY: str = ""
     GROQ_API_URL: str = "https://api.groq.com/openai/v1"
+    GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    GROQ_CONCURRENCY: int = 4
+    GROQ_REQUESTS_PER_MINUTE: int = 30
+    GROQ_TOKENS_PER_MINUTE: int = 6000
+    GROQ_MAX_RETRIES: int = 3
+    GROQ_TIMEOUT: float = 30.0
+    
+    # LLM provider (any OpenAI-compatible chat completions API; empty = the Groq settings above)
+    LLM_BASE_URL: str = ""
+    LLM_MODEL: str = ""
+    LLM_API_KEY: str = ""
+    LLM_FAKE_SERVER: bool = False  # route LLM calls to the in-process fake server (offline runs, benchmarks)
+    LLM_QUERY_TOKEN_BUDGET: int = 0  # LLM tokens one analysis may spend (0 = unlimited)
+    LLM_QUERY_DEADLINE: float = 0.0  # seconds from the start of an analysis after which LLM work is skipped (0 = none)
+    LLM_SUMMARY_RESERVE_TOKENS: int = 800  # held back from verification so the fact summaries still fit
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_BACKEND: str = "disk"  # "disk" (SQLite file) or "redis" (REDIS_URL)
+    LLM_CACHE_PATH: str = "data/llm_cache.sqlite3"
+    LLM_CACHE_TTL: int = 7 * 24 * 3600  # seconds
+    LLM_CACHE_MAX_ENTRIES: int = 10000
     
     # NewsAPI
     NEWSAPI_KEY: str = ""
+    NEWSAPI_REQUESTS_PER_SECOND: float = 1.0
+    NEWSAPI_BURST: int = 5
+    NEWSAPI_PAGE_CONCURRENCY: int = 3
+    NEWSAPI_MAX_RETRIES: int = 3
     
     # Security (Optional - for future JWT authentication)
     # These are used if you add user authentication later
@@ -80,11 +106,82 @@ class Settings(BaseSettings):
     CLUSTERING_MIN_SAMPLES: int = 2
     CLUSTERING_EPS: float = 0.5
     
+    # NLP (spaCy)
+    SPACY_MODEL: str = "en_core_web_sm"
+    # Only NER, POS and sentence boundaries are used; sentences come from the senter
+    SPACY_EXCLUDE: List[str] = ["lemmatizer", "parser"]
+    SPACY_BATCH_SIZE: int = 32
+    SPACY_N_PROCESS: int = 1
+    NLP_DOC_CACHE_SIZE: int = 512  # parsed articles kept in memory for reuse across analyzers
+    
+    # Fact extraction
+    FACT_CANDIDATE_LIMIT: int = 2000
+    FACT_CANDIDATES_PER_ARTICLE: int = 40  # quota per article, filled by its most entity-dense sentences
+    FACT_SCAN_SENTENCES: int = 200  # sentences read per article when looking for candidates
+    FACT_SCAN_CHARS: int = 20000  # text parsed per article when the extractor parses for itself
+    FACT_GROUPING_MODE: str = "keyword"  # "keyword" or "embedding"
+    FACT_GROUP_SIMILARITY: float = 0.75
+    FACT_GROUP_MIN_JACCARD: float = 0.5  # keyword overlap with a group's seed fact needed to join it
+    FACT_VERIFY_MAX_GROUPS: int = 20  # largest groups go to the LLM first
+    FACT_VERIFY_TIMEOUT: float = 120.0  # overall deadline for a cluster's verification calls
+    FACT_VERIFY_MODE: str = "batched"  # "batched" (several facts per JSON prompt) or "single"
+    FACT_VERIFY_BATCH_SIZE: int = 10
+    FACT_VERIFY_BATCH_TOKENS: int = 3000  # prompt budget per batched call
+    FACT_LEXICAL_MATCH_THRESHOLD: float = 0.9  # token Jaccard for a near-verbatim cross-source match
+    FACT_NLI_ENABLED: bool = True
+    FACT_NLI_MODEL: str = "cross-encoder/nli-deberta-v3-xsmall"
+    FACT_NLI_THRESHOLD: float = 0.9
+    FACT_NLI_BATCH_SIZE: int = 32
+    FACT_STORE_ENABLED: bool = True  # reuse verdicts of facts verified in earlier queries
+    FACT_STORE_MATCH_THRESHOLD: float = 0.7  # MinHash similarity for a candidate to match a stored fact
+    
+    # Bias Analysis
+    SENTIMENT_BATCH_SIZE: int = 32
+    BIAS_LEXICON_PATH: str = ""  # Optional JSON {category: [terms]} merged into the built-in lexicon
+    OMISSION_DETECTION_MODE: str = "keyword"  # "keyword" or "semantic" (fact x chunk embedding similarity)
+    OMISSION_SIMILARITY_THRESHOLD: float = 0.6
+    
     # Bias Analysis Weights
     BIAS_WEIGHT_TONE: float = 0.4
     BIAS_WEIGHT_LEXICAL: float = 0.25
     BIAS_WEIGHT_OMISSION: float = 0.2
     BIAS_WEIGHT_CONSISTENCY: float = 0.15
+    
+    # Bias recompute job (after changing weights)
+    BIAS_RECOMPUTE_BATCH_SIZE: int = 1000
+    BIAS_RECOMPUTE_MAX_RATE: float = 0.0  # articles/sec, 0 = unthrottled
+    
+    # Ingestion
+    INGESTION_MAX_ARTICLES: int = 200  # article budget per query, paged from NewsAPI
+    
+    # Background ingestion
+    INGESTION_SCHEDULER_ENABLED: bool = False
+    INGESTION_POLL_INTERVAL: int = 300  # seconds between polling cycles
+    INGESTION_HEADLINE_COUNTRIES: List[str] = ["us"]
+    INGESTION_HEADLINE_CATEGORIES: List[str] = []
+    INGESTION_RSS_FEEDS: List[str] = []
+    
+    # Near-duplicate detection (MinHash + LSH)
+    DEDUP_ENABLED: bool = True
+    DEDUP_NUM_PERM: int = 128
+    DEDUP_LSH_BANDS: int = 16  # 8 rows per band: candidates from ~0.7 Jaccard upwards
+    DEDUP_THRESHOLD: float = 0.8
+    DEDUP_MIN_WORDS: int = 50
+    
+    # Scraping
+    SCRAPE_TIMEOUT: float = 10.0  # until a domain has enough latency samples
+    SCRAPE_CONCURRENCY: int = 8
+    SCRAPE_MAX_RETRIES: int = 2
+    SCRAPE_CRAWL_DELAY: float = 1.0  # seconds between requests to the same domain
+    SCRAPE_MIN_TIMEOUT: float = 3.0
+    SCRAPE_MAX_TIMEOUT: float = 30.0
+    SCRAPE_TIMEOUT_MULTIPLIER: float = 3.0  # adaptive timeout = p95 latency * multiplier
+    SCRAPE_CIRCUIT_FAILURES: int = 5  # consecutive failures before a domain is skipped
+    SCRAPE_CIRCUIT_COOLDOWN: int = 600  # seconds
+    SCRAPE_CACHE_ENABLED: bool = True
+    HTML_BLOB_BACKEND: str = "mongo"  # "mongo" or "local"
+    HTML_BLOB_DIR: str = "data/html"
+    HTML_COMPRESSION: str = "zstd"  # falls back to gzip if zstandard is not installed
 
 
 settings = Settings()
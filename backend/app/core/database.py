@@ -1,6 +1,7 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
 from app.core.config import settings
+from app.models.article import COLLECTION_INDEXES
 from typing import Optional
 
 
@@ -27,6 +28,21 @@ async def close_mongo_connection():
         mongodb.sync_client.close()
 
 
+async def ensure_indexes():
+    """Create the indexes declared in app.models
+    
+    Each index is created on its own, so one that cannot be built (e.g. a
+    unique index over existing duplicates) does not hold back the rest.
+    """
+    db = get_database()
+    for collection, indexes in COLLECTION_INDEXES.items():
+        for index in indexes:
+            try:
+                await db[collection].create_indexes([index])
+            except Exception as e:
+                print(f"Warning: could not create index {index.document['name']} on {collection}: {e}")
+
+
 def get_database():
     """Get MongoDB database instance"""
     if mongodb.client is None:
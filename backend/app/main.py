@@ -3,15 +3,25 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.api.routes import api_router
-from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.database import connect_to_mongo, close_mongo_connection, ensure_indexes
+from app.services.ingestion.scheduler import get_ingestion_scheduler
+from app.services.llm.client import close_llm_client
+from app.services.bias.source_aggregates import bootstrap_source_aggregates
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    await ensure_indexes()
+    await bootstrap_source_aggregates()
+    if settings.INGESTION_SCHEDULER_ENABLED:
+        get_ingestion_scheduler().start()
     yield
     # Shutdown
+    if settings.INGESTION_SCHEDULER_ENABLED:
+        await get_ingestion_scheduler().stop()
+    await close_llm_client()
     await close_mongo_connection()
 
 
@@ -31,6 +41,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
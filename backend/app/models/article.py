@@ -4,7 +4,7 @@ from pydantic import BaseModel, Field, GetJsonSchemaHandler
 from pydantic.json_schema import JsonSchemaValue
 from pydantic_core import core_schema
 from bson import ObjectId
-from pymongo import IndexModel
+from pymongo import IndexModel, TEXT
 
 
 class PyObjectId(ObjectId):
@@ -55,7 +55,7 @@ class Article(BaseModel):
     author: Optional[str] = None
     published_at: datetime
     text: str
-    raw_html: Optional[str] = None
+    raw_html_ref: Optional[str] = None  # compressed HTML lives in the blob store
     language: str = "en"
     country: Optional[str] = None
     scraped_at: datetime = Field(default_factory=datetime.utcnow)
@@ -70,9 +70,14 @@ class Article(BaseModel):
     omission_score: Optional[float] = None
     consistency_score: Optional[float] = None
     bias_index: Optional[float] = None
+    transparency_score: Optional[float] = None
     
     # Clustering
     cluster_id: Optional[str] = None
+    cluster_mean_tone: Optional[float] = None  # reference tone the bias index was scored against
+    
+    # Near-duplicate (syndicated copy) of another article
+    duplicate_of: Optional[str] = None
     
     model_config = {
         "populate_by_name": True,
@@ -110,9 +115,11 @@ class Cluster(BaseModel):
 class ArticleAnalysis(BaseModel):
     """ArticleAnalysis model for MongoDB"""
     id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
-    article_id: str
-    analysis_type: str  # 'sentiment', 'lexical', 'omission', etc.
+    content_hash: str  # Results are keyed by article text, not article id
+    analysis_type: str  # 'tone', 'lexical', 'spacy_doc', etc.
+    version: str  # Models/lexicon behind the result; a new version is recomputed lazily
     result: Dict[str, Any]
+    article_id: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     model_config = {
@@ -127,6 +134,13 @@ ARTICLE_INDEXES = [
     IndexModel([("published_at", -1)]),
     IndexModel([("cluster_id", 1)]),
     IndexModel([("url", 1)], unique=True),
+    IndexModel([("duplicate_of", 1)], sparse=True),
+    # POST /search: relevance-ranked full-text search, titles weighted above body text
+    IndexModel(
+        [("title", TEXT), ("text", TEXT)],
+        weights={"title": 5, "text": 1},
+        name="article_text_search"
+    ),
 ]
 
 CLUSTER_INDEXES = [
@@ -137,4 +151,35 @@ CLUSTER_INDEXES = [
 ANALYSIS_INDEXES = [
     IndexModel([("article_id", 1)]),
     IndexModel([("analysis_type", 1)]),
+    IndexModel([("content_hash", 1), ("analysis_type", 1), ("version", 1)], unique=True),
+]
+
+ARTICLE_SIGNATURE_INDEXES = [
+    IndexModel([("bands", 1)]),
 ]
+
+SCRAPE_CACHE_INDEXES = [
+    IndexModel([("validated_at", -1)]),
+]
+
+FACT_INDEXES = [
+    IndexModel([("bands", 1)]),
+    IndexModel([("sources", 1)]),
+]
+
+SOURCE_AGGREGATE_INDEXES = [
+    IndexModel([("window", 1), ("source", 1), ("bucket_start", 1)]),
+]
+
+COLLECTION_INDEXES = {
+    "articles": ARTICLE_INDEXES,
+    "clusters": CLUSTER_INDEXES,
+    "article_analysis": ANALYSIS_INDEXES,
+    "article_signatures": ARTICLE_SIGNATURE_INDEXES,
+    "scrape_cache": SCRAPE_CACHE_INDEXES,
+    "source_bias_aggregates": SOURCE_AGGREGATE_INDEXES,
+    "facts": FACT_INDEXES,
+}
+
+# Article fields that API responses never need; raw_html only exists on legacy documents
+ARTICLE_RESPONSE_PROJECTION = {"raw_html": 0}
@@ -43,7 +43,9 @@ class ArticleResponse(ArticleBase):
     omission_score: Optional[float] = None
     consistency_score: Optional[float] = None
     bias_index: Optional[float] = None
+    transparency_score: Optional[float] = None
     cluster_id: Optional[str] = None  # Changed from Optional[UUID]
+    duplicate_of: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -58,6 +60,8 @@ class Fact(BaseModel):
     sources: List[str]  # URLs
     quotes: List[str]
     status: str  # "supported", "contradicted", "unverified"
+    contradicting_sources: Optional[List[str]] = None  # URLs of sources that contradict the fact
+    verification_tier: Optional[str] = None  # "lexical", "nli", "llm", or "store" (reused from an earlier query)
 
 
 class FrameSummary(BaseModel):
@@ -76,6 +80,7 @@ class ClusterResponse(BaseModel):
     fact_summary: Optional[str] = None
     frame_summary: Optional[List[FrameSummary]] = None
     facts: Optional[List[Fact]] = None
+    coverage: Optional[Dict[str, Any]] = None  # fact x source heatmap: facts, sources, states (1/0/-1)
     articles: List[ArticleResponse]
     
     class Config:
@@ -88,10 +93,14 @@ class SearchRequest(BaseModel):
     date_to: Optional[datetime] = None
     sources: Optional[List[str]] = None
     limit: int = 50
+    cursor: Optional[str] = None  # X-Next-Cursor header of the previous page
 
 
 class AnalyzeRequest(BaseModel):
     query: str
     date_from: Optional[datetime] = None
     date_to: Optional[datetime] = None
-    sources: Optional[List[str]] = None
\ No newline at end of file
+    sources: Optional[List[str]] = None
+    refresh_llm_cache: bool = False  # ignore cached LLM responses for this request
+    llm_token_budget: Optional[int] = None  # LLM tokens this analysis may spend (default LLM_QUERY_TOKEN_BUDGET)
+    llm_deadline: Optional[float] = None  # seconds before LLM work is skipped (default LLM_QUERY_DEADLINE)
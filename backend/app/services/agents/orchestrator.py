@@ -1,6 +1,7 @@
 from typing import List, Dict, Optional
 from datetime import datetime
-import httpx
+import asyncio
+import numpy as np
 from app.services.ingestion.ingestion_service import IngestionService
 from app.services.clustering.clustering_service import ClusteringService
 from app.services.bias.bias_analyzer import BiasAnalyzer
@@ -8,6 +9,16 @@ from app.services.bias.omission_detector import OmissionDetector
 from app.services.facts.fact_extractor import FactExtractor
 from app.services.embeddings.embedding_service import EmbeddingService
 from app.services.embeddings.vector_store import VectorStore
+from app.services.embeddings.article_indexer import ArticleIndexer
+from app.services.ingestion.dedup import duplicate_group_key
+from app.services.nlp.nlp_service import get_nlp_service
+from app.services.nlp.analysis_cache import AnalysisCache
+from app.services.bias.source_aggregates import SourceAggregates, AGGREGATE_PROJECTION
+from app.services.facts.coverage import FactCoverageMatrix
+from app.services.facts.verification import verification_report
+from app.services.llm.client import LLMError, get_llm_client, estimate_tokens
+from app.services.llm.budget import QueryBudget, current_budget
+from app.services.llm.cache import refresh_llm_cache
 from app.core.config import settings
 from app.models.article import Article, Cluster
 from app.core.database import get_database
@@ -16,26 +27,41 @@ from bson import ObjectId
 
 class AgentOrchestrator:
     def __init__(self):
-        self.groq_api_key = settings.GROQ_API_KEY
-        self.groq_api_url = settings.GROQ_API_URL
+        self.llm = get_llm_client()
         
         self.ingestion_service = IngestionService()
         self.clustering_service = ClusteringService()
-        self.bias_analyzer = BiasAnalyzer()
+        self.nlp_service = get_nlp_service()
+        self.bias_analyzer = BiasAnalyzer(self.nlp_service)
         self.omission_detector = OmissionDetector()
-        self.fact_extractor = FactExtractor()
         self.embedding_service = EmbeddingService()
+        self.fact_extractor = FactExtractor(self.nlp_service, self.embedding_service)
         self.vector_store = VectorStore()
+        self.article_indexer = ArticleIndexer(self.embedding_service, self.vector_store)
+        self.source_aggregates = SourceAggregates()
     
     async def analyze_query(
         self,
         query: str,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
-        sources: Optional[List[str]] = None
+        sources: Optional[List[str]] = None,
+        refresh_llm: bool = False,
+        llm_token_budget: Optional[int] = None,
+        llm_deadline: Optional[float] = None
     ) -> Dict:
-        """Main orchestration method for analyzing a query"""
+        """Main orchestration method for analyzing a query
+        
+        refresh_llm skips cached LLM responses for this query (fresh ones are still cached).
+        llm_token_budget and llm_deadline override LLM_QUERY_TOKEN_BUDGET and
+        LLM_QUERY_DEADLINE; past them, fact groups go unverified and summaries
+        are skipped, as listed under llm_usage.degraded.
+        """
         db = get_database()
+        analysis_cache = AnalysisCache()
+        refresh_llm_cache.set(refresh_llm)
+        budget = QueryBudget(max_tokens=llm_token_budget, deadline=llm_deadline)
+        current_budget.set(budget)
         
         try:
             # Step 1: Ingest articles
@@ -45,7 +71,7 @@ class AgentOrchestrator:
                 date_from=date_from,
                 date_to=date_to,
                 sources=sources,
-                limit=50
+                limit=settings.INGESTION_MAX_ARTICLES
             )
             
             if not articles:
@@ -53,27 +79,54 @@ class AgentOrchestrator:
             
             # Step 2: Embed and store in vector DB
             print("Embedding articles...")
-            article_ids = [str(a.get("id") or a.get("_id")) for a in articles]
-            await self._embed_and_store_articles(articles)
+            await self.article_indexer.index_articles(articles)
+            
+            # Near-duplicates are clustered and analyzed through their canonical copy
+            group_ids = list(dict.fromkeys(duplicate_group_key(a) for a in articles))
+            dedup_stats = {
+                "articles": len(articles),
+                "unique": len(group_ids),
+                "duplicates": len(articles) - len(group_ids),
+                "dedup_rate": (len(articles) - len(group_ids)) / len(articles)
+            }
+            
+            # Bulk NLP: parse one copy per duplicate group in a single nlp.pipe run
+            # (restoring persisted parses first); per-cluster analysis then reads
+            # the shared parse cache
+            print("Parsing articles...")
+            group_texts = {}
+            for article in articles:
+                group_texts.setdefault(duplicate_group_key(article), article.get("text", ""))
+            nlp_before = dict(self.nlp_service.stats)
+            await self.nlp_service.parse_many_cached(list(group_texts.values()), analysis_cache)
+            nlp_docs = self.nlp_service.stats["docs_parsed"] - nlp_before["docs_parsed"]
+            nlp_seconds = self.nlp_service.stats["parse_seconds"] - nlp_before["parse_seconds"]
+            nlp_stats = {
+                "docs_parsed": nlp_docs,
+                "parse_seconds": nlp_seconds,
+                "docs_per_second": nlp_docs / nlp_seconds if nlp_seconds else None
+            }
             
             # Step 3: Cluster articles
             print("Clustering articles...")
             clusters = self.clustering_service.cluster_articles(
                 query=query,
-                article_ids=article_ids
+                article_ids=group_ids
             )
             
             # Step 4: Process each cluster
             cluster_results = []
             
-            for cluster_id, cluster_article_ids in clusters.items():
+            for cluster_id, cluster_group_ids in clusters.items():
                 cluster_articles = [
-                    a for a in articles if str(a.get("id") or a.get("_id")) in cluster_article_ids
+                    a for a in articles if duplicate_group_key(a) in cluster_group_ids
                 ]
                 
                 if len(cluster_articles) < 2:
                     continue
                 
+                cluster_article_ids = [str(a.get("id") or a.get("_id")) for a in cluster_articles]
+                
                 # Create cluster record
                 cluster_data = {
                     "query": query,
@@ -97,31 +150,70 @@ class AgentOrchestrator:
                     for a in cluster_articles
                 ]
                 
-                facts = await self.fact_extractor.extract_facts_from_articles(articles_data)
+                # One copy per duplicate group goes through extraction; copies still count as sources
+                representatives = {}
+                for article, article_data in zip(cluster_articles, articles_data):
+                    representatives.setdefault(duplicate_group_key(article), article_data)
+                
+                # Parse each representative once; facts and bias analysis share the parses
+                representative_texts = [a["text"] for a in representatives.values()]
+                documents = self.nlp_service.parse_many(representative_texts)
+                
+                facts = await self.fact_extractor.extract_facts_from_articles(
+                    list(representatives.values()),
+                    documents
+                )
+                self._add_duplicate_sources(facts, cluster_articles, representatives)
                 
                 # Step 6: Analyze bias for each article
                 print(f"Analyzing bias for cluster {cluster_id}...")
                 bias_results = []
                 tone_scores = []
+                scored = []
                 
-                for article in cluster_articles:
-                    article_id = str(article.get("id") or article.get("_id"))
-                    article_text = article.get("text", "")
-                    
-                    bias_analysis = self.bias_analyzer.analyze_article(article_text)
-                    
-                    # Detect omissions
-                    omission_result = self.omission_detector.detect_omissions(
-                        cluster_facts=facts,
-                        article_text=article_text,
-                        article_id=article_id
+                # One analysis per duplicate group, with sentiment batched across the cluster
+                # and results reused from earlier queries where the text is unchanged
+                group_analyses = dict(zip(
+                    representatives.keys(),
+                    await self.bias_analyzer.analyze_articles_cached(documents, analysis_cache)
+                ))
+                
+                # Detect omissions for the whole cluster in one pass
+                fact_embeddings = None
+                chunk_embeddings = None
+                if settings.OMISSION_DETECTION_MODE == "semantic" and facts:
+                    fact_embeddings = np.array(
+                        await asyncio.to_thread(
+                            self.embedding_service.embed_batch,
+                            [f.get("fact", "") for f in facts]
+                        ),
+                        dtype=np.float32
                     )
+                    stored = await self.article_indexer.load_chunk_embeddings(cluster_articles)
+                    chunk_embeddings = [stored.get(a["id"]) for a in articles_data]
+                
+                presence = self.omission_detector.cluster_presence(
+                    cluster_facts=facts,
+                    articles=articles_data,
+                    fact_embeddings=fact_embeddings,
+                    chunk_embeddings=chunk_embeddings
+                )
+                
+                # One fact x article coverage matrix gives omission and consistency for every article
+                coverage = FactCoverageMatrix.from_presence(facts, articles_data, presence)
+                omission_scores = coverage.omission_scores()
+                consistency_scores = coverage.consistency_scores()
+                
+                for j, article in enumerate(cluster_articles):
+                    article_id = str(article.get("id") or article.get("_id"))
+                    bias_analysis = group_analyses[duplicate_group_key(article)]
+                    omission_result = {"omission_score": float(omission_scores[j])}
                     
                     tone_score = bias_analysis["tone_score"]
                     tone_scores.append(tone_score)
                     
-                    # Compute consistency
-                    consistency_score = 0.1
+                    # Compute consistency (disagreement with the majority of sources)
+                    consistency_score = float(consistency_scores[j])
                     
                     # Compute cluster mean tone
                     cluster_mean_tone = sum(tone_scores) / len(tone_scores) if tone_scores else 0
@@ -142,8 +234,8 @@ class AgentOrchestrator:
                         lexical_bias=bias_analysis["lexical_bias_score"]
                     )
                     
-                    # Update article with bias scores
-                    await db.articles.update_one(
+                    # Update article with bias scores, keeping the previous ones for the aggregates
+                    previous = await db.articles.find_one_and_update(
                         {"_id": ObjectId(article_id)},
                         {
                             "$set": {
@@ -152,10 +244,19 @@ class AgentOrchestrator:
                                 "omission_score": omission_result["omission_score"],
                                 "consistency_score": consistency_score,
                                 "bias_index": bias_index,
-                                "cluster_id": cluster_id
+                                "transparency_score": transparency,
+                                "cluster_id": cluster_id,
+                                "cluster_mean_tone": cluster_mean_tone
                             }
-                        }
+                        },
+                        projection=AGGREGATE_PROJECTION
                     )
+                    if previous:
+                        scored.append((previous, {
+                            "tone_score": tone_score,
+                            "bias_index": bias_index,
+                            "transparency_score": transparency
+                        }))
                     
                     bias_results.append({
                         "article_id": article_id,
@@ -168,6 +269,8 @@ class AgentOrchestrator:
                         "loaded_phrases": bias_analysis["loaded_phrases"]
                     })
                 
+                await self.source_aggregates.record_many(scored)
+                
                 # Step 7: Generate summaries
                 print(f"Generating summaries for cluster {cluster_id}...")
                 fact_summary = await self._generate_fact_summary(facts)
@@ -186,6 +289,7 @@ class AgentOrchestrator:
                             "fact_summary": fact_summary,
                             "frame_summary": frame_summary,
                             "facts": facts,
+                            "coverage": coverage.heatmap(),
                             "canonical_article_id": canonical_id
                         }
                     }
@@ -195,73 +299,54 @@ class AgentOrchestrator:
                     "cluster_id": cluster_id,
                     "articles_count": len(cluster_articles),
                     "facts_count": len(facts),
+                    "verification": verification_report(facts),
                     "bias_results": bias_results
                 })
             
             return {
                 "query": query,
                 "total_articles": len(articles),
+                "dedup": dedup_stats,
+                "nlp": nlp_stats,
+                "analysis_cache": analysis_cache.get_stats(),
+                "llm_cache": {"enabled": self.llm.cache.backend is not None, **budget.cache_report()},
+                "fact_store": self.fact_extractor.fact_store.get_stats(),
+                "llm_usage": budget.report(),
+                "degraded": bool(budget.degraded),
                 "clusters": cluster_results
             }
-            
+        
         except Exception as e:
             print(f"Orchestration error: {e}")
             raise e
     
-    async def _embed_and_store_articles(self, articles: List[Dict]):
-        """Embed articles and store in vector DB"""
-        vectors = []
-        db = get_database()
+    def _add_duplicate_sources(
+        self,
+        facts: List[Dict],
+        cluster_articles: List[Dict],
+        representatives: Dict[str, Dict]
+    ):
+        """Credit near-duplicate copies with the facts found in their representative"""
+        duplicate_urls = {}
+        for article in cluster_articles:
+            representative = representatives[duplicate_group_key(article)]
+            url = article.get("url", "")
+            if url and url != representative["url"]:
+                duplicate_urls.setdefault(representative["url"], []).append(url)
         
-        for article in articles:
-            article_id = str(article.get("id") or article.get("_id"))
-            article_text = article.get("text", "")
-            article_source = article.get("source", "")
-            published_at = article.get("published_at")
-            
-            # Chunk and embed article
-            chunks = self.embedding_service.embed_article(article_text)
-            
-            # Store chunks in article metadata
-            chunks_data = [
-                {
-                    "chunk_id": chunk["chunk_id"],
-                    "text": chunk["text"],
-                    "start": chunk["start"],
-                    "end": chunk["end"]
-                }
-                for chunk in chunks
-            ]
-            
-            # Update article in MongoDB
-            await db.articles.update_one(
-                {"_id": ObjectId(article_id)},
-                {"$set": {"chunks": chunks_data}}
-            )
-            
-            # Prepare vectors for Pinecone
-            for chunk in chunks:
-                vectors.append({
-                    "id": f"{article_id}_{chunk['chunk_id']}",
-                    "values": chunk["embedding"],
-                    "metadata": {
-                        "article_id": article_id,
-                        "chunk_id": chunk["chunk_id"],
-                        "text": chunk["text"][:500],  # Truncate for metadata
-                        "source": article_source,
-                        "published_at": published_at.isoformat() if published_at else None
-                    }
-                })
+        if not duplicate_urls:
+            return
         
-        # Upsert to vector store
-        if vectors:
-            self.vector_store.upsert_vectors(vectors)
+        for fact in facts:
+            sources = fact.get("sources", [])
+            extra = [url for source in sources for url in duplicate_urls.get(source, [])]
+            fact["sources"] = list(dict.fromkeys(sources + extra))
     
-    async def _generate_fact_summary(self, facts: List[Dict]) -> str:
-        """Generate fact summary using Groq LLM"""
+    async def _generate_fact_summary(self, facts: List[Dict]) -> Optional[str]:
+        """Generate fact summary using the LLM; None when the query budget can't cover it"""
         if not facts:
             return "No facts to summarize."
-
+        
         facts_text = "\n".join([
             f"- {f.get('fact', '')[:200]}"
             for f in facts[:10]
@@ -273,34 +358,20 @@ class AgentOrchestrator:
 
 Return only the summary, no additional commentary."""
         
+        query_budget = current_budget.get()
+        reason = query_budget.blocked_by(estimate_tokens(prompt) + 300) if query_budget else None
+        if reason:
+            print(f"LLM budget ({reason}): skipping fact summary")
+            query_budget.degrade("summary", reason)
+            return None
+        
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.groq_api_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.groq_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        # CHANGED: Updated from mixtral-8x7b-32768 to llama-3.3-70b-versatile
-                        "model": "llama-3.3-70b-versatile",
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.1,
-                        "max_tokens": 300
-                    },
-                    timeout=30.0
-                )
-                
-                if response.status_code != 200:
-                    print(f"Groq API Error in Summary ({response.status_code}): {response.text}")
-                    return f"Fact summary generation failed (API {response.status_code})"
-                    
-                response.raise_for_status()
-                data = response.json()
-                return data["choices"][0]["message"]["content"]
-        except Exception as e:
+            return await self.llm.chat(
+                [{"role": "user", "content": prompt}],
+                max_tokens=300,
+                stage="summary"
+            )
+        except LLMError as e:
             print(f"Exception in fact summary generation: {str(e)}")
             return "Fact summary generation failed."
     
@@ -1,105 +1,192 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 import numpy as np
 from transformers import pipeline
-import spacy
 from app.core.config import settings
+from app.services.nlp.nlp_service import NLPService, AnalysisDocument, get_nlp_service
+from app.services.bias.lexicon import LexiconMatcher, load_lexicon, OPINION_INDICATORS, OPINION_CATEGORY
+
+
+SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+
+# Bump when the scoring code changes so cached results are recomputed
+TONE_REVISION = 1
+LEXICAL_REVISION = 2
 
 
 class BiasAnalyzer:
-    def __init__(self):
+    def __init__(self, nlp_service: Optional[NLPService] = None):
         # Load sentiment analysis model
         self.sentiment_pipeline = pipeline(
             "sentiment-analysis",
-            model="cardiffnlp/twitter-roberta-base-sentiment-latest",
+            model=SENTIMENT_MODEL,
             device=-1  # CPU
         )
         
-        # Load spaCy for NLP features
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            print("spaCy model not found. Run: python -m spacy download en_core_web_sm")
-            self.nlp = None
+        # Shared spaCy parses for NLP features
+        self.nlp_service = nlp_service or get_nlp_service()
+        self.nlp = self.nlp_service.nlp
         
-        # Loaded language patterns
-        self.loaded_patterns = {
-            "emotive": ["shocking", "devastating", "tragic", "outrageous", "scandalous"],
-            "prescriptive": ["must", "should", "ought", "need to"],
-            "hedging": ["perhaps", "maybe", "possibly", "might", "could"],
-            "intensifiers": ["very", "extremely", "incredibly", "absolutely"]
-        }
+        # Loaded language patterns and opinion indicators, compiled once into one word-boundary matcher
+        self.loaded_patterns = load_lexicon()
+        self.matcher = LexiconMatcher({
+            **{category: terms for category, terms in self.loaded_patterns.items() if category != OPINION_CATEGORY},
+            OPINION_CATEGORY: OPINION_INDICATORS
+        })
     
     def analyze_article(self, text: str) -> Dict:
         """Analyze bias in an article"""
+        return self.analyze_articles([text])[0]
+    
+    def analyze_articles(
+        self,
+        texts: List[str],
+        documents: Optional[List[AnalysisDocument]] = None
+    ) -> List[Dict]:
+        """Analyze bias in several articles, batching sentiment inference across them"""
+        if documents is None:
+            documents = self.nlp_service.parse_many(texts)
+        
         # Tone analysis (sentiment)
-        tone_score = self._analyze_tone(text)
+        tone_scores = self._analyze_tone_batch(documents)
+        
+        return [
+            {"tone_score": tone_score, **self._analyze_lexical(document)}
+            for document, tone_score in zip(documents, tone_scores)
+        ]
+    
+    @property
+    def tone_version(self) -> str:
+        return f"{SENTIMENT_MODEL}:{self.nlp_service.version}:r{TONE_REVISION}"
+    
+    @property
+    def lexical_version(self) -> str:
+        return (
+            f"{self.matcher.version}:"
+            f"{self.nlp_service.version}:r{LEXICAL_REVISION}"
+        )
+    
+    async def analyze_articles_cached(self, documents: List[AnalysisDocument], analysis_cache) -> List[Dict]:
+        """analyze_articles, reading tone and lexical results from the analysis cache
         
-        # Lexical bias
-        lexical_bias = self._analyze_lexical_bias(text)
+        Only articles missing from the cache for the current versions are scored,
+        and their results are written back.
+        """
+        keys = [document.content_hash for document in documents]
+        pending = {document.content_hash: document for document in documents}
         
-        # Subjectivity
-        subjectivity = self._analyze_subjectivity(text)
+        tone = await analysis_cache.get_many("tone", self.tone_version, keys)
+        tone_missing = [document for key, document in pending.items() if key not in tone]
+        if tone_missing:
+            computed = {
+                document.content_hash: {"tone_score": score}
+                for document, score in zip(tone_missing, self._analyze_tone_batch(tone_missing))
+            }
+            await analysis_cache.put_many("tone", self.tone_version, computed)
+            tone.update(computed)
         
+        lexical = await analysis_cache.get_many("lexical", self.lexical_version, keys)
+        lexical_missing = [document for key, document in pending.items() if key not in lexical]
+        if lexical_missing:
+            computed = {
+                document.content_hash: self._analyze_lexical(document)
+                for document in lexical_missing
+            }
+            await analysis_cache.put_many("lexical", self.lexical_version, computed)
+            lexical.update(computed)
+        
+        return [{"tone_score": tone[key]["tone_score"], **lexical[key]} for key in keys]
+    
+    def _analyze_lexical(self, document: AnalysisDocument) -> Dict:
+        """Lexical bias, subjectivity and loaded phrases for one article"""
+        # One matcher pass per article feeds lexical bias, subjectivity and loaded phrases
+        matches = []
+        opinion_matches = []
+        for match in self.matcher.match(document.text):
+            (opinion_matches if match["category"] == OPINION_CATEGORY else matches).append(match)
         return {
-            "tone_score": tone_score,
-            "lexical_bias_score": lexical_bias,
-            "subjectivity_score": subjectivity,
-            "loaded_phrases": self._extract_loaded_phrases(text)
+            "lexical_bias_score": self._analyze_lexical_bias(document, matches),
+            "subjectivity_score": self._analyze_subjectivity(document, opinion_matches),
+            "loaded_phrases": self._extract_loaded_phrases(document, matches)
         }
     
     def _analyze_tone(self, text: str) -> float:
         """Analyze sentiment/tone (-1 to 1)"""
-        # Split into sentences for better analysis
-        sentences = text.split('.')[:10]  # Limit for performance
+        return self._analyze_tone_batch([self.nlp_service.parse(text)])[0]
+    
+    def _tone_sentences(self, document: AnalysisDocument) -> List[str]:
+        """Sentences scored for tone"""
+        sentences = document.sentences[:10]  # Limit for performance
+        return [sentence[:512] for sentence in sentences if len(sentence.strip()) >= 10]
+    
+    def _analyze_tone_batch(self, documents: List[AnalysisDocument]) -> List[float]:
+        """Analyze sentiment/tone (-1 to 1) for several documents in batched forward passes"""
+        sentences = []
+        owners = []
+        for i, document in enumerate(documents):
+            for sentence in self._tone_sentences(document):
+                sentences.append(sentence)
+                owners.append(i)
         
+        # Sort by length so each batch pads to sentences of similar length
+        order = sorted(range(len(sentences)), key=lambda k: len(sentences[k]))
+        
+        scores = [[] for _ in documents]
+        for k, result in zip(order, self._run_sentiment([sentences[k] for k in order])):
+            if result is not None:
+                scores[owners[k]].append(self._sentiment_value(result))
+        
+        return [float(np.mean(s)) if s else 0.0 for s in scores]
+    
+    def _run_sentiment(self, sentences: List[str]) -> List[Optional[Dict]]:
+        """Run the sentiment pipeline over sentences; None where a sentence failed"""
         if not sentences:
-            return 0.0
+            return []
+        
+        try:
+            return self.sentiment_pipeline(
+                sentences,
+                batch_size=settings.SENTIMENT_BATCH_SIZE,
+                truncation=True,
+                max_length=512
+            )
+        except Exception as e:
+            print(f"Batched sentiment failed, scoring sentences one by one: {str(e)}")
         
-        scores = []
+        results = []
         for sentence in sentences:
-            if len(sentence.strip()) < 10:
-                continue
-            
             try:
-                result = self.sentiment_pipeline(sentence[:512])[0]
-                label = result['label'].lower()
-                score = result['score']
-                
-                # Map to -1 to 1 scale
-                if 'positive' in label:
-                    scores.append(score)
-                elif 'negative' in label:
-                    scores.append(-score)
-                else:
-                    scores.append(0)
-            except:
-                continue
-        
-        if not scores:
-            return 0.0
+                results.append(self.sentiment_pipeline(sentence, truncation=True, max_length=512)[0])
+            except Exception:
+                results.append(None)
+        return results
+    
+    @staticmethod
+    def _sentiment_value(result: Dict) -> float:
+        """Map a sentiment label to the -1 to 1 scale"""
+        label = result['label'].lower()
+        score = result['score']
         
-        return np.mean(scores)
+        if 'positive' in label:
+            return score
+        elif 'negative' in label:
+            return -score
+        return 0.0
     
-    def _analyze_lexical_bias(self, text: str) -> float:
+    def _analyze_lexical_bias(self, document: AnalysisDocument, matches: List[Dict]) -> float:
         """Analyze lexical bias (0 to 1)"""
-        if not self.nlp:
-            return self._simple_lexical_bias(text)
+        if not document.parsed:
+            return self._simple_lexical_bias(document.text, matches)
         
-        doc = self.nlp(text.lower())
-        total_tokens = len([t for t in doc if t.is_alpha])
+        total_tokens = document.alpha_token_count
         
         if total_tokens == 0:
             return 0.0
         
-        loaded_count = 0
-        
-        # Check for loaded language patterns
-        for pattern_type, words in self.loaded_patterns.items():
-            for word in words:
-                loaded_count += text.lower().count(word)
+        # Loaded language patterns
+        loaded_count = len(matches)
         
         # Check for adjectives and adverbs (indicators of opinion)
-        adj_adv_count = len([t for t in doc if t.pos_ in ['ADJ', 'ADV']])
+        adj_adv_count = len([pos for pos in document.pos if pos in ['ADJ', 'ADV']])
         
         # Combine metrics
         lexical_score = min(
@@ -109,63 +196,67 @@ class BiasAnalyzer:
         
         return lexical_score
     
-    def _simple_lexical_bias(self, text: str) -> float:
+    def _simple_lexical_bias(self, text: str, matches: List[Dict]) -> float:
         """Simple lexical bias without spaCy"""
-        words = text.lower().split()
-        total_words = len(words)
+        total_words = len(text.split())
         
         if total_words == 0:
             return 0.0
         
-        loaded_count = 0
-        for pattern_type, pattern_words in self.loaded_patterns.items():
-            for word in pattern_words:
-                loaded_count += words.count(word)
-        
-        return min(loaded_count / total_words, 1.0)
+        return min(len(matches) / total_words, 1.0)
     
-    def _analyze_subjectivity(self, text: str) -> float:
+    def _analyze_subjectivity(self, document: AnalysisDocument, opinion_matches: List[Dict]) -> float:
         """Analyze subjectivity (0 to 1)"""
-        # Simple heuristic: ratio of opinion indicators
-        opinion_indicators = [
-            "i think", "i believe", "in my opinion", "seems", "appears",
-            "likely", "probably", "suggests", "indicates"
-        ]
-        
-        text_lower = text.lower()
-        indicator_count = sum(1 for indicator in opinion_indicators if indicator in text_lower)
+        # Simple heuristic: ratio of distinct opinion indicators
+        indicator_count = len({m["term"] for m in opinion_matches})
         
         # Normalize by text length
-        sentences = text.split('.')
-        return min(indicator_count / max(len(sentences), 1), 1.0)
+        return min(indicator_count / max(len(document.sentences), 1), 1.0)
     
-    def _extract_loaded_phrases(self, text: str, max_phrases: int = 8) -> List[Dict]:
-        """Extract loaded/biased phrases from text"""
+    def _extract_loaded_phrases(
+        self,
+        document: AnalysisDocument,
+        matches: List[Dict],
+        max_phrases: int = 8
+    ) -> List[Dict]:
+        """Extract loaded/biased phrases from text
+        
+        Each sentence is reported once per kind of loaded language it contains.
+        """
         phrases = []
         
-        if not self.nlp:
+        if not document.parsed:
             return phrases
         
-        doc = self.nlp(text)
-        
-        # Find phrases with loaded words
-        for sent in doc.sents:
-            sent_text = sent.text.lower()
+        # Matches and sentence spans are both in text order, so walk them together
+        seen = set()
+        sentence_index = 0
+        for match in matches:
+            while (
+                sentence_index < len(document.sentence_spans)
+                and document.sentence_spans[sentence_index][1] <= match["start"]
+            ):
+                sentence_index += 1
+            if sentence_index >= len(document.sentence_spans):
+                break
+            
+            key = (sentence_index, match["category"])
+            if key in seen:
+                continue
+            seen.add(key)
+            
+            pattern_type = match["category"]
+            phrases.append({
+                "phrase": document.sentences[sentence_index][:100],  # Truncate
+                "type": pattern_type,
+                "term": match["term"],
+                "reason": f"Contains {pattern_type} language"
+            })
             
-            for pattern_type, words in self.loaded_patterns.items():
-                for word in words:
-                    if word in sent_text:
-                        # Extract the sentence or phrase
-                        phrases.append({
-                            "phrase": sent.text[:100],  # Truncate
-                            "type": pattern_type,
-                            "reason": f"Contains {pattern_type} language"
-                        })
-                        
-                        if len(phrases) >= max_phrases:
-                            return phrases
-        
-        return phrases[:max_phrases]
+            if len(phrases) >= max_phrases:
+                break
+        
+        return phrases
     
     def compute_bias_index(
         self,
@@ -176,21 +267,9 @@ class BiasAnalyzer:
         cluster_mean_tone: float
     ) -> float:
         """Compute Bias Index (0 to 100)"""
-        # Tone deviation from cluster mean
-        tone_deviation = abs(tone_score - cluster_mean_tone)
-        
-        # Weighted combination
-        bias_mag = (
-            settings.BIAS_WEIGHT_TONE * tone_deviation +
-            settings.BIAS_WEIGHT_LEXICAL * lexical_bias +
-            settings.BIAS_WEIGHT_OMISSION * omission_score +
-            settings.BIAS_WEIGHT_CONSISTENCY * consistency_score
-        )
-        
-        # Normalize to 0-100 (assuming max possible is around 2.0)
-        bias_index = min(100 * (bias_mag / 2.0), 100)
-        
-        return bias_index
+        return float(bias_index_from_components(
+            tone_score, lexical_bias, omission_score, consistency_score, cluster_mean_tone
+        ))
     
     def compute_transparency_score(
         self,
@@ -199,14 +278,35 @@ class BiasAnalyzer:
         lexical_bias: float
     ) -> float:
         """Compute Transparency Score (0 to 100)"""
-        # Higher transparency = lower omissions, conflicts, loaded language
-        transparency = 100 * (
-            1 - (
-                0.4 * omission_score +
-                0.4 * consistency_score +
-                0.2 * lexical_bias
-            )
-        )
-        
-        return max(0, min(100, transparency))
+        return float(transparency_from_components(omission_score, consistency_score, lexical_bias))
 
+
+def bias_index_from_components(tone_score, lexical_bias, omission_score, consistency_score, cluster_mean_tone):
+    """Bias Index (0 to 100) from its components; works on scalars and NumPy arrays alike"""
+    # Tone deviation from cluster mean
+    tone_deviation = np.abs(tone_score - cluster_mean_tone)
+    
+    # Weighted combination
+    bias_mag = (
+        settings.BIAS_WEIGHT_TONE * tone_deviation +
+        settings.BIAS_WEIGHT_LEXICAL * lexical_bias +
+        settings.BIAS_WEIGHT_OMISSION * omission_score +
+        settings.BIAS_WEIGHT_CONSISTENCY * consistency_score
+    )
+    
+    # Normalize to 0-100 (assuming max possible is around 2.0)
+    return np.minimum(100 * (bias_mag / 2.0), 100)
+
+
+def transparency_from_components(omission_score, consistency_score, lexical_bias):
+    """Transparency Score (0 to 100) from its components; works on scalars and NumPy arrays alike"""
+    # Higher transparency = lower omissions, conflicts, loaded language
+    transparency = 100 * (
+        1 - (
+            0.4 * omission_score +
+            0.4 * consistency_score +
+            0.2 * lexical_bias
+        )
+    )
+    
+    return np.clip(transparency, 0, 100)
@@ -0,0 +1,103 @@
+from typing import Dict, List, Tuple
+import hashlib
+import json
+import re
+from app.core.config import settings
+
+
+# Loaded language patterns
+DEFAULT_LOADED_LEXICON = {
+    "emotive": ["shocking", "devastating", "tragic", "outrageous", "scandalous"],
+    "prescriptive": ["must", "should", "ought", "need to"],
+    "hedging": ["perhaps", "maybe", "possibly", "might", "could"],
+    "intensifiers": ["very", "extremely", "incredibly", "absolutely"]
+}
+
+OPINION_INDICATORS = [
+    "i think", "i believe", "in my opinion", "seems", "appears",
+    "likely", "probably", "suggests", "indicates"
+]
+
+# Category of OPINION_INDICATORS when matched alongside the loaded lexicon
+OPINION_CATEGORY = "opinion"
+
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)?")
+
+
+def load_lexicon() -> Dict[str, List[str]]:
+    """Loaded-language lexicon: the defaults, extended by BIAS_LEXICON_PATH if set
+    
+    The file is JSON mapping a category to a list of words or phrases.
+    """
+    lexicon = {category: list(terms) for category, terms in DEFAULT_LOADED_LEXICON.items()}
+    
+    if settings.BIAS_LEXICON_PATH:
+        try:
+            with open(settings.BIAS_LEXICON_PATH) as f:
+                extra = json.load(f)
+            for category, terms in extra.items():
+                lexicon.setdefault(category, [])
+                lexicon[category].extend(t for t in terms if t not in lexicon[category])
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not load bias lexicon {settings.BIAS_LEXICON_PATH}: {e}")
+    
+    return lexicon
+
+
+class LexiconMatcher:
+    """Word-boundary-aware matcher for a lexicon of words and phrases
+    
+    Built once; every phrase becomes a tuple of lowercase tokens in a hash
+    table, so matching is a single left-to-right pass over the text's tokens
+    with one lookup per distinct phrase length. Cost does not grow with the
+    number of terms, and "must" never matches inside "mustard".
+    """
+    
+    def __init__(self, lexicon: Dict[str, List[str]]):
+        self.phrases: Dict[Tuple[str, ...], str] = {}
+        for category, terms in lexicon.items():
+            for term in terms:
+                key = tuple(token.lower() for token in TOKEN_PATTERN.findall(term))
+                if key:
+                    self.phrases.setdefault(key, category)
+        
+        # Longest phrases first so "need to" wins over a shorter overlapping term
+        self.lengths = sorted({len(key) for key in self.phrases}, reverse=True)
+        
+        canonical = json.dumps({category: sorted(terms) for category, terms in lexicon.items()}, sort_keys=True)
+        self.version = hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+    
+    def match(self, text: str) -> List[Dict]:
+        """All non-overlapping matches with their category and character span"""
+        tokens = [(m.group(0).lower(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(text)]
+        matches = []
+        
+        i = 0
+        while i < len(tokens):
+            for length in self.lengths:
+                if i + length > len(tokens):
+                    continue
+                key = tuple(token for token, _, _ in tokens[i:i + length])
+                category = self.phrases.get(key)
+                if category:
+                    start, end = tokens[i][1], tokens[i + length - 1][2]
+                    matches.append({
+                        "term": " ".join(key),
+                        "category": category,
+                        "start": start,
+                        "end": end
+                    })
+                    i += length
+                    break
+            else:
+                i += 1
+        
+        return matches
+    
+    @staticmethod
+    def count(matches: List[Dict]) -> Dict[str, int]:
+        """Match counts per category"""
+        counts = {}
+        for match in matches:
+            counts[match["category"]] = counts.get(match["category"], 0) + 1
+        return counts
@@ -1,11 +1,14 @@
-from typing import List, Dict, Set
-from app.services.facts.fact_extractor import FactExtractor
+from typing import List, Dict, Set, Optional
+import re
+import numpy as np
+from app.core.config import settings
+from app.services.facts.coverage import FactCoverageMatrix
+
+
+TOKEN_PATTERN = re.compile(r"\w+(?:[-'.]\w+)*")
 
 
 class OmissionDetector:
-    def __init__(self):
-        self.fact_extractor = FactExtractor()
-    
     def detect_omissions(
         self,
         cluster_facts: List[Dict],
@@ -22,48 +25,141 @@ class OmissionDetector:
         Returns:
             Dict with omission_score and missing_facts
         """
-        if not cluster_facts:
-            return {
-                "omission_score": 0.0,
-                "missing_facts": [],
-                "present_facts": []
+        return self.detect_cluster_omissions(
+            cluster_facts,
+            [{"id": article_id, "text": article_text}]
+        )[article_id]
+    
+    def detect_cluster_omissions(
+        self,
+        cluster_facts: List[Dict],
+        articles: List[Dict],
+        fact_embeddings: Optional[np.ndarray] = None,
+        chunk_embeddings: Optional[List[Optional[np.ndarray]]] = None
+    ) -> Dict[str, Dict]:
+        """Detect omitted facts for every article in a cluster at once
+        
+        Args:
+            cluster_facts: List of canonical facts for the cluster
+            articles: Articles with "id" and "text"
+            fact_embeddings: see cluster_presence
+            chunk_embeddings: see cluster_presence
+        
+        Returns:
+            omission_score, missing_facts and present_facts per article id
+        """
+        presence = self.cluster_presence(cluster_facts, articles, fact_embeddings, chunk_embeddings)
+        coverage = FactCoverageMatrix.from_presence(cluster_facts, articles, presence)
+        omission_scores = coverage.omission_scores()
+        
+        results = {}
+        for j, article in enumerate(articles):
+            results[str(article["id"])] = {
+                "omission_score": float(omission_scores[j]),
+                "missing_facts": coverage.missing_facts(j),
+                "present_facts": [fact for i, fact in enumerate(cluster_facts) if presence[i, j]]
             }
         
-        missing_facts = []
-        present_facts = []
-        
-        article_lower = article_text.lower()
-        
-        for fact in cluster_facts:
-            fact_text = fact.get("fact", "").lower()
-            
-            # Check if fact is mentioned in article
-            # Simple keyword matching (can be improved with semantic similarity)
-            fact_keywords = self._extract_keywords(fact_text)
-            mentioned = any(
-                keyword in article_lower
-                for keyword in fact_keywords
-                if len(keyword) > 3  # Ignore very short keywords
-            )
-            
-            if mentioned:
-                present_facts.append(fact)
-            else:
-                missing_facts.append(fact)
-        
-        # Omission score = fraction of facts missing
-        omission_score = len(missing_facts) / len(cluster_facts) if cluster_facts else 0.0
-        
-        return {
-            "omission_score": omission_score,
-            "missing_facts": missing_facts,
-            "present_facts": present_facts
-        }
+        return results
+    
+    def cluster_presence(
+        self,
+        cluster_facts: List[Dict],
+        articles: List[Dict],
+        fact_embeddings: Optional[np.ndarray] = None,
+        chunk_embeddings: Optional[List[Optional[np.ndarray]]] = None
+    ) -> np.ndarray:
+        """Boolean fact x article matrix: True where the article mentions the fact
+        
+        Args:
+            cluster_facts: List of canonical facts for the cluster
+            articles: Articles with "text"
+            fact_embeddings: Normalized fact embeddings (facts x dimension); with
+                chunk_embeddings, switches to semantic matching
+            chunk_embeddings: Normalized chunk embeddings per article, aligned
+                with articles; articles without any use keyword matching
+        """
+        presence = self.presence_matrix(cluster_facts, [a.get("text", "") for a in articles])
+        
+        if fact_embeddings is not None and chunk_embeddings is not None and cluster_facts:
+            semantic, covered = self.semantic_presence_matrix(fact_embeddings, chunk_embeddings)
+            presence[:, covered] = semantic[:, covered]
+        
+        return presence
+    
+    def presence_matrix(self, cluster_facts: List[Dict], texts: List[str]) -> np.ndarray:
+        """Keyword-based fact x article presence
+        
+        A fact counts as mentioned when any of its keywords occurs as a token of
+        the article. Each article is tokenized once into a set; facts and
+        articles become keyword-incidence matrices over the facts' vocabulary,
+        and one matrix product gives every fact/article overlap.
+        """
+        if not cluster_facts or not texts:
+            return np.zeros((len(cluster_facts), len(texts)), dtype=bool)
+        
+        fact_keywords = [
+            [k for k in self._extract_keywords(fact.get("fact", "")) if len(k) > 3]  # Ignore very short keywords
+            for fact in cluster_facts
+        ]
+        vocab = {}
+        for keywords in fact_keywords:
+            for keyword in keywords:
+                vocab.setdefault(keyword, len(vocab))
+        
+        fact_matrix = np.zeros((len(cluster_facts), len(vocab)), dtype=np.int8)
+        for i, keywords in enumerate(fact_keywords):
+            fact_matrix[i, [vocab[k] for k in keywords]] = 1
+        
+        article_matrix = np.zeros((len(texts), len(vocab)), dtype=np.int8)
+        for j, text in enumerate(texts):
+            columns = [vocab[token] for token in self._tokens(text) if token in vocab]
+            article_matrix[j, columns] = 1
+        
+        # At most 10 keywords per fact, so int8 products cannot overflow
+        return (fact_matrix @ article_matrix.T) > 0
+    
+    def semantic_presence_matrix(
+        self,
+        fact_embeddings: np.ndarray,
+        chunk_embeddings: List[Optional[np.ndarray]],
+        threshold: Optional[float] = None
+    ):
+        """Boolean fact x article matrix from embedding similarity
+        
+        All articles' chunks are stacked into one matrix, so a single product
+        gives every fact/chunk cosine similarity; a fact is present in an
+        article when its best-matching chunk clears the threshold.
+        
+        Returns:
+            (presence, covered) where covered marks articles that had chunk
+            embeddings; their presence columns are meaningful
+        """
+        threshold = settings.OMISSION_SIMILARITY_THRESHOLD if threshold is None else threshold
+        
+        covered = np.array([m is not None and len(m) > 0 for m in chunk_embeddings], dtype=bool)
+        presence = np.zeros((len(fact_embeddings), len(chunk_embeddings)), dtype=bool)
+        if not covered.any():
+            return presence, covered
+        
+        matrices = [m for m in chunk_embeddings if m is not None and len(m) > 0]
+        offsets = np.cumsum([0] + [len(m) for m in matrices[:-1]])
+        
+        # Embeddings are L2-normalized, so dot products are cosine similarities
+        similarity = np.asarray(fact_embeddings, dtype=np.float32) @ np.vstack(matrices).T
+        best = np.maximum.reduceat(similarity, offsets, axis=1)
+        
+        presence[:, covered] = best >= threshold
+        return presence, covered
+    
+    @staticmethod
+    def _tokens(text: str) -> Set[str]:
+        return set(TOKEN_PATTERN.findall(text.lower()))
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract key terms from fact text"""
         # Simple extraction - in production, use NER or keyword extraction
-        words = text.split()
+        words = TOKEN_PATTERN.findall(text.lower())
         
         # Filter out common stop words
         stop_words = {
@@ -71,7 +167,6 @@ class OmissionDetector:
             "of", "with", "by", "is", "was", "are", "were", "be", "been", "being"
         }
         
-        keywords = [w.lower().strip('.,!?;:') for w in words if w.lower() not in stop_words]
+        keywords = [w for w in words if w not in stop_words]
         
         return keywords[:10]  # Return top 10 keywords
-
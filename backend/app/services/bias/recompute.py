@@ -0,0 +1,161 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+import argparse
+import json
+import time
+import numpy as np
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.core.database import get_sync_database
+from app.services.bias.bias_analyzer import bias_index_from_components, transparency_from_components
+from app.services.bias.source_aggregates import rebuild_source_aggregates
+
+
+CHECKPOINT_ID = "bias_recompute"
+
+COMPONENT_PROJECTION = {
+    "tone_score": 1,
+    "lexical_bias_score": 1,
+    "omission_score": 1,
+    "consistency_score": 1,
+    "cluster_id": 1,
+    "cluster_mean_tone": 1,
+}
+
+
+def weights_fingerprint() -> str:
+    """The settings the stored indices depend on; a checkpoint only resumes under the same ones"""
+    return json.dumps({
+        "tone": settings.BIAS_WEIGHT_TONE,
+        "lexical": settings.BIAS_WEIGHT_LEXICAL,
+        "omission": settings.BIAS_WEIGHT_OMISSION,
+        "consistency": settings.BIAS_WEIGHT_CONSISTENCY,
+    }, sort_keys=True)
+
+
+def _column(docs: List[Dict], field: str) -> np.ndarray:
+    return np.array([doc.get(field) or 0.0 for doc in docs], dtype=np.float64)
+
+
+def _cluster_mean_tones(db) -> Dict[str, float]:
+    """Mean tone per cluster, for articles scored before cluster_mean_tone was stored"""
+    pipeline = [
+        {"$match": {"cluster_id": {"$ne": None}, "tone_score": {"$ne": None}}},
+        {"$group": {"_id": "$cluster_id", "mean_tone": {"$avg": "$tone_score"}}},
+    ]
+    return {row["_id"]: row["mean_tone"] for row in db.articles.aggregate(pipeline)}
+
+
+def recompute_bias_scores(
+    batch_size: Optional[int] = None,
+    max_rate: Optional[float] = None,
+    restart: bool = False
+) -> Dict:
+    """Recompute bias_index and transparency_score for every scored article
+    
+    Streams articles in _id order, scores each batch with NumPy over the
+    stored component columns and writes it back with one bulk update. Progress
+    is checkpointed after every batch, so an interrupted run resumes where it
+    stopped unless the weights changed in between.
+    """
+    batch_size = batch_size or settings.BIAS_RECOMPUTE_BATCH_SIZE
+    max_rate = settings.BIAS_RECOMPUTE_MAX_RATE if max_rate is None else max_rate
+    
+    db = get_sync_database()
+    fingerprint = weights_fingerprint()
+    
+    checkpoint = db.job_checkpoints.find_one({"_id": CHECKPOINT_ID})
+    if restart or not checkpoint or checkpoint.get("completed") or checkpoint.get("weights") != fingerprint:
+        checkpoint = {
+            "_id": CHECKPOINT_ID,
+            "weights": fingerprint,
+            "last_id": None,
+            "processed": 0,
+            "completed": False,
+            "started_at": datetime.utcnow()
+        }
+        db.job_checkpoints.replace_one({"_id": CHECKPOINT_ID}, checkpoint, upsert=True)
+    elif checkpoint["last_id"] is not None:
+        print(f"Resuming bias recompute after {checkpoint['processed']} articles")
+    
+    cluster_means = _cluster_mean_tones(db)
+    
+    last_id = checkpoint["last_id"]
+    processed = 0
+    started = time.perf_counter()
+    
+    while True:
+        query = {"tone_score": {"$ne": None}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        
+        docs = list(db.articles.find(query, COMPONENT_PROJECTION).sort("_id", 1).limit(batch_size))
+        if not docs:
+            break
+        
+        tone = _column(docs, "tone_score")
+        lexical = _column(docs, "lexical_bias_score")
+        omission = _column(docs, "omission_score")
+        consistency = _column(docs, "consistency_score")
+        cluster_mean_tone = np.array([
+            doc["cluster_mean_tone"] if doc.get("cluster_mean_tone") is not None
+            else cluster_means.get(doc.get("cluster_id"), doc["tone_score"])
+            for doc in docs
+        ], dtype=np.float64)
+        
+        bias_index = bias_index_from_components(tone, lexical, omission, consistency, cluster_mean_tone)
+        transparency = transparency_from_components(omission, consistency, lexical)
+        
+        db.articles.bulk_write([
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"bias_index": float(b), "transparency_score": float(t)}}
+            )
+            for doc, b, t in zip(docs, bias_index, transparency)
+        ], ordered=False)
+        
+        last_id = docs[-1]["_id"]
+        processed += len(docs)
+        db.job_checkpoints.update_one(
+            {"_id": CHECKPOINT_ID},
+            {"$set": {"last_id": last_id, "updated_at": datetime.utcnow()}, "$inc": {"processed": len(docs)}}
+        )
+        
+        # Throttle to max_rate articles/sec so the job doesn't starve live queries
+        if max_rate:
+            ahead = processed / max_rate - (time.perf_counter() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+    
+    db.job_checkpoints.update_one(
+        {"_id": CHECKPOINT_ID},
+        {"$set": {"completed": True, "completed_at": datetime.utcnow()}}
+    )
+    
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed else None
+    print(f"Recomputed bias scores for {processed} articles in {elapsed:.1f}s"
+          + (f" ({rate:.0f} articles/sec)" if rate else ""))
+    
+    # Per-source aggregates were built from the old scores
+    aggregates = rebuild_source_aggregates(db)
+    print(f"Rebuilt {aggregates} source aggregates")
+    
+    return {
+        "processed": processed,
+        "total_processed": checkpoint["processed"] + processed,
+        "seconds": elapsed,
+        "articles_per_second": rate,
+        "aggregates_rebuilt": aggregates
+    }
+
+
+if __name__ == "__main__":
+    # Run from backend/ directory: python -m app.services.bias.recompute
+    parser = argparse.ArgumentParser(description="Recompute bias index and transparency from stored components")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-rate", type=float, default=None, help="articles/sec, 0 = unthrottled")
+    parser.add_argument("--restart", action="store_true", help="ignore any saved checkpoint")
+    args = parser.parse_args()
+    
+    recompute_bias_scores(batch_size=args.batch_size, max_rate=args.max_rate, restart=args.restart)
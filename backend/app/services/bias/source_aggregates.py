@@ -0,0 +1,221 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.core.database import get_database, get_sync_database
+
+
+METRICS = ["tone_score", "bias_index", "transparency_score"]
+WINDOWS = ["daily", "weekly", "all"]
+
+# Article fields needed to fold a re-scored article into its aggregates
+AGGREGATE_PROJECTION = {"source": 1, "published_at": 1, "scraped_at": 1, **{metric: 1 for metric in METRICS}}
+
+
+def window_start(window: str, when: datetime) -> Optional[datetime]:
+    """Start of the daily/weekly bucket containing ``when`` (None for the all-time window)"""
+    day = datetime(when.year, when.month, when.day)
+    if window == "daily":
+        return day
+    if window == "weekly":
+        return day - timedelta(days=day.weekday())
+    return None
+
+
+def _aggregate_id(source: str, window: str, bucket_start: Optional[datetime]) -> str:
+    bucket = bucket_start.date().isoformat() if bucket_start else "all"
+    return f"{source}|{window}|{bucket}"
+
+
+def _increments(before: Dict, after: Dict) -> Dict:
+    """$inc for one article's new scores, net of whatever it contributed before"""
+    inc = {}
+    for metric in METRICS:
+        new = after.get(metric)
+        if new is None:
+            continue
+        old = before.get(metric)
+        if old is None:
+            inc[f"{metric}.count"] = 1
+            inc[f"{metric}.sum"] = new
+            inc[f"{metric}.sumsq"] = new * new
+        else:
+            inc[f"{metric}.sum"] = new - old
+            inc[f"{metric}.sumsq"] = new * new - old * old
+    return inc
+
+
+def summarize(doc: Dict) -> Dict:
+    """Mean and variance per metric from an aggregate's running sums"""
+    summary = {
+        "source": doc["source"],
+        "window": doc["window"],
+        "bucket_start": doc.get("bucket_start"),
+        "articles": doc.get("bias_index", {}).get("count", 0)
+    }
+    for metric in METRICS:
+        stats = doc.get(metric) or {}
+        count = stats.get("count", 0)
+        if count:
+            mean = stats["sum"] / count
+            variance = max(stats["sumsq"] / count - mean * mean, 0.0)
+        else:
+            mean = variance = None
+        summary[metric] = {"count": count, "mean": mean, "variance": variance}
+    return summary
+
+
+class SourceAggregates:
+    """Per-source count, mean and variance of tone, bias index and transparency
+    
+    Kept in ``source_bias_aggregates`` as running count/sum/sum-of-squares per
+    source and window (daily, weekly, all time), updated with $inc as articles
+    are scored, so reading them costs one document per source and bucket.
+    """
+    
+    async def record_many(self, scored: List[Tuple[Dict, Dict]]):
+        """Fold scored articles into the aggregates
+        
+        ``scored`` pairs each article as it was before scoring (with
+        AGGREGATE_PROJECTION fields) with its new scores, so re-scoring an
+        article replaces its contribution instead of counting it twice.
+        """
+        now = datetime.utcnow()
+        operations = []
+        
+        for before, after in scored:
+            inc = _increments(before, after)
+            if not inc:
+                continue
+            
+            source = before.get("source") or "Unknown"
+            when = before.get("published_at") or before.get("scraped_at") or now
+            for window in WINDOWS:
+                bucket_start = window_start(window, when)
+                operations.append(UpdateOne(
+                    {"_id": _aggregate_id(source, window, bucket_start)},
+                    {
+                        "$inc": inc,
+                        "$set": {
+                            "source": source,
+                            "window": window,
+                            "bucket_start": bucket_start,
+                            "updated_at": now
+                        }
+                    },
+                    upsert=True
+                ))
+        
+        if not operations:
+            return
+        
+        try:
+            db = get_database()
+            await db.source_bias_aggregates.bulk_write(operations, ordered=False)
+        except Exception as e:
+            print(f"Warning: could not update source aggregates: {e}")
+    
+    async def get_aggregates(self, window: str = "all", since: Optional[datetime] = None) -> List[Dict]:
+        """Aggregates for every source in a window, oldest bucket first"""
+        db = get_database()
+        
+        query = {"window": window}
+        if since is not None and window != "all":
+            query["bucket_start"] = {"$gte": since}
+        
+        cursor = db.source_bias_aggregates.find(query).sort([("source", 1), ("bucket_start", 1)])
+        return [summarize(doc) async for doc in cursor]
+
+
+def _rebuild_pipeline(window: str) -> List[Dict]:
+    when = {"$ifNull": ["$published_at", "$scraped_at"]}
+    if window == "daily":
+        bucket = {"$dateTrunc": {"date": when, "unit": "day"}}
+    elif window == "weekly":
+        bucket = {"$dateTrunc": {"date": when, "unit": "week", "startOfWeek": "monday"}}
+    else:
+        bucket = None
+    
+    group = {"_id": {"source": "$source", "bucket": bucket}}
+    for metric in METRICS:
+        group[f"{metric}_count"] = {"$sum": {"$cond": [{"$isNumber": f"${metric}"}, 1, 0]}}
+        group[f"{metric}_sum"] = {"$sum": f"${metric}"}
+        group[f"{metric}_sumsq"] = {"$sum": {"$multiply": [f"${metric}", f"${metric}"]}}
+    
+    return [
+        {"$match": {"bias_index": {"$ne": None}}},
+        {"$group": group}
+    ]
+
+
+def rebuild_source_aggregates(db) -> int:
+    """Recompute every aggregate from the articles collection (sync, e.g. after a bias recompute)
+    
+    A bucket that live scoring updated after the rebuild started keeps its
+    live value: its snapshot could be missing that $inc, so it is only
+    written where ``updated_at`` is older, or inserted when missing.
+    """
+    rebuilt_at = datetime.utcnow()
+    operations = []
+    rebuilt = 0
+    
+    for window in WINDOWS:
+        for row in db.articles.aggregate(_rebuild_pipeline(window), allowDiskUse=True):
+            source = row["_id"]["source"] or "Unknown"
+            bucket_start = row["_id"]["bucket"]
+            aggregate_id = _aggregate_id(source, window, bucket_start)
+            doc = {
+                "source": source,
+                "window": window,
+                "bucket_start": bucket_start,
+                "updated_at": rebuilt_at,
+                "rebuilt_at": rebuilt_at
+            }
+            for metric in METRICS:
+                doc[metric] = {
+                    "count": row[f"{metric}_count"],
+                    "sum": row[f"{metric}_sum"],
+                    "sumsq": row[f"{metric}_sumsq"]
+                }
+            operations.append(UpdateOne({"_id": aggregate_id, "updated_at": {"$lt": rebuilt_at}}, {"$set": doc}))
+            operations.append(UpdateOne({"_id": aggregate_id}, {"$setOnInsert": doc}, upsert=True))
+            rebuilt += 1
+    
+    if operations:
+        try:
+            db.source_bias_aggregates.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # A bucket live scoring inserted concurrently already has the newer value
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+    
+    # Drop buckets that no longer have any scored articles, sparing any that
+    # live scoring created or updated while the rebuild ran
+    db.source_bias_aggregates.delete_many({
+        "rebuilt_at": {"$ne": rebuilt_at},
+        "updated_at": {"$lt": rebuilt_at}
+    })
+    
+    return rebuilt
+
+
+async def bootstrap_source_aggregates() -> int:
+    """Build the aggregates from stored scores when none exist yet (e.g. on first startup)
+    
+    Articles scored before aggregates were kept were never counted, so
+    re-scoring one would otherwise fold in score deltas without a count.
+    """
+    try:
+        db = get_database()
+        if await db.source_bias_aggregates.find_one({}, {"_id": 1}):
+            return 0
+        if not await db.articles.find_one({"bias_index": {"$ne": None}}, {"_id": 1}):
+            return 0
+        
+        rebuilt = await asyncio.to_thread(rebuild_source_aggregates, get_sync_database())
+        print(f"Built {rebuilt} source aggregates from existing article scores")
+        return rebuilt
+    except Exception as e:
+        print(f"Warning: could not bootstrap source aggregates: {e}")
+        return 0
@@ -0,0 +1,161 @@
+from typing import List, Dict, Optional
+from datetime import datetime
+import asyncio
+import numpy as np
+from app.services.embeddings.embedding_service import EmbeddingService
+from app.services.embeddings.vector_store import VectorStore
+from app.core.config import settings
+from app.core.database import get_database
+from bson import ObjectId, Binary
+
+
+class ArticleIndexer:
+    """Chunks and embeds articles, storing chunks in MongoDB and vectors in the vector store
+    
+    Chunk vectors are also kept in the ``chunk_embeddings`` collection (one
+    float32 matrix per article) so cluster-level analysis can reuse them
+    without calling the model or the vector store again.
+    """
+    
+    def __init__(
+        self,
+        embedding_service: Optional[EmbeddingService] = None,
+        vector_store: Optional[VectorStore] = None
+    ):
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.vector_store = vector_store or VectorStore()
+    
+    async def index_articles(self, articles: List[Dict], force: bool = False) -> int:
+        """Embed and store articles, skipping ones that are already indexed
+        
+        Near-duplicates reuse the chunks of their canonical article and get
+        no vectors of their own; clustering works on canonical ids.
+        Returns the number of articles embedded.
+        """
+        vectors = []
+        db = get_database()
+        indexed = 0
+        
+        for article in articles:
+            if article.get("chunks") and not force:
+                continue
+            
+            article_id = str(article.get("id") or article.get("_id"))
+            
+            if article.get("duplicate_of"):
+                canonical = await db.articles.find_one(
+                    {"_id": ObjectId(article["duplicate_of"])},
+                    {"chunks": 1}
+                )
+                if canonical and canonical.get("chunks"):
+                    article["chunks"] = canonical["chunks"]
+                    await db.articles.update_one(
+                        {"_id": ObjectId(article_id)},
+                        {"$set": {"chunks": canonical["chunks"]}}
+                    )
+                    continue
+            article_text = article.get("text", "")
+            article_source = article.get("source", "")
+            published_at = article.get("published_at")
+            
+            # Chunk and embed article off the event loop
+            chunks = await asyncio.to_thread(self.embedding_service.embed_article, article_text)
+            
+            # Store chunks in article metadata
+            chunks_data = [
+                {
+                    "chunk_id": chunk["chunk_id"],
+                    "text": chunk["text"],
+                    "start": chunk["start"],
+                    "end": chunk["end"]
+                }
+                for chunk in chunks
+            ]
+            
+            # Update article in MongoDB
+            await db.articles.update_one(
+                {"_id": ObjectId(article_id)},
+                {"$set": {"chunks": chunks_data}}
+            )
+            article["chunks"] = chunks_data
+            await self._store_chunk_embeddings(
+                article_id,
+                np.array([chunk["embedding"] for chunk in chunks], dtype=np.float32)
+            )
+            indexed += 1
+            
+            # Prepare vectors for Pinecone
+            for chunk in chunks:
+                vectors.append({
+                    "id": f"{article_id}_{chunk['chunk_id']}",
+                    "values": chunk["embedding"],
+                    "metadata": {
+                        "article_id": article_id,
+                        "chunk_id": chunk["chunk_id"],
+                        "text": chunk["text"][:500],  # Truncate for metadata
+                        "source": article_source,
+                        "published_at": published_at.isoformat() if published_at else None
+                    }
+                })
+        
+        # Upsert to vector store
+        if vectors:
+            self.vector_store.upsert_vectors(vectors)
+        
+        return indexed
+    
+    async def load_chunk_embeddings(self, articles: List[Dict]) -> Dict[str, Optional[np.ndarray]]:
+        """Chunk embedding matrix (chunks x dimension) per article id, in one query
+        
+        Near-duplicates fall back to their canonical article's vectors. Articles
+        indexed before vectors were persisted are embedded from their stored
+        chunk texts once and saved; articles without chunks map to None.
+        """
+        db = get_database()
+        
+        ids = set()
+        for article in articles:
+            ids.add(str(article.get("id") or article.get("_id")))
+            if article.get("duplicate_of"):
+                ids.add(article["duplicate_of"])
+        
+        stored = {}
+        async for doc in db.chunk_embeddings.find({"_id": {"$in": list(ids)}, "model": settings.EMBEDDING_MODEL}):
+            stored[doc["_id"]] = np.frombuffer(doc["embeddings"], dtype=np.float32).reshape(doc["count"], doc["dimension"])
+        
+        embeddings = {}
+        for article in articles:
+            article_id = str(article.get("id") or article.get("_id"))
+            matrix = stored.get(article_id)
+            if matrix is None and article.get("duplicate_of"):
+                matrix = stored.get(article["duplicate_of"])
+            
+            if matrix is None and article.get("chunks"):
+                texts = [chunk["text"] for chunk in article["chunks"]]
+                matrix = np.array(
+                    await asyncio.to_thread(self.embedding_service.embed_batch, texts),
+                    dtype=np.float32
+                )
+                await self._store_chunk_embeddings(article_id, matrix)
+                stored[article_id] = matrix
+            
+            embeddings[article_id] = matrix
+        
+        return embeddings
+    
+    async def _store_chunk_embeddings(self, article_id: str, matrix: np.ndarray):
+        if matrix.size == 0:
+            return
+        db = get_database()
+        await db.chunk_embeddings.replace_one(
+            {"_id": article_id},
+            {
+                "_id": article_id,
+                "model": settings.EMBEDDING_MODEL,
+                "count": matrix.shape[0],
+                "dimension": matrix.shape[1],
+                "embeddings": Binary(matrix.astype(np.float32).tobytes()),
+                "created_at": datetime.utcnow()
+            },
+            upsert=True
+        )
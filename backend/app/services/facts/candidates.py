@@ -0,0 +1,85 @@
+from typing import List, Dict, Iterator, Tuple
+from itertools import islice
+import heapq
+import re
+from app.services.nlp.nlp_service import AnalysisDocument
+
+
+# Entity types that make a sentence likely to state a fact
+FACT_ENTITY_LABELS = {"PERSON", "ORG", "GPE", "EVENT", "DATE"}
+
+PLAIN_SENTENCE_PATTERN = re.compile(r"[^.]+")
+
+# (entity density, candidate fact)
+ScoredCandidate = Tuple[float, Dict]
+
+
+def _candidate(article: Dict, sentence: str, entities: Dict[str, List[str]]) -> Dict:
+    return {
+        "fact": sentence.strip(),
+        "source_url": article.get("url"),
+        "source_name": article.get("source"),
+        "entities": entities
+    }
+
+
+def parsed_candidates(article: Dict, document: AnalysisDocument, max_sentences: int) -> Iterator[ScoredCandidate]:
+    """Sentences naming at least one fact entity, scored by entities per token
+    
+    Walks the parse lazily and stops after ``max_sentences`` sentences, so
+    long articles cost no more than short ones.
+    """
+    if document.doc is None:
+        yield from plain_candidates(article, document.text, max_sentences)
+        return
+    
+    for sent in islice(document.doc.sents, max_sentences):
+        sentence = sent.text
+        if len(sentence) <= 20:
+            continue
+        entities = {}
+        for ent in sent.ents:
+            if ent.label_ in FACT_ENTITY_LABELS:
+                entities.setdefault(ent.label_, [])
+                if ent.text not in entities[ent.label_]:
+                    entities[ent.label_].append(ent.text)
+        if entities:
+            count = sum(len(names) for names in entities.values())
+            yield count / max(len(sent), 1), _candidate(article, sentence, entities)
+
+
+def plain_candidates(article: Dict, text: str, max_sentences: int) -> Iterator[ScoredCandidate]:
+    """Period-split sentences with digits or an early capital, scored by the share of such words
+    
+    Used without spaCy; splits lazily and stops after ``max_sentences`` sentences.
+    """
+    for match in islice(PLAIN_SENTENCE_PATTERN.finditer(text), max_sentences):
+        sentence = match.group(0)
+        if len(sentence.strip()) <= 30:
+            continue
+        if any(c.isdigit() for c in sentence) or any(c.isupper() for c in sentence[:10]):
+            words = sentence.split()
+            marked = sum(1 for w in words if w[:1].isupper() or any(c.isdigit() for c in w))
+            yield marked / max(len(words), 1), _candidate(article, sentence, {})
+
+
+def sample_candidates(streams: List[Iterator[ScoredCandidate]], quota: int, limit: int) -> List[Dict]:
+    """Round-robin over articles, best-scored sentence of each first
+    
+    Each article contributes at most ``quota`` candidates (its densest),
+    so one long article cannot crowd out the others; ``limit`` caps the
+    total once every article has had its turn at each rank.
+    """
+    ranked = [
+        [candidate for _, candidate in heapq.nlargest(quota, stream, key=lambda item: item[0])]
+        for stream in streams
+    ]
+    
+    facts = []
+    for rank in range(quota):
+        for selected in ranked:
+            if rank < len(selected):
+                facts.append(selected[rank])
+                if len(facts) >= limit:
+                    return facts
+    return facts
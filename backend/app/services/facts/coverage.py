@@ -0,0 +1,88 @@
+from typing import List, Dict
+import numpy as np
+
+
+# Cell states
+SUPPORTED = 1
+ABSENT = 0
+CONTRADICTED = -1
+
+
+class FactCoverageMatrix:
+    """Which articles in a cluster support, contradict or omit each fact
+    
+    One int8 matrix (facts x articles) built once per cluster. Omission,
+    consistency-vs-majority and the heatmap payload are all read off it.
+    """
+    
+    def __init__(self, facts: List[Dict], articles: List[Dict], states: np.ndarray):
+        self.facts = facts
+        self.articles = articles
+        self.states = states.astype(np.int8)
+    
+    @classmethod
+    def from_presence(cls, facts: List[Dict], articles: List[Dict], presence: np.ndarray) -> "FactCoverageMatrix":
+        """Build from a boolean fact x article presence matrix
+        
+        An article that mentions a fact counts as supporting it unless the
+        fact's verification named the article (by URL) or its source among
+        the contradicting ones.
+        """
+        states = np.where(presence, SUPPORTED, ABSENT).astype(np.int8)
+        
+        for i, fact in enumerate(facts):
+            contradicting = set(fact.get("contradicting_sources") or [])
+            if not contradicting:
+                continue
+            for j, article in enumerate(articles):
+                if presence[i, j] and (article.get("url") in contradicting or article.get("source") in contradicting):
+                    states[i, j] = CONTRADICTED
+        
+        return cls(facts, articles, states)
+    
+    def omission_scores(self) -> np.ndarray:
+        """Fraction of the cluster's facts each article leaves out"""
+        if not self.facts:
+            return np.zeros(len(self.articles))
+        return (self.states == ABSENT).mean(axis=0)
+    
+    def majority(self) -> np.ndarray:
+        """Majority state per fact among the articles that cover it (0 on a tie)"""
+        return np.sign(self.states.sum(axis=1, dtype=np.int32)).astype(np.int8)
+    
+    def consistency_scores(self) -> np.ndarray:
+        """Fraction of the facts an article covers where it disagrees with the majority
+        
+        0 means the article agrees with the other sources on everything it
+        reports; facts nobody covers, or with no clear majority, don't count.
+        """
+        majority = self.majority()[:, None]
+        covered = self.states != ABSENT
+        decided = covered & (majority != ABSENT)
+        disagree = decided & (self.states != majority)
+        return disagree.sum(axis=0) / np.maximum(decided.sum(axis=0), 1)
+    
+    def missing_facts(self, article_index: int) -> List[Dict]:
+        return [fact for fact, state in zip(self.facts, self.states[:, article_index]) if state == ABSENT]
+    
+    def heatmap(self) -> Dict:
+        """Fact x source states for the frontend heatmap
+        
+        Articles from the same source are merged: a source supports a fact if
+        any of its articles does, otherwise contradicts it if any does.
+        """
+        sources = list(dict.fromkeys(a.get("source", "Unknown") for a in self.articles))
+        columns = {source: [] for source in sources}
+        for j, article in enumerate(self.articles):
+            columns[article.get("source", "Unknown")].append(j)
+        
+        by_source = np.zeros((len(self.facts), len(sources)), dtype=np.int8)
+        for k, source in enumerate(sources):
+            block = self.states[:, columns[source]]
+            by_source[:, k] = np.where(block.max(axis=1) > 0, SUPPORTED, block.min(axis=1))
+        
+        return {
+            "facts": [fact.get("fact", "") for fact in self.facts],
+            "sources": sources,
+            "states": by_source.tolist()
+        }
@@ -1,187 +1,394 @@
-from typing import List, Dict
-import spacy
-import httpx
+from typing import List, Dict, Optional
+import asyncio
+import numpy as np
 from app.core.config import settings
+from app.services.llm.client import LLMClient, LLMError, get_llm_client, estimate_tokens
+from app.services.llm.budget import QueryBudget, current_budget
+from app.services.facts.verification import (
+    pack_fact_groups,
+    create_batch_prompt,
+    parse_batch_response,
+    verification_result,
+    lexical_agreement,
+    RESPONSE_TOKENS_PER_ITEM
+)
+from app.services.facts.nli import get_nli_verifier
+from app.services.facts.fact_store import FactStore
+from app.services.facts.grouping import group_by_keywords, group_by_embedding, largest_first
+from app.services.facts.candidates import parsed_candidates, plain_candidates, sample_candidates
+from app.services.nlp.nlp_service import NLPService, AnalysisDocument, get_nlp_service
 
 
 class FactExtractor:
-    def __init__(self):
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            print("spaCy model not found. Run: python -m spacy download en_core_web_sm")
-            self.nlp = None
+    def __init__(self, nlp_service: Optional[NLPService] = None, embedding_service=None):
+        # Shared spaCy parses, also used by BiasAnalyzer
+        self.nlp_service = nlp_service or get_nlp_service()
+        self.nlp = self.nlp_service.nlp
+        
+        # Only needed for FACT_GROUPING_MODE=embedding
+        self.embedding_service = embedding_service
+        
+        # Shared, rate-limited LLM client
+        self.llm: LLMClient = get_llm_client()
         
-        self.groq_api_key = settings.GROQ_API_KEY
-        self.groq_api_url = settings.GROQ_API_URL
+        # Verdicts from earlier queries
+        self.fact_store = FactStore(embedding_service)
     
     async def extract_facts_from_articles(
         self,
-        articles: List[Dict]
+        articles: List[Dict],
+        documents: Optional[List[AnalysisDocument]] = None
     ) -> List[Dict]:
         """Extract facts from a list of articles"""
         # Step 1: Extract candidate facts using NER
-        candidate_facts = self._extract_candidate_facts(articles)
+        candidate_facts = self._extract_candidate_facts(articles, documents)
+        
+        # Step 2: Reuse verdicts for facts already in the store
+        known_facts, unseen_facts = await self.fact_store.match(candidate_facts)
         
-        # Step 2: Verify facts across sources using LLM
-        verified_facts = await self._verify_facts_with_llm(candidate_facts, articles)
+        # Step 3: Verify the rest across sources (lexical agreement, NLI, then LLM)
+        verified_facts = await self._verify_facts(unseen_facts, articles)
         
-        return verified_facts
+        await self.fact_store.remember(known_facts + verified_facts)
+        
+        return known_facts + verified_facts
     
-    def _extract_candidate_facts(self, articles: List[Dict]) -> List[Dict]:
-        """Extract candidate facts using NER"""
+    def _extract_candidate_facts(
+        self,
+        articles: List[Dict],
+        documents: Optional[List[AnalysisDocument]] = None
+    ) -> List[Dict]:
+        """Extract candidate facts using NER, sampled fairly across articles
+        
+        Each article offers its densest entity-bearing sentences among the
+        first FACT_SCAN_SENTENCES, up to FACT_CANDIDATES_PER_ARTICLE, and
+        candidates are taken round-robin until FACT_CANDIDATE_LIMIT.
+        """
         if not self.nlp:
             return self._simple_fact_extraction(articles)
         
-        facts = []
+        if documents is None:
+            # Only the scanned prefix of each article needs a parse
+            documents = self.nlp_service.parse_many([
+                a.get("text", "")[:settings.FACT_SCAN_CHARS] for a in articles
+            ])
         
-        for article in articles:
-            text = article.get("text", "")
-            doc = self.nlp(text)
-            
-            # Extract entities and key sentences
-            entities = {}
-            for ent in doc.ents:
-                if ent.label_ in ["PERSON", "ORG", "GPE", "EVENT", "DATE"]:
-                    if ent.label_ not in entities:
-                        entities[ent.label_] = []
-                    entities[ent.label_].append(ent.text)
-            
-            # Extract sentences with entities (likely factual)
-            for sent in doc.sents:
-                has_entity = any(ent in sent.text for ents in entities.values() for ent in ents)
-                if has_entity and len(sent.text) > 20:
-                    facts.append({
-                        "fact": sent.text.strip(),
-                        "source_url": article.get("url"),
-                        "source_name": article.get("source"),
-                        "entities": {k: list(set(v)) for k, v in entities.items()}
-                    })
-        
-        return facts[:50]  # Limit for performance
+        return sample_candidates(
+            [
+                parsed_candidates(article, document, settings.FACT_SCAN_SENTENCES)
+                for article, document in zip(articles, documents)
+            ],
+            quota=settings.FACT_CANDIDATES_PER_ARTICLE,
+            limit=settings.FACT_CANDIDATE_LIMIT
+        )
     
     def _simple_fact_extraction(self, articles: List[Dict]) -> List[Dict]:
         """Simple fact extraction without spaCy"""
-        facts = []
-        
-        for article in articles:
-            text = article.get("text", "")
-            sentences = text.split('.')
-            
-            for sent in sentences:
-                if len(sent.strip()) > 30:
-                    if any(c.isdigit() for c in sent) or any(c.isupper() for c in sent[:10]):
-                        facts.append({
-                            "fact": sent.strip(),
-                            "source_url": article.get("url"),
-                            "source_name": article.get("source"),
-                            "entities": {}
-                        })
-        
-        return facts[:50]
+        return sample_candidates(
+            [
+                plain_candidates(article, article.get("text", ""), settings.FACT_SCAN_SENTENCES)
+                for article in articles
+            ],
+            quota=settings.FACT_CANDIDATES_PER_ARTICLE,
+            limit=settings.FACT_CANDIDATE_LIMIT
+        )
     
-    async def _verify_facts_with_llm(
+    async def _verify_facts(
         self,
         candidate_facts: List[Dict],
         articles: List[Dict]
     ) -> List[Dict]:
-        """Verify facts using LLM cross-checking"""
-        verified_facts = []
+        """Verify fact groups through a cascade, cheapest tier first
         
+        1. lexical: two or more sources carry the sentence (near-)verbatim
+        2. nli: a local cross-encoder finds the other sources clearly entail
+           or contradict it
+        3. llm: everything still ambiguous
+        """
         # Group similar facts
-        fact_groups = self._group_similar_facts(candidate_facts)
+        fact_groups = (await asyncio.to_thread(self._group_similar_facts, candidate_facts))[:settings.FACT_VERIFY_MAX_GROUPS]  # Limit for cost
         
-        for fact_group in fact_groups[:20]:  # Limit for cost
-            prompt = self._create_verification_prompt(fact_group, articles)
-            
-            try:
-                # Use Groq API
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{self.groq_api_url}/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {self.groq_api_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            # CHANGED: Updated from mixtral-8x7b-32768 to llama-3.3-70b-versatile
-                            "model": "llama-3.3-70b-versatile",
-                            "messages": [
-                                {
-                                    "role": "system",
-                                    "content": "You are a fact verification assistant. Analyze candidate facts and determine their status across sources."
-                                },
-                                {
-                                    "role": "user",
-                                    "content": prompt
-                                }
-                            ],
-                            "temperature": 0.1,
-                            "max_tokens": 1000
-                        },
-                        timeout=30.0
-                    )
-                    
-                    if response.status_code != 200:
-                        print(f"Groq API Error in Verification ({response.status_code}): {response.text}")
-                        # Continue to next fact instead of crashing
-                        continue
-
-                    data = response.json()
-                    
-                    # Parse response
-                    content = data["choices"][0]["message"]["content"]
-                    result = self._parse_verification_response(
-                        content,
-                        fact_group,
-                        articles
-                    )
-                
-                if result:
-                    verified_facts.append(result)
-            
-            except Exception as e:
-                print(f"Error in LLM verification: {str(e)}")
-                # Fallback: mark as unverified
-                if fact_group:
-                    verified_facts.append({
-                        "fact": fact_group[0].get("fact", ""),
-                        "sources": [f.get("source_url", "") for f in fact_group],
-                        "quotes": [f.get("fact", "") for f in fact_group[:2]],
-                        "status": "unverified"
-                    })
-        
-        return verified_facts
+        results = {}
+        for i, fact_group in enumerate(fact_groups):
+            agreeing = lexical_agreement(fact_group, settings.FACT_LEXICAL_MATCH_THRESHOLD)
+            if len(agreeing) >= 2:
+                results[i] = verification_result(
+                    fact_group,
+                    "supported",
+                    f"Reported near-verbatim by {len(agreeing)} sources",
+                    tier="lexical"
+                )
+        
+        remaining = [i for i in range(len(fact_groups)) if i not in results]
+        nli_results = await asyncio.to_thread(self._verify_with_nli, [fact_groups[i] for i in remaining])
+        for i, result in zip(remaining, nli_results):
+            if result is not None:
+                results[i] = result
+        
+        escalated = [i for i in range(len(fact_groups)) if i not in results]
+        llm_results = await self._verify_facts_with_llm([fact_groups[i] for i in escalated], articles)
+        results.update(zip(escalated, llm_results))
+        
+        return [results[i] for i in range(len(fact_groups))]
     
-    def _group_similar_facts(self, facts: List[Dict]) -> List[List[Dict]]:
-        """Group similar facts together"""
-        groups = []
-        used = set()
+    def _verify_with_nli(self, fact_groups: List[List[Dict]]) -> List[Optional[Dict]]:
+        """Decide groups whose other sources clearly entail or contradict the fact
         
-        for i, fact in enumerate(facts):
-            if i in used:
-                continue
-            
-            group = [fact]
-            used.add(i)
-            
-            fact_keywords = set(self._extract_keywords(fact.get("fact", "")))
+        Scores every (source excerpt, fact) pair of every group in one batch.
+        None where the evidence is mixed or weak, or the group has one source.
+        """
+        nli = get_nli_verifier() if fact_groups else None
+        if nli is None:
+            return [None] * len(fact_groups)
+        
+        pairs = []
+        owners = []
+        for g, fact_group in enumerate(fact_groups):
+            hypothesis = fact_group[0].get("fact", "")
+            seen = {fact_group[0].get("source_url", "")}
+            for fact in fact_group[1:]:
+                url = fact.get("source_url", "")
+                if url in seen:
+                    continue  # a source does not corroborate itself
+                seen.add(url)
+                pairs.append((fact.get("fact", "")[:512], hypothesis[:512]))
+                owners.append((g, fact))
+        
+        entailing = [[] for _ in fact_groups]
+        contradicting = [[] for _ in fact_groups]
+        for (g, fact), scores in zip(owners, nli.score(pairs)):
+            if scores.get("entailment", 0.0) >= settings.FACT_NLI_THRESHOLD:
+                entailing[g].append(fact)
+            elif scores.get("contradiction", 0.0) >= settings.FACT_NLI_THRESHOLD:
+                contradicting[g].append(fact)
+        
+        results = []
+        for g, fact_group in enumerate(fact_groups):
+            if entailing[g] and not contradicting[g]:
+                results.append(verification_result(
+                    fact_group,
+                    "supported",
+                    f"Entailed by {len(entailing[g])} other source(s)",
+                    quotes=[f.get("fact", "")[:100] for f in entailing[g][:2]],
+                    tier="nli"
+                ))
+            elif contradicting[g] and not entailing[g]:
+                results.append(verification_result(
+                    fact_group,
+                    "contradicted",
+                    f"Contradicted by {len(contradicting[g])} other source(s)",
+                    contradicting=[f.get("source_url", "") for f in contradicting[g]],
+                    tier="nli"
+                ))
+            else:
+                results.append(None)
+        
+        return results
+    
+    async def _verify_facts_with_llm(
+        self,
+        fact_groups: List[List[Dict]],
+        articles: List[Dict]
+    ) -> List[Dict]:
+        """Verify fact groups using LLM cross-checking
+        
+        Groups are verified concurrently (bounded by the shared LLM client).
+        Groups a batched reply leaves out or answers malformed are re-asked
+        one by one as calls of their own. Anything still running at
+        FACT_VERIFY_TIMEOUT is cancelled and reported as unverified, without
+        losing what finished batches already answered. Under a query budget,
+        only the batches that fit (largest groups first) are sent, and the
+        deadline caps the timeout.
+        """
+        if not fact_groups:
+            return []
+        
+        if settings.FACT_VERIFY_MODE == "batched":
+            batches = pack_fact_groups(
+                fact_groups,
+                token_budget=settings.FACT_VERIFY_BATCH_TOKENS,
+                max_items=settings.FACT_VERIFY_BATCH_SIZE
+            )
+        else:
+            batches = [[i] for i in range(len(fact_groups))]
+        
+        timeout = settings.FACT_VERIFY_TIMEOUT
+        query_budget = current_budget.get()
+        if query_budget is not None:
+            batches = self._affordable_batches(batches, fact_groups, articles, query_budget)
+            remaining_time = query_budget.remaining_time()
+            if remaining_time is not None:
+                timeout = min(timeout, remaining_time)
+        
+        # Task -> indices of the fact groups it verifies
+        task_batches = {
+            asyncio.create_task(self._verify_batch([fact_groups[i] for i in batch], articles)): batch
+            for batch in batches
+        }
+        pending = set(task_batches)
+        results = {}
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while pending:
+            remaining_time = deadline - loop.time()
+            if remaining_time <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining_time, return_when=asyncio.FIRST_COMPLETED)
             
-            for j, other_fact in enumerate(facts[i+1:], start=i+1):
-                if j in used:
+            for task in done:
+                if task.exception() is not None:
                     continue
+                batch = task_batches[task]
+                answered = task.result()
+                results.update((batch[k], result) for k, result in answered.items())
                 
-                other_keywords = set(self._extract_keywords(other_fact.get("fact", "")))
-                
-                # If significant overlap, group together
-                overlap = len(fact_keywords & other_keywords)
-                if overlap >= 2:
-                    group.append(other_fact)
-                    used.add(j)
-            
-            groups.append(group)
+                missing = [i for k, i in enumerate(batch) if k not in answered]
+                if missing:
+                    print(f"Re-asking {len(missing)} of {len(batch)} facts individually")
+                for i in missing:
+                    retry = asyncio.create_task(self._verify_batch([fact_groups[i]], articles))
+                    task_batches[retry] = [i]
+                    pending.add(retry)
         
-        return groups
+        if pending:
+            print(f"Fact verification timed out; cancelling {len(pending)} of {len(task_batches)} calls")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if query_budget is not None:
+                query_budget.degrade(
+                    "verification",
+                    "deadline" if timeout < settings.FACT_VERIFY_TIMEOUT else "timeout",
+                    cancelled_calls=len(pending)
+                )
+        
+        return [
+            results.get(i) or self._unverified_fact(fact_group)
+            for i, fact_group in enumerate(fact_groups)
+        ]
+    
+    def _affordable_batches(
+        self,
+        batches: List[List[int]],
+        fact_groups: List[List[Dict]],
+        articles: List[Dict],
+        query_budget: QueryBudget
+    ) -> List[List[int]]:
+        """Leading batches whose estimated cost fits the budget, keeping LLM_SUMMARY_RESERVE_TOKENS back"""
+        spend = settings.LLM_SUMMARY_RESERVE_TOKENS
+        for k, batch in enumerate(batches):
+            spend += self._estimate_batch_tokens([fact_groups[i] for i in batch], articles)
+            reason = query_budget.blocked_by(spend)
+            if reason:
+                skipped = sum(len(b) for b in batches[k:])
+                print(f"LLM budget ({reason}): leaving {skipped} of {len(fact_groups)} fact groups unverified")
+                query_budget.degrade("verification", reason, unverified_groups=skipped, fact_groups=len(fact_groups))
+                return batches[:k]
+        return batches
+    
+    def _estimate_batch_tokens(self, fact_groups: List[List[Dict]], articles: List[Dict]) -> int:
+        """Prompt plus reserved completion tokens of one verification call (as LLMClient budgets it)"""
+        if len(fact_groups) == 1:
+            return estimate_tokens(self._create_verification_prompt(fact_groups[0], articles)) + 1000
+        return estimate_tokens(create_batch_prompt(fact_groups)) + RESPONSE_TOKENS_PER_ITEM * len(fact_groups) + 100
+    
+    async def _verify_batch(self, fact_groups: List[List[Dict]], articles: List[Dict]) -> Dict[int, Dict]:
+        """Verify several fact groups in one JSON-answered call
+        
+        Results by position in ``fact_groups``; groups the reply leaves out or
+        answers malformed are missing, for the caller to re-ask. A single
+        group always gets a result (unverified if its call fails).
+        """
+        if len(fact_groups) == 1:
+            return {0: await self._verify_fact_group(fact_groups[0], articles)}
+        
+        try:
+            content = await self.llm.chat(
+                [
+                    {
+                        "role": "system",
+                        "content": "You are a fact verification assistant. Analyze candidate facts and determine their status across sources. Reply with JSON only."
+                    },
+                    {
+                        "role": "user",
+                        "content": create_batch_prompt(fact_groups)
+                    }
+                ],
+                max_tokens=RESPONSE_TOKENS_PER_ITEM * len(fact_groups) + 100,
+                stage="verification"
+            )
+            items = parse_batch_response(content, len(fact_groups))
+        except LLMError as e:
+            print(f"Error in batched LLM verification: {str(e)}")
+            items = {}
+        
+        return {
+            item_id - 1: verification_result(
+                fact_groups[item_id - 1],
+                item.status,
+                item.justification,
+                item.quotes,
+                item.contradicting
+            )
+            for item_id, item in items.items()
+        }
+    
+    async def _verify_fact_group(self, fact_group: List[Dict], articles: List[Dict]) -> Dict:
+        """Verify one group of similar facts; unverified if the LLM call fails"""
+        prompt = self._create_verification_prompt(fact_group, articles)
+        
+        try:
+            content = await self.llm.chat(
+                [
+                    {
+                        "role": "system",
+                        "content": "You are a fact verification assistant. Analyze candidate facts and determine their status across sources."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                max_tokens=1000,
+                stage="verification"
+            )
+        except LLMError as e:
+            print(f"Error in LLM verification: {str(e)}")
+            return self._unverified_fact(fact_group)
+        
+        return self._parse_verification_response(content, fact_group, articles)
+    
+    def _unverified_fact(self, fact_group: List[Dict]) -> Dict:
+        """Fallback when a group could not be verified"""
+        return verification_result(fact_group, "unverified")
+    
+    def _group_similar_facts(self, facts: List[Dict]) -> List[List[Dict]]:
+        """Group similar facts together, largest groups first
+        
+        Each fact joins the group whose seed fact it is most similar to, by
+        keyword Jaccard (FACT_GROUP_MIN_JACCARD) or, in embedding mode, by
+        embedding cosine (FACT_GROUP_SIMILARITY). Blocking; run it off the
+        event loop.
+        """
+        if not facts:
+            return []
+        
+        if settings.FACT_GROUPING_MODE == "embedding" and self.embedding_service is not None:
+            embeddings = np.array(
+                self.embedding_service.embed_batch([fact.get("fact", "") for fact in facts]),
+                dtype=np.float32
+            )
+            groups = group_by_embedding(embeddings, settings.FACT_GROUP_SIMILARITY)
+        else:
+            groups = group_by_keywords(
+                [set(self._extract_keywords(fact.get("fact", ""))) for fact in facts],
+                min_jaccard=settings.FACT_GROUP_MIN_JACCARD,
+                # Keywords shared by a large share of facts say nothing about which claim they make
+                max_postings=max(50, len(facts) // 10)
+            )
+        
+        return [[facts[i] for i in members] for members in largest_first(groups)]
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract keywords from text"""
@@ -218,6 +425,7 @@ Return your analysis in this format:
 STATUS: [A/B/C]
 JUSTIFICATION: [1-line explanation]
 QUOTES: [up to 2 supporting quotes with source URLs]
+CONTRADICTING: [comma-separated URLs of the sources that contradict the fact, or NONE]
 """
         return prompt
     
@@ -233,6 +441,9 @@ QUOTES: [up to 2 supporting quotes with source URLs]
         status = "unverified"
         justification = ""
         quotes = []
+        contradicting = []
+        
+        sources = [f.get("source_url", "") for f in fact_group]
         
         for line in lines:
             if line.startswith("STATUS:"):
@@ -246,16 +457,11 @@ QUOTES: [up to 2 supporting quotes with source URLs]
             elif line.startswith("QUOTES:"):
                 quotes_text = line.split(":", 1)[1].strip()
                 quotes = [q.strip() for q in quotes_text.split('\n') if q.strip()]
+            elif line.startswith("CONTRADICTING:"):
+                contradicting_text = line.split(":", 1)[1]
+                contradicting = [
+                    url for url in (u.strip(" []") for u in contradicting_text.split(","))
+                    if url in sources
+                ]
         
-        if not quotes:
-            quotes = [f.get("fact", "")[:100] for f in fact_group[:2]]
-        
-        sources = [f.get("source_url", "") for f in fact_group]
-        
-        return {
-            "fact": fact_group[0].get("fact", ""),
-            "sources": sources,
-            "quotes": quotes,
-            "status": status,
-            "justification": justification
-        }
\ No newline at end of file
+        return verification_result(fact_group, status, justification, quotes, contradicting)
@@ -0,0 +1,224 @@
+from typing import List, Dict, Tuple
+from datetime import datetime
+from bson import Binary
+import asyncio
+import hashlib
+import re
+import numpy as np
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.core.database import get_database
+from app.services.ingestion.dedup import MinHasher
+from app.services.facts.verification import verification_result
+
+
+# Verdict fields copied from a verified fact into the store and back
+VERDICT_FIELDS = ["status", "justification", "quotes", "contradicting_sources", "verification_tier"]
+
+
+def normalize_fact(text: str) -> str:
+    """Lowercased words of a fact, single-spaced, without punctuation"""
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def fact_fingerprint(text: str) -> str:
+    return hashlib.sha1(normalize_fact(text).encode("utf-8")).hexdigest()
+
+
+class FactStore:
+    """Verified facts kept across queries in the ``facts`` collection
+    
+    Each fact is stored once under the fingerprint of its normalized text,
+    with a MinHash signature and LSH band keys (the similarity index), an
+    optional embedding, its verification verdict and the URLs of every
+    article seen reporting it. Candidate facts that match a stored fact
+    reuse its verdict instead of being grouped and verified again.
+    """
+    
+    def __init__(self, embedding_service=None):
+        # Word-pair shingles suit single sentences; 4 rows per band puts candidates from ~0.5 Jaccard up
+        self.minhasher = MinHasher(num_perm=64, bands=16, shingle_size=2)
+        self.threshold = settings.FACT_STORE_MATCH_THRESHOLD
+        # Embeddings confirm paraphrases the MinHash misses (FACT_GROUPING_MODE=embedding only)
+        self.embedding_service = embedding_service if settings.FACT_GROUPING_MODE == "embedding" else None
+        self.stats = {"candidates": 0, "matched": 0, "stored": 0}
+    
+    async def match(self, candidate_facts: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Split candidates into verified facts rebuilt from the store and unseen candidates
+        
+        A candidate matches a stored fact with the same fingerprint, or one
+        sharing an LSH band whose MinHash similarity reaches
+        FACT_STORE_MATCH_THRESHOLD (or, with embeddings, whose cosine
+        similarity reaches FACT_GROUP_SIMILARITY). Candidates matching the
+        same stored fact become one verified fact, credited to their sources.
+        """
+        self.stats["candidates"] += len(candidate_facts)
+        if not candidate_facts or not settings.FACT_STORE_ENABLED:
+            return [], candidate_facts
+        
+        fingerprints = [fact_fingerprint(f.get("fact", "")) for f in candidate_facts]
+        signatures = [self.minhasher.signature(normalize_fact(f.get("fact", ""))) for f in candidate_facts]
+        bands = [self.minhasher.band_keys(s) if s is not None else [] for s in signatures]
+        
+        try:
+            db = get_database()
+            cursor = db.facts.find({
+                "$or": [
+                    {"_id": {"$in": list(set(fingerprints))}},
+                    {"bands": {"$in": list({key for keys in bands for key in keys})}}
+                ]
+            })
+            stored = {doc["_id"]: doc async for doc in cursor}
+        except Exception as e:
+            print(f"Warning: fact store lookup failed: {e}")
+            return [], candidate_facts
+        
+        if not stored:
+            return [], candidate_facts
+        
+        by_band = {}
+        for doc_id, doc in stored.items():
+            for key in doc.get("bands", []):
+                by_band.setdefault(key, []).append(doc_id)
+        
+        matches: Dict[int, str] = {}
+        undecided: Dict[int, List[str]] = {}
+        for i, (fingerprint, signature) in enumerate(zip(fingerprints, signatures)):
+            if fingerprint in stored:
+                matches[i] = fingerprint
+                continue
+            
+            candidates = list(dict.fromkeys(doc_id for key in bands[i] for doc_id in by_band.get(key, [])))
+            best_id = None
+            best_similarity = self.threshold
+            for doc_id in candidates:
+                similarity = self.minhasher.similarity(signature, self.minhasher.from_binary(stored[doc_id]["minhash"]))
+                if similarity >= best_similarity:
+                    best_id, best_similarity = doc_id, similarity
+            
+            if best_id is not None:
+                matches[i] = best_id
+            elif candidates:
+                undecided[i] = candidates
+        
+        if undecided and self.embedding_service is not None:
+            matches.update(await self._match_by_embedding(candidate_facts, undecided, stored))
+        
+        groups: Dict[str, List[Dict]] = {}
+        for i, doc_id in matches.items():
+            groups.setdefault(doc_id, []).append(candidate_facts[i])
+        
+        known = []
+        for doc_id, fact_group in groups.items():
+            doc = stored[doc_id]
+            result = verification_result(
+                fact_group,
+                doc["status"],
+                doc.get("justification", ""),
+                doc.get("quotes"),
+                doc.get("contradicting_sources"),
+                tier="store"
+            )
+            result["fact"] = doc["fact"]
+            known.append(result)
+        
+        self.stats["matched"] += len(matches)
+        unseen = [fact for i, fact in enumerate(candidate_facts) if i not in matches]
+        return known, unseen
+    
+    async def _match_by_embedding(
+        self,
+        candidate_facts: List[Dict],
+        undecided: Dict[int, List[str]],
+        stored: Dict[str, Dict]
+    ) -> Dict[int, str]:
+        """Band-sharing stored facts whose embedding is close enough to the candidate's"""
+        indices = list(undecided)
+        embeddings = np.array(
+            await asyncio.to_thread(
+                self.embedding_service.embed_batch,
+                [candidate_facts[i].get("fact", "") for i in indices]
+            ),
+            dtype=np.float32
+        )
+        
+        matches = {}
+        for i, embedding in zip(indices, embeddings):
+            best_id = None
+            best_similarity = settings.FACT_GROUP_SIMILARITY
+            for doc_id in undecided[i]:
+                stored_embedding = stored[doc_id].get("embedding")
+                if stored_embedding is None:
+                    continue
+                similarity = float(np.frombuffer(bytes(stored_embedding), dtype=np.float32) @ embedding)
+                if similarity >= best_similarity:
+                    best_id, best_similarity = doc_id, similarity
+            if best_id is not None:
+                matches[i] = best_id
+        return matches
+    
+    async def remember(self, facts: List[Dict]):
+        """Store newly verified facts and credit stored ones with this query's sources
+        
+        Unverified facts are left out so they get another chance next time.
+        """
+        if not settings.FACT_STORE_ENABLED:
+            return
+        
+        facts = [f for f in facts if f.get("status") and f["status"] != "unverified" and f.get("fact")]
+        new_facts = [f for f in facts if f.get("verification_tier") != "store"]
+        
+        embeddings = {}
+        if new_facts and self.embedding_service is not None:
+            vectors = await asyncio.to_thread(
+                self.embedding_service.embed_batch,
+                [f["fact"] for f in new_facts]
+            )
+            embeddings = {
+                id(f): Binary(np.asarray(v, dtype=np.float32).tobytes())
+                for f, v in zip(new_facts, vectors)
+            }
+        
+        now = datetime.utcnow()
+        operations = []
+        for fact in facts:
+            update = {
+                "$addToSet": {"sources": {"$each": fact.get("sources", [])}},
+                "$set": {"updated_at": now}
+            }
+            if fact.get("verification_tier") != "store":
+                signature = self.minhasher.signature(normalize_fact(fact["fact"]))
+                if signature is None:
+                    continue
+                update["$set"].update({
+                    "fact": fact["fact"],
+                    "text": normalize_fact(fact["fact"]),
+                    "minhash": self.minhasher.to_binary(signature),
+                    "bands": self.minhasher.band_keys(signature),
+                    "verified_at": now,
+                    **{field: fact.get(field) for field in VERDICT_FIELDS}
+                })
+                if id(fact) in embeddings:
+                    update["$set"]["embedding"] = embeddings[id(fact)]
+                update["$setOnInsert"] = {"created_at": now}
+            operations.append(UpdateOne(
+                {"_id": fact_fingerprint(fact["fact"])},
+                update,
+                upsert=fact.get("verification_tier") != "store"
+            ))
+        
+        if not operations:
+            return
+        
+        try:
+            db = get_database()
+            await db.facts.bulk_write(operations, ordered=False)
+            self.stats["stored"] += len(new_facts)
+        except Exception as e:
+            print(f"Warning: could not update the fact store: {e}")
+    
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "match_rate": self.stats["matched"] / self.stats["candidates"] if self.stats["candidates"] else None
+        }
@@ -0,0 +1,72 @@
+from typing import List, Set
+from collections import Counter, defaultdict
+import numpy as np
+
+
+def keyword_jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def group_by_keywords(keyword_sets: List[Set[str]], min_jaccard: float, max_postings: int) -> List[List[int]]:
+    """Seed-based groups of facts by keyword overlap
+    
+    Facts are taken in order; each joins the existing group whose seed (its
+    first fact) has the highest keyword Jaccard similarity with it, if that
+    reaches ``min_jaccard``, and otherwise seeds a new group. Comparing with
+    the seed rather than with any member keeps a group from drifting through
+    chains of pairwise overlaps. Seeds are found through an inverted index;
+    keywords carried by more than ``max_postings`` facts are not indexed.
+    """
+    document_frequency = Counter(keyword for keywords in keyword_sets for keyword in keywords)
+    
+    groups: List[List[int]] = []
+    seed_postings = defaultdict(list)
+    
+    for i, keywords in enumerate(keyword_sets):
+        indexed = [k for k in keywords if document_frequency[k] <= max_postings]
+        candidates = {g for keyword in indexed for g in seed_postings[keyword]}
+        
+        best_group = None
+        best_similarity = min_jaccard
+        for g in sorted(candidates):
+            similarity = keyword_jaccard(keywords, keyword_sets[groups[g][0]])
+            if similarity > best_similarity or (best_group is None and similarity == best_similarity):
+                best_group, best_similarity = g, similarity
+        
+        if best_group is not None:
+            groups[best_group].append(i)
+        else:
+            for keyword in indexed:
+                seed_postings[keyword].append(len(groups))
+            groups.append([i])
+    
+    return groups
+
+
+def group_by_embedding(embeddings: np.ndarray, threshold: float) -> List[List[int]]:
+    """Seed-based groups of facts by embedding cosine similarity (rows normalized)
+    
+    Same rule as group_by_keywords: a fact joins the group whose seed is
+    most similar, if that reaches ``threshold``.
+    """
+    groups: List[List[int]] = []
+    seeds = np.zeros((len(embeddings), embeddings.shape[1] if len(embeddings) else 0), dtype=np.float32)
+    
+    for i, embedding in enumerate(embeddings):
+        if groups:
+            similarity = seeds[:len(groups)] @ embedding
+            best_group = int(np.argmax(similarity))
+            if similarity[best_group] >= threshold:
+                groups[best_group].append(i)
+                continue
+        seeds[len(groups)] = embedding
+        groups.append([i])
+    
+    return groups
+
+
+def largest_first(groups: List[List[int]]) -> List[List[int]]:
+    """Largest groups first; ties keep the order their seeds were seen in"""
+    return sorted(groups, key=lambda members: (-len(members), members[0]))
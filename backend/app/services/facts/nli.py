@@ -0,0 +1,67 @@
+from typing import List, Dict, Tuple, Optional
+import threading
+import numpy as np
+from app.core.config import settings
+
+try:
+    from sentence_transformers import CrossEncoder
+    CROSS_ENCODER_AVAILABLE = True
+except ImportError:
+    CROSS_ENCODER_AVAILABLE = False
+    CrossEncoder = None
+
+
+class NLIVerifier:
+    """Local CPU cross-encoder scoring whether a source excerpt entails or contradicts a fact"""
+    
+    def __init__(self, model_name: Optional[str] = None):
+        self.model = CrossEncoder(model_name or settings.FACT_NLI_MODEL, device="cpu")
+        
+        id2label = getattr(self.model.config, "id2label", None) or {
+            0: "contradiction", 1: "entailment", 2: "neutral"
+        }
+        self.labels = [id2label[i].lower() for i in range(len(id2label))]
+    
+    def score(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, float]]:
+        """Label probabilities for (premise, hypothesis) pairs, in one batched pass"""
+        if not pairs:
+            return []
+        
+        probabilities = self.model.predict(
+            pairs,
+            batch_size=settings.FACT_NLI_BATCH_SIZE,
+            apply_softmax=True,
+            show_progress_bar=False
+        )
+        return [
+            dict(zip(self.labels, map(float, row)))
+            for row in np.atleast_2d(probabilities)
+        ]
+
+
+_nli_verifier: Optional[NLIVerifier] = None
+_nli_failed = False
+_nli_lock = threading.Lock()
+
+
+def get_nli_verifier() -> Optional[NLIVerifier]:
+    """Process-wide NLIVerifier, loaded on first use; None if disabled or it failed to load
+    
+    A failed load is not retried for the life of the process. Safe to call
+    from worker threads.
+    """
+    global _nli_verifier, _nli_failed
+    if _nli_verifier is not None or _nli_failed:
+        return _nli_verifier
+    
+    with _nli_lock:
+        if _nli_verifier is None and not _nli_failed:
+            if not settings.FACT_NLI_ENABLED or not CROSS_ENCODER_AVAILABLE:
+                _nli_failed = True
+                return None
+            try:
+                _nli_verifier = NLIVerifier()
+            except Exception as e:
+                print(f"Warning: NLI model unavailable, skipping the NLI tier: {e}")
+                _nli_failed = True
+    return _nli_verifier
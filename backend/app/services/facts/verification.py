@@ -0,0 +1,171 @@
+from typing import List, Dict, Optional
+import json
+import re
+from pydantic import BaseModel, ValidationError, field_validator
+from app.services.llm.client import estimate_tokens
+
+
+STATUS_CODES = {"A": "supported", "B": "contradicted", "C": "unverified"}
+
+# Completion tokens reserved per fact in a batched reply
+RESPONSE_TOKENS_PER_ITEM = 150
+
+
+class VerificationItem(BaseModel):
+    """One entry of a batched verification reply"""
+    id: int
+    status: str
+    justification: str = ""
+    quotes: List[str] = []
+    contradicting: List[str] = []
+    
+    @field_validator("status")
+    @classmethod
+    def normalize_status(cls, value: str) -> str:
+        value = value.strip()
+        if value.upper() in STATUS_CODES:
+            return STATUS_CODES[value.upper()]
+        if value.lower() in STATUS_CODES.values():
+            return value.lower()
+        raise ValueError(f"unknown status {value!r}")
+
+
+def format_fact_item(item_id: int, fact_group: List[Dict]) -> str:
+    """A fact group as it appears in a batched prompt"""
+    sources_text = "\n".join([
+        f"  Source: {f.get('source_name', 'Unknown')} ({f.get('source_url', '')})\n"
+        f"  Excerpt: {f.get('fact', '')[:200]}"
+        for f in fact_group[:5]
+    ])
+    return f"[{item_id}] Candidate fact: {fact_group[0].get('fact', '')}\n{sources_text}\n"
+
+
+def pack_fact_groups(fact_groups: List[List[Dict]], token_budget: int, max_items: int) -> List[List[int]]:
+    """Greedily pack fact groups (by index, in order) into batches within a prompt token budget
+    
+    A group too large for the budget on its own still gets a batch of one.
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    
+    for i, fact_group in enumerate(fact_groups):
+        tokens = estimate_tokens(format_fact_item(i + 1, fact_group))
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
+    
+    if current:
+        batches.append(current)
+    
+    return batches
+
+
+def create_batch_prompt(fact_groups: List[List[Dict]]) -> str:
+    """Prompt verifying several fact groups at once, answered as a JSON array"""
+    items_text = "\n".join(format_fact_item(i + 1, group) for i, group in enumerate(fact_groups))
+    
+    return f"""You are a fact verification assistant. For each numbered candidate fact below, use its source excerpts to decide whether it is:
+
+A - Supported: appears verbatim or clearly implied by at least one reliable source
+B - Contradicted: some sources claim the opposite
+C - Unverified: no sufficient evidence
+
+{items_text}
+Respond with only a JSON array containing one object per candidate fact, in this form:
+[{{"id": 1, "status": "A", "justification": "1-line explanation", "quotes": ["up to 2 supporting quotes"], "contradicting": ["URLs of sources that contradict the fact"]}}]
+"""
+
+
+def _find_json_array(content: str) -> List:
+    """First JSON array of objects in a reply, tolerating code fences, prose and stray "[n]" around it"""
+    decoder = json.JSONDecoder()
+    start = content.find("[")
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(content, start)
+        except ValueError:
+            value = None
+        if isinstance(value, list) and any(isinstance(raw, dict) for raw in value):
+            return value
+        start = content.find("[", start + 1)
+    return []
+
+
+def parse_batch_response(content: str, expected: int) -> Dict[int, VerificationItem]:
+    """Valid items from a batched reply by their 1-based id; malformed items are dropped"""
+    raw_items = _find_json_array(content)
+    
+    items = {}
+    for raw in raw_items:
+        try:
+            item = VerificationItem.model_validate(raw)
+        except ValidationError:
+            continue
+        if 1 <= item.id <= expected:
+            items.setdefault(item.id, item)
+    
+    return items
+
+
+def verification_result(
+    fact_group: List[Dict],
+    status: str,
+    justification: str = "",
+    quotes: Optional[List[str]] = None,
+    contradicting: Optional[List[str]] = None,
+    tier: str = "llm"
+) -> Dict:
+    """Fact record stored on the cluster; tier names the cascade step that decided it"""
+    sources = [f.get("source_url", "") for f in fact_group]
+    quotes = [q for q in (quotes or []) if q] or [f.get("fact", "")[:100] for f in fact_group[:2]]
+    contradicting = [url for url in (contradicting or []) if url in sources]
+    
+    return {
+        "fact": fact_group[0].get("fact", ""),
+        "sources": sources,
+        "quotes": quotes[:2],
+        "status": status,
+        "justification": justification,
+        "contradicting_sources": contradicting if status == "contradicted" else [],
+        "verification_tier": tier
+    }
+
+
+def _normalized_tokens(text: str) -> set:
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def lexical_agreement(fact_group: List[Dict], threshold: float) -> List[str]:
+    """Sources whose sentence matches the group's fact (near-)verbatim
+    
+    Compares token sets by Jaccard similarity; the group's own fact counts
+    for its source.
+    """
+    reference = _normalized_tokens(fact_group[0].get("fact", ""))
+    if not reference:
+        return []
+    
+    agreeing = {}
+    for fact in fact_group:
+        tokens = _normalized_tokens(fact.get("fact", ""))
+        if tokens and len(reference & tokens) / len(reference | tokens) >= threshold:
+            agreeing.setdefault(fact.get("source_url", ""), fact)
+    return list(agreeing)
+
+
+def verification_report(facts: List[Dict]) -> Dict:
+    """Facts decided per cascade tier, and how many never needed the LLM"""
+    by_tier = {}
+    for fact in facts:
+        tier = fact.get("verification_tier", "llm")
+        by_tier[tier] = by_tier.get(tier, 0) + 1
+    
+    return {
+        "facts": len(facts),
+        "by_tier": by_tier,
+        "llm_calls_avoided": len(facts) - by_tier.get("llm", 0)
+    }
@@ -0,0 +1,151 @@
+from typing import List, Optional, Dict
+from datetime import datetime
+from bson import Binary
+import hashlib
+import re
+import zlib
+import numpy as np
+from app.core.config import settings
+from app.core.database import get_database
+
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, with LSH banding
+    
+    Shingle hashes are 32-bit so that ``a * x + b`` stays inside uint64.
+    """
+    
+    def __init__(
+        self,
+        num_perm: Optional[int] = None,
+        bands: Optional[int] = None,
+        shingle_size: int = 4,
+        seed: int = 1
+    ):
+        self.num_perm = num_perm or settings.DEDUP_NUM_PERM
+        self.bands = bands or settings.DEDUP_LSH_BANDS
+        if self.num_perm % self.bands != 0:
+            raise ValueError("num_perm must be divisible by the number of LSH bands")
+        self.rows = self.num_perm // self.bands
+        self.shingle_size = shingle_size
+        
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, MAX_HASH, size=self.num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, MAX_HASH, size=self.num_perm, dtype=np.uint64)
+    
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return re.findall(r"\w+", text.lower())
+    
+    def shingles(self, text: str) -> np.ndarray:
+        """Unique 32-bit hashes of word n-grams"""
+        tokens = self.tokenize(text)
+        if len(tokens) < self.shingle_size:
+            grams = [" ".join(tokens)] if tokens else []
+        else:
+            grams = [
+                " ".join(tokens[i:i + self.shingle_size])
+                for i in range(len(tokens) - self.shingle_size + 1)
+            ]
+        return np.unique(np.array(
+            [zlib.crc32(gram.encode("utf-8")) for gram in grams],
+            dtype=np.uint64
+        ))
+    
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature, or None for empty text"""
+        shingles = self.shingles(text)
+        if shingles.size == 0:
+            return None
+        
+        # (num_perm x shingles) permuted hashes, minimum per permutation
+        hashed = (np.outer(self.a, shingles) + self.b[:, None]) % MERSENNE_PRIME
+        return (hashed & MAX_HASH).min(axis=1).astype(np.uint32)
+    
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        """One bucket key per LSH band"""
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+    
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(a == b))
+    
+    @staticmethod
+    def to_binary(signature: np.ndarray) -> Binary:
+        return Binary(signature.astype(np.uint32).tobytes())
+    
+    @staticmethod
+    def from_binary(data: bytes) -> np.ndarray:
+        return np.frombuffer(bytes(data), dtype=np.uint32)
+
+
+class DuplicateDetector:
+    """Links syndicated copies of the same story to one canonical article
+    
+    Signatures and LSH band keys live in the ``article_signatures``
+    collection; articles only carry a ``duplicate_of`` pointer.
+    """
+    
+    def __init__(self, minhasher: Optional[MinHasher] = None, threshold: Optional[float] = None):
+        self.minhasher = minhasher or MinHasher()
+        self.threshold = threshold or settings.DEDUP_THRESHOLD
+    
+    async def find_canonical(self, article_id: str, text: str) -> Optional[str]:
+        """Register an article's signature and return its canonical article id
+        
+        Returns None when the article is original (or too short to judge).
+        """
+        if len(self.minhasher.tokenize(text)) < settings.DEDUP_MIN_WORDS:
+            return None
+        
+        signature = self.minhasher.signature(text)
+        if signature is None:
+            return None
+        
+        db = get_database()
+        bands = self.minhasher.band_keys(signature)
+        
+        candidates = await db.article_signatures.find(
+            {"bands": {"$in": bands}, "_id": {"$ne": article_id}},
+            {"minhash": 1, "canonical_id": 1}
+        ).to_list(length=50)
+        
+        best_id = None
+        best_similarity = self.threshold
+        for candidate in candidates:
+            similarity = self.minhasher.similarity(
+                signature,
+                self.minhasher.from_binary(candidate["minhash"])
+            )
+            if similarity >= best_similarity:
+                best_similarity = similarity
+                best_id = candidate.get("canonical_id") or candidate["_id"]
+        
+        await db.article_signatures.replace_one(
+            {"_id": article_id},
+            {
+                "_id": article_id,
+                "bands": bands,
+                "minhash": self.minhasher.to_binary(signature),
+                "canonical_id": best_id,
+                "created_at": datetime.utcnow()
+            },
+            upsert=True
+        )
+        
+        return best_id
+
+
+def duplicate_group_key(article: Dict) -> str:
+    """Id shared by an article and all of its near-duplicates"""
+    return article.get("duplicate_of") or str(article.get("id") or article.get("_id"))
@@ -0,0 +1,144 @@
+from typing import Dict, Optional
+from collections import deque
+from urllib.parse import urlsplit
+import asyncio
+import time
+import numpy as np
+from app.core.config import settings
+
+
+# Observed latencies needed before timeouts adapt to a domain
+MIN_LATENCY_SAMPLES = 5
+
+
+def domain_of(url: str) -> str:
+    netloc = urlsplit(url).netloc.lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+class DomainState:
+    """Politeness, latency and circuit-breaker state for one publisher domain"""
+    
+    def __init__(self, domain: str):
+        self.domain = domain
+        self.lock = asyncio.Lock()
+        self.next_request_at = 0.0
+        self.latencies = deque(maxlen=100)
+        
+        self.consecutive_failures = 0
+        self.circuit_open_until = 0.0
+        # When the half-open trial request was let through (0 = none in flight)
+        self.trial_started_at = 0.0
+        
+        self.successes = 0
+        self.failures = 0
+        self.skipped = 0
+    
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return float(np.percentile(self.latencies, percentile))
+    
+    @property
+    def circuit_state(self) -> str:
+        if self.consecutive_failures < settings.SCRAPE_CIRCUIT_FAILURES:
+            return "closed"
+        if time.monotonic() < self.circuit_open_until:
+            return "open"
+        # Cool-down is over: let a trial request through
+        return "half_open"
+
+
+class DomainScheduler:
+    """Per-domain crawl delay, adaptive timeouts and circuit breaking for the scraper"""
+    
+    def __init__(self):
+        self.domains: Dict[str, DomainState] = {}
+    
+    def _state(self, domain: str) -> DomainState:
+        if domain not in self.domains:
+            self.domains[domain] = DomainState(domain)
+        return self.domains[domain]
+    
+    def allow_request(self, domain: str) -> bool:
+        """False while the domain's circuit is open, and for all but one trial request when half-open
+        
+        A trial that never reports back (no success or failure recorded)
+        stops blocking others after SCRAPE_MAX_TIMEOUT.
+        """
+        state = self._state(domain)
+        circuit = state.circuit_state
+        if circuit == "half_open":
+            now = time.monotonic()
+            if state.trial_started_at and now - state.trial_started_at < settings.SCRAPE_MAX_TIMEOUT:
+                state.skipped += 1
+                return False
+            state.trial_started_at = now
+            return True
+        if circuit == "open":
+            state.skipped += 1
+            return False
+        return True
+    
+    async def wait_for_slot(self, domain: str):
+        """Space out requests to a domain by the crawl delay"""
+        state = self._state(domain)
+        async with state.lock:
+            delay = state.next_request_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            state.next_request_at = time.monotonic() + settings.SCRAPE_CRAWL_DELAY
+    
+    def back_off(self, domain: str, seconds: float):
+        """Push the domain's next request slot out (e.g. on Retry-After)"""
+        state = self._state(domain)
+        state.next_request_at = max(state.next_request_at, time.monotonic() + seconds)
+    
+    def timeout_for(self, domain: str) -> float:
+        """Timeout derived from the domain's p95 latency"""
+        state = self._state(domain)
+        if len(state.latencies) < MIN_LATENCY_SAMPLES:
+            return settings.SCRAPE_TIMEOUT
+        
+        timeout = state.latency_percentile(95) * settings.SCRAPE_TIMEOUT_MULTIPLIER
+        return min(max(timeout, settings.SCRAPE_MIN_TIMEOUT), settings.SCRAPE_MAX_TIMEOUT)
+    
+    def record_success(self, domain: str, latency: float):
+        state = self._state(domain)
+        state.latencies.append(latency)
+        state.successes += 1
+        state.consecutive_failures = 0
+        state.circuit_open_until = 0.0
+        state.trial_started_at = 0.0
+    
+    def record_failure(self, domain: str):
+        state = self._state(domain)
+        state.failures += 1
+        state.consecutive_failures += 1
+        state.trial_started_at = 0.0
+        
+        if state.consecutive_failures >= settings.SCRAPE_CIRCUIT_FAILURES:
+            # Opens the circuit, or re-opens it after a failed half-open trial
+            state.circuit_open_until = time.monotonic() + settings.SCRAPE_CIRCUIT_COOLDOWN
+    
+    def get_stats(self) -> Dict:
+        """Per-domain success rate, latency percentiles and circuit state"""
+        stats = {}
+        for domain, state in self.domains.items():
+            attempts = state.successes + state.failures
+            stats[domain] = {
+                "successes": state.successes,
+                "failures": state.failures,
+                "skipped": state.skipped,
+                "success_rate": state.successes / attempts if attempts else None,
+                "latency_p50": state.latency_percentile(50),
+                "latency_p95": state.latency_percentile(95),
+                "timeout": self.timeout_for(domain),
+                "circuit": state.circuit_state,
+                "consecutive_failures": state.consecutive_failures
+            }
+        return stats
+
+
+# Shared by every scraper in the process so limits apply per domain, not per instance
+domain_scheduler = DomainScheduler()
@@ -1,9 +1,12 @@
 from typing import List, Optional, Dict
 from datetime import datetime
+import asyncio
 from app.services.ingestion.newsapi_client import NewsAPIClient
 from app.services.ingestion.scraper import ArticleScraper
-from app.models.article import Article
+from app.services.ingestion.dedup import DuplicateDetector
+from app.models.article import Article, ARTICLE_RESPONSE_PROJECTION
 from app.core.database import get_database
+from app.core.config import settings
 from bson import ObjectId
 
 
@@ -11,6 +14,7 @@ class IngestionService:
     def __init__(self):
         self.newsapi = NewsAPIClient()
         self.scraper = ArticleScraper()
+        self.duplicate_detector = DuplicateDetector() if settings.DEDUP_ENABLED else None
     
     async def ingest_from_query(
         self,
@@ -18,78 +22,105 @@ class IngestionService:
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
         sources: Optional[List[str]] = None,
-        limit: int = 50
+        limit: Optional[int] = None
     ) -> List[Dict]:
-        """Ingest articles from NewsAPI based on a query"""
-        db = get_database()
-        articles = []
+        """Ingest articles from NewsAPI based on a query
+        
+        Results are streamed page by page and scraping starts as soon as the
+        first articles arrive, bounded by SCRAPE_CONCURRENCY.
+        """
+        semaphore = asyncio.Semaphore(settings.SCRAPE_CONCURRENCY)
+        seen_urls = set()
+        tasks = []
+        
+        async def ingest(article_data: Dict) -> Optional[Dict]:
+            async with semaphore:
+                return await self.ingest_item(article_data)
         
         try:
             # Fetch from NewsAPI
-            newsapi_articles = await self.newsapi.search_articles(
+            async for article_data in self.newsapi.iter_articles(
                 query=query,
                 date_from=date_from,
                 date_to=date_to,
                 sources=sources,
-                page_size=limit
-            )
-            
-            for article_data in newsapi_articles:
-                try:
-                    url = article_data.get("url")
-                    if not url:
-                        continue
-                    
-                    # Check if article already exists
-                    existing = await db.articles.find_one({"url": url})
-                    if existing:
-                        articles.append(existing)
-                        continue
-                    
-                    # Scrape full content if URL is available
-                    scraped_content = None
-                    if url:
-                        scraped_content = await self.scraper.scrape_article(url)
-                    
-                    # Create article record
-                    article_dict = {
-                        "source": article_data.get("source", {}).get("name", "Unknown"),
-                        "url": url,
-                        "title": article_data.get("title", "Untitled"),
-                        "author": article_data.get("author"),
-                        "published_at": self._parse_date(article_data.get("publishedAt")),
-                        "text": scraped_content.get("text") if scraped_content else article_data.get("description", ""),
-                        "raw_html": scraped_content.get("raw_html") if scraped_content else None,
-                        "language": "en",  # Default, can be detected later
-                        "country": None,
-                        "scraped_at": datetime.utcnow(),
-                        "chunks": None,
-                        "ner_entities": None,
-                        "tone_score": None,
-                        "lexical_bias_score": None,
-                        "omission_score": None,
-                        "consistency_score": None,
-                        "bias_index": None,
-                        "cluster_id": None
-                    }
-                    
-                    # Insert into MongoDB
-                    result = await db.articles.insert_one(article_dict)
-                    article_dict["_id"] = result.inserted_id
-                    article_dict["id"] = str(result.inserted_id)
-                    articles.append(article_dict)
-                    
-                except Exception as e:
-                    print(f"Error processing article {url}: {str(e)}")
+                max_articles=limit or settings.INGESTION_MAX_ARTICLES
+            ):
+                url = article_data.get("url")
+                if not url or url in seen_urls:
                     continue
+                seen_urls.add(url)
+                tasks.append(asyncio.create_task(ingest(article_data)))
+        except Exception as e:
+            print(f"Error in ingestion: {str(e)}")
+        
+        results = await asyncio.gather(*tasks)
+        return [article for article in results if article]
+    
+    async def ingest_item(self, article_data: Dict) -> Optional[Dict]:
+        """Store a single NewsAPI-style article, scraping its full text"""
+        db = get_database()
+        url = article_data.get("url")
+        if not url:
+            return None
+        
+        try:
+            # Check if article already exists
+            existing = await db.articles.find_one({"url": url}, ARTICLE_RESPONSE_PROJECTION)
+            if existing:
+                return existing
+            
+            # Scrape full content if URL is available
+            scraped_content = await self.scraper.scrape_article(url)
             
-            return articles
+            # Create article record
+            article_dict = {
+                "source": article_data.get("source", {}).get("name", "Unknown"),
+                "url": url,
+                "title": article_data.get("title", "Untitled"),
+                "author": article_data.get("author"),
+                "published_at": self.parse_date(article_data.get("publishedAt")),
+                "text": scraped_content.get("text") if scraped_content else article_data.get("description", ""),
+                "raw_html_ref": scraped_content.get("raw_html_ref") if scraped_content else None,
+                "language": "en",  # Default, can be detected later
+                "country": None,
+                "scraped_at": datetime.utcnow(),
+                "chunks": None,
+                "ner_entities": None,
+                "tone_score": None,
+                "lexical_bias_score": None,
+                "omission_score": None,
+                "consistency_score": None,
+                "bias_index": None,
+                "cluster_id": None,
+                "duplicate_of": None
+            }
             
+            # Insert into MongoDB
+            result = await db.articles.insert_one(article_dict)
+            article_dict["_id"] = result.inserted_id
+            article_dict["id"] = str(result.inserted_id)
+            
+            # Link syndicated copies to the first copy we stored
+            if self.duplicate_detector and scraped_content:
+                canonical_id = await self.duplicate_detector.find_canonical(
+                    article_dict["id"],
+                    article_dict["text"]
+                )
+                if canonical_id:
+                    article_dict["duplicate_of"] = canonical_id
+                    await db.articles.update_one(
+                        {"_id": result.inserted_id},
+                        {"$set": {"duplicate_of": canonical_id}}
+                    )
+            
+            return article_dict
+        
         except Exception as e:
-            print(f"Error in ingestion: {str(e)}")
-            return articles
+            print(f"Error processing article {url}: {str(e)}")
+            return None
     
-    def _parse_date(self, date_str: Optional[str]) -> datetime:
+    def parse_date(self, date_str: Optional[str]) -> datetime:
         """Parse date string from NewsAPI format"""
         if not date_str:
             return datetime.utcnow()
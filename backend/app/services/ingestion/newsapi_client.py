@@ -1,7 +1,19 @@
 import httpx
-from typing import List, Dict, Optional
+import asyncio
+import math
+from typing import List, Dict, Optional, AsyncIterator
 from datetime import datetime
 from app.core.config import settings
+from app.core.rate_limiter import TokenBucket, parse_retry_after
+
+
+NEWSAPI_MAX_PAGE_SIZE = 100
+
+# Shared by every client in the process so the API quota is respected globally
+newsapi_rate_limiter = TokenBucket(
+    rate=settings.NEWSAPI_REQUESTS_PER_SECOND,
+    capacity=settings.NEWSAPI_BURST
+)
 
 
 class NewsAPIClient:
@@ -20,37 +32,71 @@ class NewsAPIClient:
     ) -> List[Dict]:
         """Search for articles using NewsAPI"""
         async with httpx.AsyncClient() as client:
-            params = {
-                "apiKey": self.api_key,
-                "q": query,
-                "language": language,
-                "pageSize": min(page_size, 100),
-                "sortBy": "publishedAt",
-                "searchIn": "title,description"  # Restrict search to title/desc for better relevance
-            }
+            params = self._search_params(query, date_from, date_to, sources, language)
+            params["pageSize"] = min(page_size, NEWSAPI_MAX_PAGE_SIZE)
             
-            if date_from:
-                params["from"] = date_from.strftime("%Y-%m-%d")
-            if date_to:
-                params["to"] = date_to.strftime("%Y-%m-%d")
-            if sources:
-                params["sources"] = ",".join(sources)
+            data = await self._get(client, "/everything", params)
+            return data.get("articles", [])
+    
+    async def iter_articles(
+        self,
+        query: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        sources: Optional[List[str]] = None,
+        language: str = "en",
+        max_articles: Optional[int] = None
+    ) -> AsyncIterator[Dict]:
+        """Stream search results across pages until `max_articles` is reached
+
+        The first page tells us how many results exist; the remaining pages
+        are then fetched concurrently and yielded as soon as each arrives.
+        """
+        max_articles = max_articles or settings.INGESTION_MAX_ARTICLES
+        page_size = min(max_articles, NEWSAPI_MAX_PAGE_SIZE)
+        params = self._search_params(query, date_from, date_to, sources, language)
+        params["pageSize"] = page_size
+        
+        async with httpx.AsyncClient() as client:
+            first_page = await self._get(client, "/everything", {**params, "page": 1})
+            
+            yielded = 0
+            for article in first_page.get("articles", []):
+                yield article
+                yielded += 1
+                if yielded >= max_articles:
+                    return
+            
+            total = min(first_page.get("totalResults", 0), max_articles)
+            last_page = math.ceil(total / page_size)
+            if last_page <= 1:
+                return
+            
+            semaphore = asyncio.Semaphore(settings.NEWSAPI_PAGE_CONCURRENCY)
+            
+            async def fetch_page(page: int) -> Dict:
+                async with semaphore:
+                    return await self._get(client, "/everything", {**params, "page": page})
+            
+            tasks = [asyncio.create_task(fetch_page(page)) for page in range(2, last_page + 1)]
             
             try:
-                response = await client.get(
-                    f"{self.base_url}/everything",
-                    params=params,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("status") == "ok":
-                    return data.get("articles", [])
-                else:
-                    raise Exception(f"NewsAPI error: {data.get('message', 'Unknown error')}")
-            except httpx.HTTPError as e:
-                raise Exception(f"NewsAPI request failed: {str(e)}")
+                for next_page in asyncio.as_completed(tasks):
+                    try:
+                        data = await next_page
+                    except Exception as e:
+                        print(f"Error fetching NewsAPI page: {str(e)}")
+                        continue
+                    
+                    for article in data.get("articles", []):
+                        yield article
+                        yielded += 1
+                        if yielded >= max_articles:
+                            return
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
     
     async def get_top_headlines(
         self,
@@ -63,7 +109,7 @@ class NewsAPIClient:
         async with httpx.AsyncClient() as client:
             params = {
                 "apiKey": self.api_key,
-                "pageSize": min(page_size, 100)
+                "pageSize": min(page_size, NEWSAPI_MAX_PAGE_SIZE)
             }
             
             if country:
@@ -73,18 +119,72 @@ class NewsAPIClient:
             if sources:
                 params["sources"] = ",".join(sources)
             
+            data = await self._get(client, "/top-headlines", params)
+            return data.get("articles", [])
+    
+    def _search_params(
+        self,
+        query: str,
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        sources: Optional[List[str]],
+        language: str
+    ) -> Dict:
+        """Build /everything query parameters"""
+        params = {
+            "apiKey": self.api_key,
+            "q": query,
+            "language": language,
+            "sortBy": "publishedAt",
+            "searchIn": "title,description"  # Restrict search to title/desc for better relevance
+        }
+        
+        if date_from:
+            params["from"] = date_from.strftime("%Y-%m-%d")
+        if date_to:
+            params["to"] = date_to.strftime("%Y-%m-%d")
+        if sources:
+            params["sources"] = ",".join(sources)
+        
+        return params
+    
+    async def _get(self, client: httpx.AsyncClient, path: str, params: Dict) -> Dict:
+        """Rate-limited GET with backoff on 429 and 5xx responses"""
+        max_retries = settings.NEWSAPI_MAX_RETRIES
+        
+        for attempt in range(max_retries + 1):
+            await newsapi_rate_limiter.acquire()
+            
             try:
                 response = await client.get(
-                    f"{self.base_url}/top-headlines",
+                    f"{self.base_url}{path}",
                     params=params,
                     timeout=30.0
                 )
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("status") == "ok":
-                    return data.get("articles", [])
-                else:
-                    raise Exception(f"NewsAPI error: {data.get('message', 'Unknown error')}")
             except httpx.HTTPError as e:
-                raise Exception(f"NewsAPI request failed: {str(e)}")
\ No newline at end of file
+                if attempt < max_retries:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                raise Exception(f"NewsAPI request failed: {str(e)}")
+            
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == max_retries:
+                    raise Exception(f"NewsAPI request failed after {attempt + 1} attempts ({response.status_code})")
+                
+                delay = parse_retry_after(response.headers.get("Retry-After")) or 2 ** attempt
+                if response.status_code == 429:
+                    # Everyone sharing the quota backs off, not just this request
+                    newsapi_rate_limiter.pause(delay)
+                await asyncio.sleep(delay)
+                continue
+            
+            data = response.json()
+            
+            # Developer plans stop at 100 results; treat it as the end of the stream
+            if data.get("code") == "maximumResultsReached":
+                return {"status": "ok", "totalResults": 0, "articles": []}
+            
+            if response.status_code != 200 or data.get("status") != "ok":
+                raise Exception(f"NewsAPI error: {data.get('message', 'Unknown error')}")
+            
+            return data
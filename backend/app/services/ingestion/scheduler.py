@@ -0,0 +1,280 @@
+from typing import List, Dict, Optional
+from datetime import datetime, timezone
+import asyncio
+import time
+import feedparser
+import httpx
+from app.services.ingestion.ingestion_service import IngestionService
+from app.services.embeddings.article_indexer import ArticleIndexer
+from app.core.database import get_database
+from app.core.config import settings
+
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """MongoDB hands back naive UTC datetimes; compare everything in that form"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class IngestionScheduler:
+    """Polls NewsAPI top headlines and RSS feeds in the background
+    
+    Each feed keeps a watermark (newest published_at ingested) in the
+    ``ingestion_watermarks`` collection so only new items are scraped and
+    embedded on every cycle. Interactive queries then find most articles
+    already stored and indexed.
+    """
+    
+    def __init__(
+        self,
+        ingestion_service: Optional[IngestionService] = None,
+        article_indexer: Optional[ArticleIndexer] = None,
+        poll_interval: Optional[int] = None
+    ):
+        self.ingestion_service = ingestion_service or IngestionService()
+        self.article_indexer = article_indexer or ArticleIndexer()
+        self.poll_interval = poll_interval or settings.INGESTION_POLL_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+        
+        self.metrics = {
+            "started_at": None,
+            "cycles": 0,
+            "items_ingested": 0,
+            "items_failed": 0,
+            "last_cycle": None,
+            "feeds": {}
+        }
+    
+    def start(self):
+        """Start the polling loop on the running event loop"""
+        if self._task and not self._task.done():
+            return
+        self.metrics["started_at"] = datetime.utcnow()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Cancel the polling loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    async def _run(self):
+        while True:
+            try:
+                await self.run_cycle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error in ingestion cycle: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+    
+    def feed_keys(self) -> List[str]:
+        """All configured feeds"""
+        keys = []
+        for country in settings.INGESTION_HEADLINE_COUNTRIES:
+            keys.append(f"newsapi:{country}")
+            for category in settings.INGESTION_HEADLINE_CATEGORIES:
+                keys.append(f"newsapi:{country}:{category}")
+        for url in settings.INGESTION_RSS_FEEDS:
+            keys.append(f"rss:{url}")
+        return keys
+    
+    async def run_cycle(self) -> Dict:
+        """Poll every feed once"""
+        started = time.monotonic()
+        started_at = datetime.utcnow()
+        ingested = 0
+        
+        for feed_key in self.feed_keys():
+            ingested += await self._poll_feed(feed_key)
+        
+        duration = time.monotonic() - started
+        self.metrics["cycles"] += 1
+        self.metrics["items_ingested"] += ingested
+        self.metrics["last_cycle"] = {
+            "started_at": started_at,
+            "duration_seconds": duration,
+            "items_ingested": ingested,
+            "items_per_second": ingested / duration if duration > 0 else 0.0
+        }
+        
+        return self.metrics["last_cycle"]
+    
+    async def _poll_feed(self, feed_key: str) -> int:
+        db = get_database()
+        watermark = await db.ingestion_watermarks.find_one({"_id": feed_key}) or {"_id": feed_key}
+        last_published = watermark.get("last_published_at")
+        feed_metrics = self.metrics["feeds"].setdefault(feed_key, {"items_ingested": 0})
+        
+        try:
+            if feed_key.startswith("rss:"):
+                items, validators = await self._fetch_rss(feed_key[len("rss:"):], watermark)
+            else:
+                items, validators = await self._fetch_headlines(feed_key), {}
+        except Exception as e:
+            print(f"Error polling {feed_key}: {str(e)}")
+            feed_metrics["error"] = str(e)
+            feed_metrics["last_polled_at"] = datetime.utcnow()
+            return 0
+        
+        # Items at or past the watermark (undated ones always), minus URLs already stored
+        new_items = []
+        for item in items:
+            published = self._published_at(item)
+            if published is None or last_published is None or published >= last_published:
+                new_items.append((published, item))
+        
+        urls = [item.get("url") for _, item in new_items if item.get("url")]
+        stored = set()
+        if urls:
+            async for doc in db.articles.find({"url": {"$in": urls}}, {"url": 1}):
+                stored.add(doc["url"])
+        new_items = [(published, item) for published, item in new_items if item.get("url") not in stored]
+        
+        articles = []
+        ingested_times = []
+        failed_times = []
+        for published, item in new_items:
+            article = await self.ingestion_service.ingest_item(item)
+            if article:
+                articles.append(article)
+                if published is not None:
+                    ingested_times.append(published)
+            else:
+                self.metrics["items_failed"] += 1
+                if published is not None:
+                    failed_times.append(published)
+        
+        # Pre-embed so interactive queries skip this step
+        await self.article_indexer.index_articles(articles)
+        
+        # Advance only over dated items that made it in, and never past a failure,
+        # so failed items are picked up again on the next poll
+        now = datetime.utcnow()
+        if ingested_times:
+            newest = max(ingested_times + ([last_published] if last_published else []))
+            if failed_times:
+                newest = min(newest, min(failed_times))
+            last_published = newest
+        
+        await db.ingestion_watermarks.update_one(
+            {"_id": feed_key},
+            {
+                "$set": {"last_published_at": last_published, "last_polled_at": now, **validators},
+                "$inc": {"items_ingested": len(articles)}
+            },
+            upsert=True
+        )
+        
+        delays = [(now - published).total_seconds() for published in ingested_times]
+        feed_metrics.update({
+            "last_polled_at": now,
+            "watermark": last_published,
+            "lag_seconds": (now - last_published).total_seconds() if last_published else None,
+            "mean_ingest_delay_seconds": sum(delays) / len(delays) if delays else None,
+            "error": None
+        })
+        feed_metrics["items_ingested"] += len(articles)
+        
+        return len(articles)
+    
+    def _published_at(self, item: Dict) -> Optional[datetime]:
+        """An item's publish time, or None when it has none we can parse
+        
+        Unlike IngestionService.parse_date this never falls back to now, which
+        would push the watermark past items that are really older.
+        """
+        value = item.get("publishedAt")
+        if not value:
+            return None
+        try:
+            return _to_naive_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+        except ValueError:
+            return None
+    
+    async def _fetch_headlines(self, feed_key: str) -> List[Dict]:
+        parts = feed_key.split(":")
+        country = parts[1]
+        category = parts[2] if len(parts) > 2 else None
+        return await self.ingestion_service.newsapi.get_top_headlines(
+            country=country,
+            category=category
+        )
+    
+    async def _fetch_rss(self, url: str, watermark: Dict):
+        """Fetch an RSS/Atom feed, revalidating with the stored ETag/Last-Modified"""
+        headers = {}
+        if watermark.get("etag"):
+            headers["If-None-Match"] = watermark["etag"]
+        if watermark.get("last_modified"):
+            headers["If-Modified-Since"] = watermark["last_modified"]
+        
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            response = await client.get(url, headers=headers, timeout=30.0)
+        
+        if response.status_code == 304:
+            return [], {}
+        response.raise_for_status()
+        
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+        
+        feed = feedparser.parse(response.content)
+        source_name = feed.feed.get("title") or url
+        
+        items = []
+        for entry in feed.entries:
+            link = entry.get("link")
+            if not link:
+                continue
+            
+            published = entry.get("published_parsed") or entry.get("updated_parsed")
+            items.append({
+                "url": link,
+                "title": entry.get("title", "Untitled"),
+                "author": entry.get("author"),
+                "description": entry.get("summary", ""),
+                "publishedAt": (
+                    datetime(*published[:6]).isoformat() + "Z" if published else None
+                ),
+                "source": {"name": source_name}
+            })
+        
+        return items, validators
+    
+    def get_metrics(self) -> Dict:
+        """Lag and throughput metrics for the status endpoint"""
+        uptime = None
+        if self.metrics["started_at"]:
+            uptime = (datetime.utcnow() - self.metrics["started_at"]).total_seconds()
+        
+        return {
+            **self.metrics,
+            "running": self.running,
+            "poll_interval_seconds": self.poll_interval,
+            "items_per_second": (
+                self.metrics["items_ingested"] / uptime if uptime else 0.0
+            )
+        }
+
+
+# Created on startup so importing this module does not load embedding models
+ingestion_scheduler: Optional[IngestionScheduler] = None
+
+
+def get_ingestion_scheduler() -> IngestionScheduler:
+    global ingestion_scheduler
+    if ingestion_scheduler is None:
+        ingestion_scheduler = IngestionScheduler()
+    return ingestion_scheduler
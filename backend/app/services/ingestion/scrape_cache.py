@@ -0,0 +1,239 @@
+from typing import Optional, Dict, Tuple
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from bson import Binary
+import asyncio
+import gzip
+import hashlib
+import os
+from app.core.config import settings
+from app.core.database import get_database
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ocid", "cmpid", "ref", "smid"}
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so that trivially different links share a cache entry"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "http"
+    netloc = parts.netloc.lower()
+
+    # Drop default ports
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ))
+
+    # Fragments are client-side only
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_key(url: str) -> str:
+    """Stable cache key for a URL"""
+    return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+class HtmlBlobStore:
+    """Compressed raw HTML storage, kept out of the article documents
+
+    Blob references have the form ``<backend>:<codec>:<key>`` so a blob can
+    always be read back even after the configured backend or codec changes.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        directory: Optional[str] = None,
+        codec: Optional[str] = None
+    ):
+        self.backend = backend or settings.HTML_BLOB_BACKEND
+        self.directory = directory or settings.HTML_BLOB_DIR
+
+        codec = codec or settings.HTML_COMPRESSION
+        if codec == "zstd" and not ZSTD_AVAILABLE:
+            codec = "gzip"
+        self.codec = codec
+
+    def _compress(self, html: str) -> bytes:
+        data = html.encode("utf-8")
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    @staticmethod
+    def _decompress(codec: str, data: bytes) -> str:
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard is required to read zstd-compressed HTML")
+            raw = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            raw = gzip.decompress(data)
+        return raw.decode("utf-8", errors="replace")
+
+    def _local_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.html.{self.codec}")
+
+    @staticmethod
+    def _parse_ref(ref: str) -> Tuple[str, str, str]:
+        backend, codec, key = ref.split(":", 2)
+        return backend, codec, key
+
+    async def put(self, key: str, html: str) -> str:
+        """Compress and store HTML, returning a blob reference"""
+        data = self._compress(html)
+
+        if self.backend == "local":
+            path = self._local_path(key)
+            await asyncio.to_thread(self._write_file, path, data)
+        else:
+            db = get_database()
+            await db.html_blobs.replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "codec": self.codec,
+                    "data": Binary(data),
+                    "size": len(html),
+                    "compressed_size": len(data),
+                    "stored_at": datetime.utcnow()
+                },
+                upsert=True
+            )
+
+        return f"{self.backend}:{self.codec}:{key}"
+
+    async def get(self, ref: Optional[str]) -> Optional[str]:
+        """Load and decompress HTML for a blob reference"""
+        if not ref:
+            return None
+
+        try:
+            backend, codec, key = self._parse_ref(ref)
+
+            if backend == "local":
+                path = os.path.join(self.directory, key[:2], f"{key}.html.{codec}")
+                if not os.path.exists(path):
+                    return None
+                data = await asyncio.to_thread(self._read_file, path)
+            else:
+                db = get_database()
+                blob = await db.html_blobs.find_one({"_id": key})
+                if not blob:
+                    return None
+                data = bytes(blob["data"])
+
+            return self._decompress(codec, data)
+        except Exception as e:
+            print(f"Error loading HTML blob {ref}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _write_file(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+
+class ScrapeCache:
+    """Per-URL validators (ETag/Last-Modified) and the latest fetched HTML"""
+
+    def __init__(self, blob_store: Optional[HtmlBlobStore] = None):
+        self.blob_store = blob_store or HtmlBlobStore()
+
+    async def get(self, url: str) -> Optional[Dict]:
+        """Get the cache entry for a URL"""
+        db = get_database()
+        return await db.scrape_cache.find_one({"_id": url_key(url)})
+
+    async def load_html(self, entry: Dict) -> Optional[str]:
+        """Lazily load the cached HTML for an entry"""
+        return await self.blob_store.get(entry.get("html_ref"))
+
+    async def store(
+        self,
+        url: str,
+        html: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Dict:
+        """Store freshly fetched HTML and its validators"""
+        db = get_database()
+        key = url_key(url)
+        html_ref = await self.blob_store.put(key, html)
+        now = datetime.utcnow()
+
+        entry = {
+            "_id": key,
+            "url": normalize_url(url),
+            "etag": etag,
+            "last_modified": last_modified,
+            "html_ref": html_ref,
+            "fetched_at": now,
+            "validated_at": now
+        }
+        await db.scrape_cache.replace_one({"_id": key}, entry, upsert=True)
+
+        return entry
+
+    async def touch(self, entry: Dict):
+        """Record a successful revalidation (304 Not Modified)"""
+        db = get_database()
+        await db.scrape_cache.update_one(
+            {"_id": entry["_id"]},
+            {"$set": {"validated_at": datetime.utcnow()}}
+        )
+
+
+async def offload_inline_html(batch_size: int = 100) -> int:
+    """Move raw_html stored inline on legacy article documents into the blob store"""
+    db = get_database()
+    blob_store = HtmlBlobStore()
+    moved = 0
+
+    while True:
+        batch = await db.articles.find(
+            {"raw_html": {"$type": "string"}},
+            {"url": 1, "raw_html": 1}
+        ).limit(batch_size).to_list(length=batch_size)
+
+        if not batch:
+            break
+
+        for article in batch:
+            html_ref = await blob_store.put(url_key(article["url"]), article["raw_html"])
+            await db.articles.update_one(
+                {"_id": article["_id"]},
+                {"$set": {"raw_html_ref": html_ref}, "$unset": {"raw_html": ""}}
+            )
+            moved += 1
+
+    return moved
+
+
+if __name__ == "__main__":
+    # Run from backend/ directory: python -m app.services.ingestion.scrape_cache
+    count = asyncio.run(offload_inline_html())
+    print(f"Moved inline HTML for {count} articles to the blob store")
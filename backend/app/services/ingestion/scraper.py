@@ -1,130 +1,252 @@
 import aiohttp
+from multidict import CIMultiDict
 from bs4 import BeautifulSoup
 from newspaper import Article as NewspaperArticle
 from typing import Optional, Dict
 import re
+import time
 from datetime import datetime
+from app.core.config import settings
+from app.core.rate_limiter import parse_retry_after
+from app.services.ingestion.scrape_cache import ScrapeCache
+from app.services.ingestion.domain_scheduler import domain_scheduler, domain_of
+
+
+USER_AGENT = "Mozilla/5.0 (compatible; NewsPrismBot/1.0)"
 
 
 class ArticleScraper:
     """Scraper for extracting article content from URLs"""
     
-    @staticmethod
-    async def scrape_article(url: str) -> Optional[Dict]:
+    def __init__(self, cache: Optional[ScrapeCache] = None):
+        if cache is None and settings.SCRAPE_CACHE_ENABLED:
+            cache = ScrapeCache()
+        self.cache = cache
+    
+    async def scrape_article(self, url: str) -> Optional[Dict]:
         """Scrape article content from a URL"""
+        fetched = await self.fetch_html(url)
+        if not fetched:
+            return None
+        
+        html = fetched["html"]
+        result = self._parse_with_newspaper(url, html)
+        
+        if not result:
+            # Fallback to BeautifulSoup
+            result = self._parse_with_bs4(url, html)
+        
+        if result:
+            result["raw_html_ref"] = fetched["html_ref"]
+            result["from_cache"] = fetched["from_cache"]
+        
+        return result
+    
+    async def fetch_html(self, url: str, revalidate: bool = True) -> Optional[Dict]:
+        """Fetch HTML, revalidating cached copies with a conditional GET
+        
+        Requests go through the per-domain scheduler: crawl delay between
+        requests, a timeout adapted to the domain's latency, retries on
+        429/5xx and network errors, and no requests while its circuit is open.
+        """
+        domain = domain_of(url)
+        if not domain_scheduler.allow_request(domain):
+            print(f"Skipping {url}: circuit open for {domain}")
+            return None
+        
+        entry = None
+        if self.cache and revalidate:
+            entry = await self.cache.get(url)
+        
+        headers = {"User-Agent": USER_AGENT}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        
+        response = None
+        for attempt in range(settings.SCRAPE_MAX_RETRIES + 1):
+            if attempt > 0 and not domain_scheduler.allow_request(domain):
+                return None
+            
+            await domain_scheduler.wait_for_slot(domain)
+            response = await self._get(domain, url, headers)
+            
+            if response is None:
+                domain_scheduler.back_off(domain, 2 ** attempt)
+                continue
+            
+            if response["status"] == 429 or response["status"] >= 500:
+                domain_scheduler.record_failure(domain)
+                delay = parse_retry_after(response["headers"].get("Retry-After")) or 2 ** attempt
+                domain_scheduler.back_off(domain, delay)
+                continue
+            
+            if response["status"] in (401, 403):
+                # Blocked by the publisher; retrying now won't help, but it counts towards the breaker
+                domain_scheduler.record_failure(domain)
+                return None
+            
+            domain_scheduler.record_success(domain, response["latency"])
+            break
+        else:
+            return None
+        
+        if response["status"] == 304 and entry:
+            html = await self.cache.load_html(entry)
+            if html is None:
+                # Blob is gone, fetch the page again unconditionally
+                return await self.fetch_html(url, revalidate=False)
+            
+            await self.cache.touch(entry)
+            return {"html": html, "html_ref": entry.get("html_ref"), "from_cache": True}
+        
+        if response["status"] != 200:
+            return None
+        
+        html = response["html"]
+        
+        html_ref = None
+        if self.cache:
+            entry = await self.cache.store(
+                url,
+                html,
+                etag=response["headers"].get("ETag"),
+                last_modified=response["headers"].get("Last-Modified")
+            )
+            html_ref = entry["html_ref"]
+        
+        return {"html": html, "html_ref": html_ref, "from_cache": False}
+    
+    @staticmethod
+    async def _get(domain: str, url: str, headers: Dict) -> Optional[Dict]:
+        """Single GET with the domain's adaptive timeout; None on network errors"""
+        started = time.monotonic()
+        try:
+            timeout = aiohttp.ClientTimeout(total=domain_scheduler.timeout_for(domain))
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(url, headers=headers) as response:
+                    html = await response.text() if response.status == 200 else None
+                    return {
+                        "status": response.status,
+                        # Keep header lookups case-insensitive (HTTP/2 and CDNs send lowercase names)
+                        "headers": CIMultiDict(response.headers),
+                        "html": html,
+                        "latency": time.monotonic() - started
+                    }
+        except Exception as e:
+            print(f"Error fetching {url}: {str(e)}")
+            domain_scheduler.record_failure(domain)
+            return None
+    
+    @staticmethod
+    def _parse_with_newspaper(url: str, html: str) -> Optional[Dict]:
+        """Extract article content with newspaper3k"""
         try:
-            # Use newspaper3k for article extraction
             article = NewspaperArticle(url)
-            article.download()
+            article.download(input_html=html)
             article.parse()
             
             if not article.text or len(article.text) < 100:
-                # Fallback to BeautifulSoup
-                return await ArticleScraper._scrape_with_bs4(url)
+                return None
             
             return {
                 "title": article.title,
                 "text": article.text,
                 "author": ", ".join(article.authors) if article.authors else None,
                 "published_at": article.publish_date or datetime.utcnow(),
-                "raw_html": article.html,
+                "raw_html": html,
                 "images": article.images,
                 "keywords": article.keywords
             }
         except Exception as e:
-            print(f"Error scraping {url}: {str(e)}")
-            # Fallback to BeautifulSoup
-            return await ArticleScraper._scrape_with_bs4(url)
+            print(f"Error parsing {url}: {str(e)}")
+            return None
     
     @staticmethod
-    async def _scrape_with_bs4(url: str) -> Optional[Dict]:
-        """Fallback scraper using BeautifulSoup"""
+    def _parse_with_bs4(url: str, html: str) -> Optional[Dict]:
+        """Fallback parser using BeautifulSoup"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status != 200:
-                        return None
-                    
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Remove script and style elements
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-                    
-                    # Try to find title
-                    title = None
-                    if soup.title:
-                        title = soup.title.get_text()
-                    elif soup.find("h1"):
-                        title = soup.find("h1").get_text()
-                    
-                    # Extract main content
-                    # Try common article selectors
-                    content_selectors = [
-                        'article',
-                        '[role="article"]',
-                        '.article-content',
-                        '.post-content',
-                        '.entry-content',
-                        'main',
-                        '.content'
-                    ]
-                    
-                    text = ""
-                    for selector in content_selectors:
-                        content = soup.select_one(selector)
-                        if content:
-                            text = content.get_text(separator=' ', strip=True)
-                            break
-                    
-                    if not text:
-                        # Fallback to body text
-                        text = soup.get_text(separator=' ', strip=True)
-                    
-                    # Clean up text
-                    text = re.sub(r'\s+', ' ', text)
-                    
-                    # Try to find author
-                    author = None
-                    author_selectors = [
-                        '[rel="author"]',
-                        '.author',
-                        '[itemprop="author"]',
-                        'meta[name="author"]'
-                    ]
-                    for selector in author_selectors:
-                        author_elem = soup.select_one(selector)
-                        if author_elem:
-                            author = author_elem.get_text() if hasattr(author_elem, 'get_text') else author_elem.get('content')
-                            break
-                    
-                    # Try to find publish date
-                    published_at = datetime.utcnow()
-                    date_selectors = [
-                        'time[datetime]',
-                        '[itemprop="datePublished"]',
-                        'meta[property="article:published_time"]'
-                    ]
-                    for selector in date_selectors:
-                        date_elem = soup.select_one(selector)
-                        if date_elem:
-                            date_str = date_elem.get('datetime') or date_elem.get('content')
-                            if date_str:
-                                try:
-                                    published_at = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                                except:
-                                    pass
-                            break
-                    
-                    return {
-                        "title": title or "Untitled",
-                        "text": text,
-                        "author": author,
-                        "published_at": published_at,
-                        "raw_html": html
-                    }
+            soup = BeautifulSoup(html, 'html.parser')
+            
+            # Remove script and style elements
+            for script in soup(["script", "style"]):
+                script.decompose()
+            
+            # Try to find title
+            title = None
+            if soup.title:
+                title = soup.title.get_text()
+            elif soup.find("h1"):
+                title = soup.find("h1").get_text()
+            
+            # Extract main content
+            # Try common article selectors
+            content_selectors = [
+                'article',
+                '[role="article"]',
+                '.article-content',
+                '.post-content',
+                '.entry-content',
+                'main',
+                '.content'
+            ]
+            
+            text = ""
+            for selector in content_selectors:
+                content = soup.select_one(selector)
+                if content:
+                    text = content.get_text(separator=' ', strip=True)
+                    break
+            
+            if not text:
+                # Fallback to body text
+                text = soup.get_text(separator=' ', strip=True)
+            
+            # Clean up text
+            text = re.sub(r'\s+', ' ', text)
+            
+            # Try to find author
+            author = None
+            author_selectors = [
+                '[rel="author"]',
+                '.author',
+                '[itemprop="author"]',
+                'meta[name="author"]'
+            ]
+            for selector in author_selectors:
+                author_elem = soup.select_one(selector)
+                if author_elem:
+                    author = author_elem.get_text() if hasattr(author_elem, 'get_text') else author_elem.get('content')
+                    break
+            
+            # Try to find publish date
+            published_at = datetime.utcnow()
+            date_selectors = [
+                'time[datetime]',
+                '[itemprop="datePublished"]',
+                'meta[property="article:published_time"]'
+            ]
+            for selector in date_selectors:
+                date_elem = soup.select_one(selector)
+                if date_elem:
+                    date_str = date_elem.get('datetime') or date_elem.get('content')
+                    if date_str:
+                        try:
+                            published_at = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                        except:
+                            pass
+                    break
+            
+            return {
+                "title": title or "Untitled",
+                "text": text,
+                "author": author,
+                "published_at": published_at,
+                "raw_html": html
+            }
         except Exception as e:
-            print(f"Error in BS4 scrape for {url}: {str(e)}")
+            print(f"Error in BS4 parse for {url}: {str(e)}")
             return None
 
@@ -0,0 +1,111 @@
+from typing import Dict, List, Optional
+from contextvars import ContextVar
+import time
+from app.core.config import settings
+
+
+class QueryBudget:
+    """LLM tokens, calls and latency for one analysis, and the budget they must fit in
+    
+    Every LLMClient.chat call made while the budget is current is recorded
+    against its stage ("verification", "summary", ...). Stages check
+    ``blocked_by`` before spending and note what they gave up through
+    ``degrade``; the client refuses calls once the budget is spent.
+    """
+    
+    def __init__(self, max_tokens: Optional[int] = None, deadline: Optional[float] = None):
+        # None takes the settings default; 0 means unlimited
+        self.max_tokens = settings.LLM_QUERY_TOKEN_BUDGET if max_tokens is None else max_tokens
+        self.deadline = settings.LLM_QUERY_DEADLINE if deadline is None else deadline
+        self.started = time.monotonic()
+        self.stages: Dict[str, Dict] = {}
+        self.degraded: List[Dict] = []
+        # Response cache lookups made by this analysis alone
+        self.cache = {"hits": 0, "misses": 0, "tokens_saved": 0}
+    
+    def _stage(self, stage: str) -> Dict:
+        return self.stages.setdefault(stage, {
+            "calls": 0,
+            "cached_calls": 0,
+            "refused_calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "latency_s": 0.0
+        })
+    
+    @property
+    def tokens_used(self) -> int:
+        return sum(s["prompt_tokens"] + s["completion_tokens"] for s in self.stages.values())
+    
+    def remaining_tokens(self) -> Optional[int]:
+        if not self.max_tokens:
+            return None
+        return max(self.max_tokens - self.tokens_used, 0)
+    
+    def remaining_time(self) -> Optional[float]:
+        if not self.deadline:
+            return None
+        return max(self.deadline - (time.monotonic() - self.started), 0.0)
+    
+    def blocked_by(self, tokens: int = 0) -> Optional[str]:
+        """Which limit ("deadline" or "token_budget") a call expected to use ``tokens`` would break"""
+        remaining_time = self.remaining_time()
+        if remaining_time is not None and remaining_time <= 0:
+            return "deadline"
+        remaining_tokens = self.remaining_tokens()
+        if remaining_tokens is not None and tokens > remaining_tokens:
+            return "token_budget"
+        return None
+    
+    def allows(self, tokens: int = 0) -> bool:
+        return self.blocked_by(tokens) is None
+    
+    def record(
+        self,
+        stage: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        latency: float = 0.0,
+        cached: bool = False
+    ):
+        stats = self._stage(stage)
+        if cached:
+            stats["cached_calls"] += 1
+            return
+        stats["calls"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        stats["latency_s"] += latency
+    
+    def record_cache_lookup(self, hit: bool, tokens_saved: int = 0):
+        if hit:
+            self.cache["hits"] += 1
+            self.cache["tokens_saved"] += tokens_saved
+        else:
+            self.cache["misses"] += 1
+    
+    def cache_report(self) -> Dict:
+        lookups = self.cache["hits"] + self.cache["misses"]
+        return {**self.cache, "hit_rate": self.cache["hits"] / lookups if lookups else None}
+    
+    def refuse(self, stage: str):
+        self._stage(stage)["refused_calls"] += 1
+    
+    def degrade(self, stage: str, reason: str, **details):
+        self.degraded.append({"stage": stage, "reason": reason, **details})
+    
+    def report(self) -> Dict:
+        return {
+            "calls": sum(s["calls"] for s in self.stages.values()),
+            "prompt_tokens": sum(s["prompt_tokens"] for s in self.stages.values()),
+            "completion_tokens": sum(s["completion_tokens"] for s in self.stages.values()),
+            "tokens": self.tokens_used,
+            "elapsed_s": time.monotonic() - self.started,
+            "budget": {"max_tokens": self.max_tokens or None, "deadline_s": self.deadline or None},
+            "by_stage": self.stages,
+            "degraded": self.degraded
+        }
+
+
+# Budget of the analysis running in the current task (None outside analyze_query)
+current_budget: ContextVar[Optional[QueryBudget]] = ContextVar("current_budget", default=None)
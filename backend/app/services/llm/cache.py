@@ -0,0 +1,183 @@
+from typing import List, Dict, Optional, Tuple
+from contextvars import ContextVar
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from app.core.config import settings
+from app.services.llm.budget import current_budget
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    aioredis = None
+
+
+# Set to True (e.g. for one analyze request) to skip cache reads; fresh responses are still stored
+refresh_llm_cache: ContextVar[bool] = ContextVar("refresh_llm_cache", default=False)
+
+
+def prompt_fingerprint(model: str, messages: List[Dict], params: Dict) -> str:
+    """Cache key for a completion request"""
+    payload = json.dumps({"model": model, "messages": messages, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCacheBackend:
+    """SQLite file with TTL and least-recently-used eviction"""
+    
+    def __init__(self, path: str, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, content TEXT, tokens INTEGER, created_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+    
+    def _get(self, key: str) -> Optional[Tuple[str, int]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, tokens FROM llm_cache WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row:
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+        return row
+    
+    def _set(self, key: str, content: str, tokens: int):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, content, tokens, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, content, tokens, now, now)
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+    
+    async def get(self, key: str) -> Optional[Tuple[str, int]]:
+        return await asyncio.to_thread(self._get, key)
+    
+    async def set(self, key: str, content: str, tokens: int):
+        await asyncio.to_thread(self._set, key, content, tokens)
+
+
+class RedisCacheBackend:
+    """Redis keys with TTL; a sorted set of access times drives LRU eviction"""
+    
+    PREFIX = "llm_cache:"
+    LRU_KEY = "llm_cache:lru"
+    
+    def __init__(self, url: str, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.redis = aioredis.from_url(url, decode_responses=True)
+    
+    async def get(self, key: str) -> Optional[Tuple[str, int]]:
+        value = await self.redis.get(self.PREFIX + key)
+        if value is None:
+            return None
+        await self.redis.zadd(self.LRU_KEY, {key: time.time()})
+        entry = json.loads(value)
+        return entry["content"], entry["tokens"]
+    
+    async def set(self, key: str, content: str, tokens: int):
+        await self.redis.set(self.PREFIX + key, json.dumps({"content": content, "tokens": tokens}), ex=self.ttl)
+        await self.redis.zadd(self.LRU_KEY, {key: time.time()})
+        
+        overflow = await self.redis.zcard(self.LRU_KEY) - self.max_entries
+        if overflow > 0:
+            evicted = await self.redis.zpopmin(self.LRU_KEY, overflow)
+            if evicted:
+                await self.redis.delete(*[self.PREFIX + k for k, _ in evicted])
+
+
+class LLMResponseCache:
+    """Completion cache shared by every LLM call, with hit/miss/tokens-saved metrics
+    
+    Backend errors are logged and treated as misses; the cache never fails a call.
+    Pass ``enabled=False`` for a cache that stores nothing regardless of settings.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.backend = None
+        self.stats = {"hits": 0, "misses": 0, "tokens_saved": 0}
+        
+        if not enabled or not settings.LLM_CACHE_ENABLED:
+            return
+        
+        try:
+            if settings.LLM_CACHE_BACKEND == "redis" and REDIS_AVAILABLE:
+                self.backend = RedisCacheBackend(
+                    settings.REDIS_URL, settings.LLM_CACHE_TTL, settings.LLM_CACHE_MAX_ENTRIES
+                )
+            else:
+                if settings.LLM_CACHE_BACKEND == "redis":
+                    print("Warning: redis package not installed, using the disk LLM cache")
+                self.backend = DiskCacheBackend(
+                    settings.LLM_CACHE_PATH, settings.LLM_CACHE_TTL, settings.LLM_CACHE_MAX_ENTRIES
+                )
+        except Exception as e:
+            print(f"Warning: LLM cache disabled: {e}")
+            self.backend = None
+    
+    async def get(self, key: str) -> Optional[str]:
+        if self.backend is None or refresh_llm_cache.get():
+            return None
+        
+        try:
+            entry = await self.backend.get(key)
+        except Exception as e:
+            print(f"Warning: LLM cache read failed: {e}")
+            entry = None
+        
+        query_budget = current_budget.get()
+        if entry is None:
+            self.stats["misses"] += 1
+            if query_budget is not None:
+                query_budget.record_cache_lookup(hit=False)
+            return None
+        
+        content, tokens = entry
+        self.stats["hits"] += 1
+        self.stats["tokens_saved"] += tokens or 0
+        if query_budget is not None:
+            query_budget.record_cache_lookup(hit=True, tokens_saved=tokens or 0)
+        return content
+    
+    async def set(self, key: str, content: str, tokens: int):
+        if self.backend is None:
+            return
+        try:
+            await self.backend.set(key, content, tokens)
+        except Exception as e:
+            print(f"Warning: LLM cache write failed: {e}")
+    
+    def get_stats(self) -> Dict:
+        """Totals since the process started (per-analysis counts live on QueryBudget)"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "enabled": self.backend is not None,
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else None
+        }
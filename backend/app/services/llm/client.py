@@ -0,0 +1,196 @@
+from typing import List, Dict, Optional
+import asyncio
+import time
+import httpx
+from app.core.config import settings
+from app.core.rate_limiter import TokenBucket, parse_retry_after
+from app.services.llm.cache import LLMResponseCache, prompt_fingerprint
+from app.services.llm.budget import current_budget
+
+
+class LLMError(Exception):
+    """An LLM call that failed for good (after retries, or on a non-retryable status)"""
+
+
+# Shared by every client in the process so the provider's per-minute limits are respected globally
+llm_request_limiter = TokenBucket(
+    rate=settings.GROQ_REQUESTS_PER_MINUTE / 60.0,
+    capacity=settings.GROQ_REQUESTS_PER_MINUTE
+)
+llm_token_limiter = TokenBucket(
+    rate=settings.GROQ_TOKENS_PER_MINUTE / 60.0,
+    capacity=settings.GROQ_TOKENS_PER_MINUTE
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+class LLMClient:
+    """OpenAI-compatible chat completions with concurrency, rate limits and retries
+    
+    Talks to any provider exposing ``/chat/completions`` (Groq by default;
+    LLM_BASE_URL, LLM_MODEL and LLM_API_KEY point it elsewhere). One pooled
+    httpx client is reused for every call. At most GROQ_CONCURRENCY requests
+    are in flight, and each waits for both the requests-per-minute and
+    tokens-per-minute budgets. 429 and 5xx responses are retried with
+    backoff, honoring Retry-After. Responses are cached by prompt
+    fingerprint, so repeated prompts cost neither latency nor quota.
+    
+    Pass an httpx transport (e.g. ``httpx.ASGITransport`` over the fake
+    server app) to run without network access.
+    """
+    
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[LLMResponseCache] = None
+    ):
+        self.api_key = api_key or settings.LLM_API_KEY or settings.GROQ_API_KEY
+        self.api_url = base_url or settings.LLM_BASE_URL or settings.GROQ_API_URL
+        self.model = model or settings.LLM_MODEL or settings.GROQ_MODEL
+        self.transport = transport
+        
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(settings.GROQ_CONCURRENCY)
+        self.cache = cache or LLMResponseCache()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                timeout=settings.GROQ_TIMEOUT,
+                limits=httpx.Limits(max_connections=settings.GROQ_CONCURRENCY),
+                transport=self.transport
+            )
+        return self._client
+    
+    async def chat(
+        self,
+        messages: List[Dict],
+        max_tokens: int = 1000,
+        temperature: float = 0.1,
+        stage: str = "other"
+    ) -> str:
+        """Content of the first completion choice; raises LLMError on failure
+        
+        Usage is recorded against ``stage`` in the current QueryBudget, if
+        any, and the call is refused once that budget is spent.
+        """
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        cache_key = prompt_fingerprint(self.model, messages, {"temperature": temperature, "max_tokens": max_tokens})
+        query_budget = current_budget.get()
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            if query_budget is not None:
+                query_budget.record(stage, cached=True)
+            return cached
+        
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        budget = prompt_tokens + max_tokens
+        max_retries = settings.GROQ_MAX_RETRIES
+        
+        if query_budget is not None and not query_budget.allows(budget):
+            query_budget.refuse(stage)
+            raise LLMError(f"LLM budget exhausted ({stage})")
+        
+        started = time.monotonic()
+        async with self._semaphore:
+            # Tokens are charged once; a retried 429/5xx was not processed by the provider
+            await llm_token_limiter.acquire(budget)
+            for attempt in range(max_retries + 1):
+                await llm_request_limiter.acquire()
+                
+                try:
+                    response = await self._get_client().post("/chat/completions", json=payload)
+                except httpx.HTTPError as e:
+                    if attempt < max_retries:
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    raise LLMError(f"LLM request failed: {str(e)}")
+                
+                if response.status_code == 429 or response.status_code >= 500:
+                    if attempt == max_retries:
+                        raise LLMError(f"LLM request failed after {attempt + 1} attempts ({response.status_code})")
+                    
+                    delay = parse_retry_after(response.headers.get("Retry-After")) or 2 ** attempt
+                    if response.status_code == 429:
+                        # Everyone sharing the quota backs off, not just this request
+                        llm_request_limiter.pause(delay)
+                    await asyncio.sleep(delay)
+                    continue
+                
+                if response.status_code != 200:
+                    raise LLMError(f"LLM API error ({response.status_code}): {response.text[:200]}")
+                
+                try:
+                    data = response.json()
+                    content = data["choices"][0]["message"]["content"]
+                except (ValueError, KeyError, IndexError, TypeError) as e:
+                    raise LLMError(f"Malformed LLM response: {str(e)}")
+                if not isinstance(content, str):
+                    raise LLMError("Malformed LLM response: no message content")
+                
+                usage = data.get("usage") or {}
+                if query_budget is not None:
+                    query_budget.record(
+                        stage,
+                        prompt_tokens=usage.get("prompt_tokens") or prompt_tokens,
+                        completion_tokens=usage.get("completion_tokens") or estimate_tokens(content),
+                        latency=time.monotonic() - started
+                    )
+                
+                tokens = usage.get("total_tokens") or budget
+                await self.cache.set(cache_key, content, tokens)
+                return content
+    
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_llm_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Process-wide LLMClient so the connection pool and concurrency limit are shared
+    
+    With LLM_FAKE_SERVER the client talks to the in-process fake server
+    instead of a real provider, under its own model name and without the
+    response cache, so fake replies never land in the real provider's cache.
+    """
+    global _llm_client
+    if _llm_client is None:
+        if settings.LLM_FAKE_SERVER:
+            from app.services.llm.fake_server import create_fake_llm_app
+            transport = httpx.ASGITransport(app=create_fake_llm_app())
+            _llm_client = LLMClient(
+                base_url="http://fake-llm/v1",
+                model="fake-llm",
+                api_key="fake",
+                transport=transport,
+                cache=LLMResponseCache(enabled=False)
+            )
+        else:
+            _llm_client = LLMClient()
+    return _llm_client
+
+
+async def close_llm_client():
+    if _llm_client is not None:
+        await _llm_client.close()
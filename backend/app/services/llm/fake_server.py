@@ -0,0 +1,168 @@
+"""
+Fake OpenAI-compatible LLM server for offline runs and benchmarks
+
+Serves POST /chat/completions (and /v1/chat/completions) with log-normal
+latency, a requests-per-minute limit answered by 429 + Retry-After, optional
+random 5xx errors, and rule-based replies shaped like the prompts this app
+sends. Use it in-process through LLM_FAKE_SERVER=True, or run it standalone:
+    
+    python -m app.services.llm.fake_server --port 8100
+"""
+from typing import List, Dict, Optional
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from collections import deque
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+BATCH_ITEM_PATTERN = re.compile(r"^\[(\d+)\] Candidate fact:", re.MULTILINE)
+URL_PATTERN = re.compile(r"\((https?://[^)\s]+)\)")
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _batch_reply(prompt: str) -> str:
+    """JSON array answering every numbered candidate fact as supported"""
+    items = []
+    blocks = re.split(r"^(?=\[\d+\] Candidate fact:)", prompt, flags=re.MULTILINE)
+    for block in blocks:
+        match = BATCH_ITEM_PATTERN.match(block)
+        if not match:
+            continue
+        urls = URL_PATTERN.findall(block)
+        items.append({
+            "id": int(match.group(1)),
+            "status": "A",
+            "justification": f"Reported by {len(urls)} source(s).",
+            "quotes": [],
+            "contradicting": []
+        })
+    return json.dumps(items)
+
+
+def _single_reply(prompt: str) -> str:
+    urls = URL_PATTERN.findall(prompt)
+    return (
+        "STATUS: A\n"
+        f"JUSTIFICATION: Reported by {len(urls)} source(s).\n"
+        "QUOTES: \n"
+        "CONTRADICTING: NONE"
+    )
+
+
+def _summary_reply(prompt: str) -> str:
+    facts = [line[2:].strip() for line in prompt.splitlines() if line.startswith("- ")]
+    return " ".join(facts[:3]) or "No facts to summarize."
+
+
+def fake_completion(messages: List[Dict]) -> str:
+    """Reply for the prompt in the last user message"""
+    prompt = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    if BATCH_ITEM_PATTERN.search(prompt):
+        return _batch_reply(prompt)
+    if "Candidate fact:" in prompt:
+        return _single_reply(prompt)
+    if prompt.startswith("Summarize"):
+        return _summary_reply(prompt)
+    return "OK"
+
+
+def create_fake_llm_app(
+    latency_median: float = 0.4,
+    latency_sigma: float = 0.5,
+    requests_per_minute: int = 30,
+    error_rate: float = 0.0,
+    seed: Optional[int] = None
+) -> FastAPI:
+    """App simulating a rate-limited chat completions provider
+    
+    Latency is log-normal around ``latency_median`` seconds. Requests beyond
+    ``requests_per_minute`` in a sliding minute get a 429 with the seconds
+    until a slot frees up; ``error_rate`` of the rest get a 503.
+    """
+    app = FastAPI(title="Fake LLM")
+    rng = random.Random(seed)
+    recent = deque()
+    stats = {"requests": 0, "rate_limited": 0, "errors": 0}
+    
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        
+        now = time.monotonic()
+        while recent and now - recent[0] >= 60:
+            recent.popleft()
+        if requests_per_minute and len(recent) >= requests_per_minute:
+            stats["rate_limited"] += 1
+            retry_after = max(60 - (now - recent[0]), 0.1)
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": f"{retry_after:.2f}"}
+            )
+        recent.append(now)
+        
+        await asyncio.sleep(rng.lognormvariate(0, latency_sigma) * latency_median)
+        
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "Service unavailable"}}, status_code=503)
+        
+        messages = body.get("messages", [])
+        content = fake_completion(messages)
+        prompt_tokens = sum(_estimate_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = _estimate_tokens(content)
+        
+        return {
+            "id": f"fake-{stats['requests']}",
+            "object": "chat.completion",
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+    
+    async def get_stats():
+        return stats
+    
+    app.add_api_route("/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/stats", get_stats, methods=["GET"])
+    app.state.stats = stats
+    
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Run the fake LLM server")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.4, help="median latency in seconds")
+    parser.add_argument("--rpm", type=int, default=30, help="requests per minute before 429s (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    
+    uvicorn.run(
+        create_fake_llm_app(
+            latency_median=args.latency,
+            requests_per_minute=args.rpm,
+            error_rate=args.error_rate
+        ),
+        host="127.0.0.1",
+        port=args.port
+    )
@@ -0,0 +1,77 @@
+from typing import List, Dict
+from datetime import datetime
+from pymongo import UpdateOne
+from app.core.database import get_database
+
+
+class AnalysisCache:
+    """Per-article analysis results in the ``article_analysis`` collection
+    
+    Results are keyed by (content hash, analysis type, version). A stage's
+    version names the models and lexicons behind it, so bumping one makes the
+    old entries invisible and they are recomputed lazily on next use. Keep one
+    instance per query to get that query's hit rates.
+    """
+    
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, int]] = {}
+    
+    async def get_many(self, analysis_type: str, version: str, hashes: List[str]) -> Dict[str, Dict]:
+        """Cached results by content hash, fetched in one query"""
+        unique = list(dict.fromkeys(hashes))
+        if not unique:
+            return {}
+        
+        found = {}
+        try:
+            db = get_database()
+            cursor = db.article_analysis.find(
+                {
+                    "content_hash": {"$in": unique},
+                    "analysis_type": analysis_type,
+                    "version": version
+                },
+                {"content_hash": 1, "result": 1}
+            )
+            async for doc in cursor:
+                found[doc["content_hash"]] = doc["result"]
+        except Exception as e:
+            print(f"Warning: analysis cache read failed for {analysis_type}: {e}")
+        
+        stage = self.stats.setdefault(analysis_type, {"hits": 0, "misses": 0})
+        stage["hits"] += len(found)
+        stage["misses"] += len(unique) - len(found)
+        
+        return found
+    
+    async def put_many(self, analysis_type: str, version: str, results: Dict[str, Dict]):
+        """Store results by content hash in one bulk write"""
+        if not results:
+            return
+        
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"content_hash": key, "analysis_type": analysis_type, "version": version},
+                {"$set": {"result": result, "created_at": now}},
+                upsert=True
+            )
+            for key, result in results.items()
+        ]
+        
+        try:
+            db = get_database()
+            await db.article_analysis.bulk_write(operations, ordered=False)
+        except Exception as e:
+            print(f"Warning: analysis cache write failed for {analysis_type}: {e}")
+    
+    def get_stats(self) -> Dict:
+        """Hits, misses and hit rate per stage"""
+        return {
+            analysis_type: {
+                **stage,
+                "hit_rate": stage["hits"] / (stage["hits"] + stage["misses"])
+                if stage["hits"] + stage["misses"] else None
+            }
+            for analysis_type, stage in self.stats.items()
+        }
@@ -0,0 +1,205 @@
+from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import time
+import spacy
+from spacy.tokens import Doc, DocBin
+from bson import Binary
+from app.core.config import settings
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of article text, used to key parses and analysis results"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class AnalysisDocument:
+    """A single parse of an article, shared by every analyzer
+    
+    Holds the spaCy Doc plus the views analyzers need (sentences, tokens,
+    POS tags, entities, normalized text), so nothing re-parses or re-splits
+    the text. Without a spaCy model the views fall back to plain splitting.
+    """
+    
+    def __init__(self, text: str, doc: Optional[Doc] = None):
+        self.text = text
+        self.doc = doc
+        self.normalized_text = text.lower()
+        self.content_hash = content_hash(text)
+        
+        if doc is not None:
+            self.sentence_spans: List[Tuple[int, int]] = [
+                (sent.start_char, sent.end_char) for sent in doc.sents
+            ]
+            self.sentences = [text[start:end] for start, end in self.sentence_spans]
+            self.tokens = [token.text for token in doc]
+            self.pos = [token.pos_ for token in doc]
+            self.is_alpha = [token.is_alpha for token in doc]
+            self.entities = [(ent.text, ent.label_) for ent in doc.ents]
+        else:
+            self.sentences = text.split('.')
+            self.sentence_spans = []
+            offset = 0
+            for sentence in self.sentences:
+                self.sentence_spans.append((offset, offset + len(sentence)))
+                offset += len(sentence) + 1
+            self.tokens = text.split()
+            self.pos = []
+            self.is_alpha = [token.isalpha() for token in self.tokens]
+            self.entities = []
+    
+    @property
+    def parsed(self) -> bool:
+        return self.doc is not None
+    
+    @property
+    def alpha_token_count(self) -> int:
+        return sum(self.is_alpha)
+    
+    def to_bytes(self) -> Optional[bytes]:
+        """Serialize the parse with DocBin so it can be persisted and reused"""
+        if self.doc is None:
+            return None
+        doc_bin = DocBin(store_user_data=False)
+        doc_bin.add(self.doc)
+        return doc_bin.to_bytes()
+    
+    @classmethod
+    def from_bytes(cls, text: str, data: bytes, vocab) -> "AnalysisDocument":
+        docs = list(DocBin().from_bytes(data).get_docs(vocab))
+        return cls(text, docs[0] if docs else None)
+
+
+class NLPService:
+    """Loads spaCy once and parses each distinct text once (LRU by content hash)"""
+    
+    def __init__(self, cache_size: Optional[int] = None):
+        self.nlp = self._load_pipeline()
+        
+        self.cache_size = cache_size or settings.NLP_DOC_CACHE_SIZE
+        self._cache: "OrderedDict[str, AnalysisDocument]" = OrderedDict()
+        
+        self.stats = {"docs_parsed": 0, "parse_seconds": 0.0, "cache_hits": 0}
+    
+    @staticmethod
+    def _load_pipeline():
+        """Load the spaCy model without the components we never use"""
+        try:
+            nlp = spacy.load(settings.SPACY_MODEL, exclude=settings.SPACY_EXCLUDE)
+        except OSError:
+            print(f"spaCy model not found. Run: python -m spacy download {settings.SPACY_MODEL}")
+            return None
+        
+        # Without the parser, sentence boundaries come from the (disabled by default) senter
+        if "parser" not in nlp.pipe_names and "senter" in nlp.disabled:
+            nlp.enable_pipe("senter")
+        
+        return nlp
+    
+    @property
+    def version(self) -> str:
+        """Identifies the pipeline, so cached parses and results from another one are ignored"""
+        if self.nlp is None:
+            return "none"
+        return f"{self.nlp.meta['name']}-{self.nlp.meta['version']}:spacy-{spacy.__version__}:{','.join(self.nlp.pipe_names)}"
+    
+    def parse(self, text: str) -> AnalysisDocument:
+        """Get the shared parse of a text"""
+        return self.parse_many([text])[0]
+    
+    def parse_many(self, texts: List[str]) -> List[AnalysisDocument]:
+        """Get shared parses for several texts, parsing all unseen ones in one nlp.pipe run"""
+        keys = [content_hash(text) for text in texts]
+        
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+            else:
+                pending.setdefault(key, text)
+        
+        if pending:
+            parsed = self._pipe(list(pending.values()))
+            for document in parsed:
+                self._remember(document)
+        else:
+            parsed = []
+        
+        # Look up parsed documents directly in case the cache is smaller than the batch
+        by_key = {document.content_hash: document for document in parsed}
+        return [by_key.get(key) or self._cache[key] for key in keys]
+    
+    async def parse_many_cached(self, texts: List[str], analysis_cache) -> List[AnalysisDocument]:
+        """parse_many, restoring persisted parses from the analysis cache and storing new ones"""
+        if self.nlp is None:
+            return self.parse_many(texts)
+        
+        keys = [content_hash(text) for text in texts]
+        uncached = {key: text for key, text in zip(keys, texts) if key not in self._cache}
+        
+        stored = await analysis_cache.get_many("spacy_doc", self.version, list(uncached))
+        loaded = {key: self.load(uncached[key], result["doc"]) for key, result in stored.items()}
+        
+        parsed = self.parse_many([text for key, text in zip(keys, texts) if key not in loaded])
+        by_key = {document.content_hash: document for document in parsed}
+        
+        await analysis_cache.put_many("spacy_doc", self.version, {
+            key: {"doc": Binary(by_key[key].to_bytes())}
+            for key in uncached if key not in loaded
+        })
+        
+        by_key.update(loaded)
+        return [by_key[key] for key in keys]
+    
+    def _pipe(self, texts: List[str]) -> List[AnalysisDocument]:
+        if self.nlp is None:
+            return [AnalysisDocument(text) for text in texts]
+        
+        started = time.perf_counter()
+        docs = self.nlp.pipe(
+            texts,
+            batch_size=settings.SPACY_BATCH_SIZE,
+            n_process=settings.SPACY_N_PROCESS
+        )
+        documents = [AnalysisDocument(text, doc) for text, doc in zip(texts, docs)]
+        elapsed = time.perf_counter() - started
+        
+        self.stats["docs_parsed"] += len(documents)
+        self.stats["parse_seconds"] += elapsed
+        print(f"Parsed {len(documents)} docs in {elapsed:.2f}s ({len(documents) / max(elapsed, 1e-9):.1f} docs/sec)")
+        
+        return documents
+    
+    def get_stats(self) -> Dict:
+        """Parse throughput since startup"""
+        seconds = self.stats["parse_seconds"]
+        return {
+            **self.stats,
+            "docs_per_second": self.stats["docs_parsed"] / seconds if seconds else None
+        }
+    
+    def load(self, text: str, data: bytes) -> AnalysisDocument:
+        """Restore a persisted parse into the shared cache"""
+        if self.nlp is None:
+            return self.parse(text)
+        document = AnalysisDocument.from_bytes(text, data, self.nlp.vocab)
+        self._remember(document)
+        return document
+    
+    def _remember(self, document: AnalysisDocument):
+        self._cache[document.content_hash] = document
+        self._cache.move_to_end(document.content_hash)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+_nlp_service: Optional[NLPService] = None
+
+
+def get_nlp_service() -> NLPService:
+    """Process-wide NLPService so all analyzers share one model and one parse cache"""
+    global _nlp_service
+    if _nlp_service is None:
+        _nlp_service = NLPService()
+    return _nlp_service
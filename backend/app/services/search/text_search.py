@@ -0,0 +1,92 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.core.database import get_database
+from app.models.article import ARTICLE_RESPONSE_PROJECTION
+
+
+def encode_cursor(score: float, article_id: ObjectId) -> str:
+    """Opaque position after the given (relevance, id) in the result order"""
+    payload = json.dumps({"s": score, "id": str(article_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, ObjectId]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(payload["s"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f"invalid cursor: {e}")
+
+
+def build_search_pipeline(
+    query: str,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sources: Optional[List[str]] = None,
+    limit: int = 50,
+    after: Optional[Tuple[float, ObjectId]] = None
+) -> List[Dict]:
+    """Aggregation over the articles text index, most relevant first
+    
+    Titles weigh more than body text (see the index in app.models.article).
+    Results are ordered by (text score, _id) descending so a page can
+    resume strictly after the last (score, _id) of the previous one. One
+    extra document is fetched to tell whether another page exists.
+    """
+    match: Dict = {"$text": {"$search": query}}
+    if date_from or date_to:
+        match["published_at"] = {}
+        if date_from:
+            match["published_at"]["$gte"] = date_from
+        if date_to:
+            match["published_at"]["$lte"] = date_to
+    if sources:
+        match["source"] = {"$in": sources}
+    
+    pipeline = [
+        {"$match": match},
+        {"$addFields": {"score": {"$meta": "textScore"}}}
+    ]
+    if after is not None:
+        score, last_id = after
+        pipeline.append({"$match": {"$or": [
+            {"score": {"$lt": score}},
+            {"score": score, "_id": {"$lt": last_id}}
+        ]}})
+    pipeline += [
+        {"$sort": {"score": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": ARTICLE_RESPONSE_PROJECTION}
+    ]
+    return pipeline
+
+
+async def search_articles(
+    query: str,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sources: Optional[List[str]] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """One page of matching articles and the cursor for the next page (None on the last)"""
+    if not query.strip() or limit <= 0:
+        return [], None
+    
+    after = decode_cursor(cursor) if cursor else None
+    db = get_database()
+    pipeline = build_search_pipeline(query, date_from, date_to, sources, limit, after)
+    articles = await db.articles.aggregate(pipeline).to_list(length=limit + 1)
+    
+    next_cursor = None
+    if len(articles) > limit:
+        articles = articles[:limit]
+        next_cursor = encode_cursor(articles[-1]["score"], articles[-1]["_id"])
+    
+    return articles, next_cursor
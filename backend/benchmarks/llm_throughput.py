@@ -0,0 +1,136 @@
+"""
+LLM verification throughput against the fake server (no network, no quota)
+
+Sends synthetic fact-verification prompts, one group per call and batched,
+through LLMClient backed by the in-process fake server, and reports wall
+time, p50/p95 call latency and how many 429s the server returned.
+
+Run from backend/ directory: python benchmarks/llm_throughput.py --groups 60
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.rate_limiter import TokenBucket
+from app.services.facts.verification import create_batch_prompt, pack_fact_groups, parse_batch_response
+from app.services.llm import client as llm_client_module
+from app.services.llm.cache import LLMResponseCache
+from app.services.llm.client import LLMClient, LLMError
+from app.services.llm.fake_server import create_fake_llm_app
+
+
+def synthetic_fact_groups(count: int, sources: int = 3):
+    return [
+        [
+            {
+                "fact": f"Officials confirmed {i * 7} people attended the summit in city {i}.",
+                "source_name": f"Source {s}",
+                "source_url": f"https://source{s}.example.com/story/{i}"
+            }
+            for s in range(sources)
+        ]
+        for i in range(count)
+    ]
+
+
+def single_prompt(fact_group) -> str:
+    sources_text = "\n".join(
+        f"Source: {f['source_name']} ({f['source_url']})\nExcerpt: {f['fact'][:200]}\n"
+        for f in fact_group
+    )
+    return f"Candidate fact: {fact_group[0]['fact']}\n\nSources:\n{sources_text}\nSTATUS: [A/B/C]"
+
+
+async def run(mode: str, fact_groups, app, client_rpm: int, batch_size: int, batch_tokens: int):
+    # Fresh client-side buckets per run so one mode's spend doesn't slow the next
+    llm_client_module.llm_request_limiter = TokenBucket(rate=client_rpm / 60.0, capacity=client_rpm)
+    llm_client_module.llm_token_limiter = TokenBucket(rate=1e9, capacity=1e9)
+    
+    client = LLMClient(
+        base_url="http://fake-llm/v1",
+        model="fake-llm",
+        api_key="fake",
+        transport=httpx.ASGITransport(app=app),
+        cache=LLMResponseCache(enabled=False)
+    )
+    latencies = []
+    failures = 0
+    
+    async def timed(prompt: str, max_tokens: int):
+        nonlocal failures
+        started = time.perf_counter()
+        try:
+            return await client.chat([{"role": "user", "content": prompt}], max_tokens=max_tokens)
+        except LLMError:
+            failures += 1
+            return ""
+        finally:
+            latencies.append(time.perf_counter() - started)
+    
+    if mode == "single":
+        calls = [timed(single_prompt(group), 1000) for group in fact_groups]
+    else:
+        batches = pack_fact_groups(fact_groups, batch_tokens, batch_size)
+        calls = [timed(create_batch_prompt([fact_groups[i] for i in batch]), 150 * len(batch)) for batch in batches]
+    
+    stats = app.state.stats
+    rate_limited_before = stats["rate_limited"]
+    started = time.perf_counter()
+    replies = await asyncio.gather(*calls)
+    wall = time.perf_counter() - started
+    await client.close()
+    
+    if mode == "batched":
+        verified = sum(len(parse_batch_response(reply, len(batch))) for reply, batch in zip(replies, batches))
+    else:
+        verified = sum(1 for reply in replies if reply.startswith("STATUS"))
+    
+    return {
+        "mode": mode,
+        "calls": len(calls),
+        "verified": verified,
+        "failures": failures,
+        "wall_s": wall,
+        "p50_s": float(np.percentile(latencies, 50)) if latencies else 0.0,
+        "p95_s": float(np.percentile(latencies, 95)) if latencies else 0.0,
+        "rate_limited": stats["rate_limited"] - rate_limited_before
+    }
+
+
+async def main(args):
+    fact_groups = synthetic_fact_groups(args.groups)
+    
+    for mode in args.modes:
+        app = create_fake_llm_app(
+            latency_median=args.latency,
+            requests_per_minute=args.server_rpm,
+            error_rate=args.error_rate,
+            seed=0
+        )
+        result = await run(mode, fact_groups, app, args.client_rpm, args.batch_size, args.batch_tokens)
+        print(
+            f"{result['mode']:>8}: {result['calls']} calls, {result['verified']}/{args.groups} verified, "
+            f"{result['failures']} failed, wall {result['wall_s']:.2f}s, "
+            f"p50 {result['p50_s']:.2f}s, p95 {result['p95_s']:.2f}s, 429s {result['rate_limited']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark LLM fact verification against the fake server")
+    parser.add_argument("--groups", type=int, default=60)
+    parser.add_argument("--modes", nargs="+", default=["single", "batched"], choices=["single", "batched"])
+    parser.add_argument("--latency", type=float, default=0.4, help="fake server median latency (s)")
+    parser.add_argument("--server-rpm", type=int, default=600, help="fake server requests/minute before 429s")
+    parser.add_argument("--client-rpm", type=int, default=600, help="client-side requests/minute budget")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--batch-tokens", type=int, default=3000)
+    args = parser.parse_args()
+    
+    asyncio.run(main(args))
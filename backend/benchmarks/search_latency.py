@@ -0,0 +1,144 @@
+"""
+POST /search latency on a synthetic collection (default one million articles)
+
+Fills a scratch database with generated articles, creates the production
+article indexes, then times the text-index search pipeline (first page and
+a follow-up cursor page, with and without filters) against the old
+unanchored case-insensitive $regex scan, and prints p50/p95 per case.
+
+Run from backend/ directory against a local MongoDB:
+    python benchmarks/search_latency.py --docs 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.models.article import ARTICLE_INDEXES, ARTICLE_RESPONSE_PROJECTION
+from app.services.search.text_search import build_search_pipeline, decode_cursor, encode_cursor
+
+SOURCES = [f"source-{i}" for i in range(40)]
+TOPICS = [
+    "election", "budget", "monsoon", "cricket", "inflation", "vaccine", "earthquake", "startup",
+    "parliament", "railway", "airport", "festival", "tariff", "satellite", "pollution", "strike"
+]
+
+
+def generate_articles(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(20000)]
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        topic = rng.choice(TOPICS)
+        body = " ".join(rng.choices(vocabulary, k=120))
+        yield {
+            "title": f"{topic.title()} update {i}: {' '.join(rng.choices(vocabulary, k=6))}",
+            "text": f"{body} {topic} {' '.join(rng.choices(vocabulary, k=60))}",
+            "url": f"https://example.com/{i}",
+            "source": rng.choice(SOURCES),
+            "published_at": start + timedelta(minutes=rng.randrange(0, 60 * 24 * 365)),
+            "scraped_at": start
+        }
+
+
+def populate(collection, count: int, batch_size: int = 10000):
+    started = time.perf_counter()
+    batch = []
+    for article in generate_articles(count):
+        batch.append(article)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+    print(f"Inserted {count} articles in {time.perf_counter() - started:.1f}s")
+    
+    started = time.perf_counter()
+    collection.create_indexes(ARTICLE_INDEXES)
+    print(f"Built indexes in {time.perf_counter() - started:.1f}s")
+
+
+def timed(runs: int, func):
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - started)
+    return np.percentile(latencies, 50) * 1000, np.percentile(latencies, 95) * 1000
+
+
+def text_page(collection, query: str, limit: int, cursor=None, **filters):
+    pipeline = build_search_pipeline(query, limit=limit, after=decode_cursor(cursor) if cursor else None, **filters)
+    articles = list(collection.aggregate(pipeline))
+    if len(articles) > limit:
+        return articles[:limit], encode_cursor(articles[limit - 1]["score"], articles[limit - 1]["_id"])
+    return articles, None
+
+
+def regex_page(collection, query: str, limit: int):
+    pattern = {"$regex": query, "$options": "i"}
+    return list(collection.find({"$or": [{"title": pattern}, {"text": pattern}]}, ARTICLE_RESPONSE_PROJECTION).limit(limit))
+
+
+def main(args):
+    client = MongoClient(args.mongodb_url or settings.MONGODB_URL)
+    collection = client[args.database].articles
+    
+    if args.rebuild or collection.estimated_document_count() < args.docs:
+        collection.drop()
+        populate(collection, args.docs)
+    
+    _, cursor = text_page(collection, "monsoon", args.limit)
+    date_from = datetime(2024, 6, 1)
+    date_to = datetime(2024, 9, 1)
+    
+    cases = {
+        "text": lambda: text_page(collection, "monsoon", args.limit),
+        "text, next page": lambda: text_page(collection, "monsoon", args.limit, cursor),
+        "text + date/source filters": lambda: text_page(
+            collection, "monsoon", args.limit,
+            date_from=date_from, date_to=date_to, sources=SOURCES[:5]
+        ),
+        "text, rare term": lambda: text_page(collection, "word19999", args.limit),
+    }
+    if not args.skip_regex:
+        cases["old $regex, rare term"] = lambda: regex_page(collection, "word19999", args.limit)
+    
+    print(f"{args.docs} articles, page size {args.limit}, {args.runs} runs per case")
+    for name, func in cases.items():
+        func()  # warm up
+        p50, p95 = timed(args.runs, func)
+        print(f"  {name:<28} p50 {p50:8.1f} ms   p95 {p95:8.1f} ms")
+    
+    plan = client[args.database].command(
+        "explain",
+        {"aggregate": "articles", "pipeline": build_search_pipeline("monsoon", limit=args.limit), "cursor": {}},
+        verbosity="queryPlanner"
+    )
+    print("Text search uses index:", "article_text_search" in str(plan))
+    
+    if args.drop:
+        client.drop_database(args.database)
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark POST /search against a synthetic article collection")
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--mongodb-url", default=None)
+    parser.add_argument("--database", default="newsprism_search_bench")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate the collection even if it exists")
+    parser.add_argument("--skip-regex", action="store_true", help="skip the (slow) $regex baseline")
+    parser.add_argument("--drop", action="store_true", help="drop the scratch database afterwards")
+    args = parser.parse_args()
+    
+    main(args)
@@ -0,0 +1,61 @@
+import asyncio
+import random
+import pytest
+from bson import ObjectId
+from app.services.ingestion.dedup import MinHasher, DuplicateDetector, duplicate_group_key, MAX_HASH
+
+
+def wire_story(seed, words=300):
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def test_wire_copies_share_a_band_and_unrelated_text_does_not():
+    minhasher = MinHasher(num_perm=128, bands=16)
+    story = wire_story(1)
+    copy = "NEW DELHI (Reuters) - " + story + " Reporting by Staff; editing by Desk"
+    unrelated = wire_story(2)
+    
+    story_sig, copy_sig, unrelated_sig = (minhasher.signature(t) for t in (story, copy, unrelated))
+    
+    assert minhasher.similarity(story_sig, copy_sig) >= 0.8
+    assert set(minhasher.band_keys(story_sig)) & set(minhasher.band_keys(copy_sig))
+    assert minhasher.similarity(story_sig, unrelated_sig) < 0.1
+    assert not set(minhasher.band_keys(story_sig)) & set(minhasher.band_keys(unrelated_sig))
+
+
+def test_signatures_stay_in_32_bits_and_are_deterministic():
+    text = wire_story(3)
+    signature = MinHasher(num_perm=128, bands=16).signature(text)
+    
+    assert signature.dtype.name == "uint32" and signature.shape == (128,)
+    assert int(signature.max()) <= MAX_HASH
+    assert (MinHasher(num_perm=128, bands=16).signature(text) == signature).all()
+    assert (MinHasher.from_binary(MinHasher.to_binary(signature)) == signature).all()
+
+
+def test_signature_of_empty_text():
+    assert MinHasher(num_perm=128, bands=16).signature("  ...  ") is None
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        MinHasher(num_perm=100, bands=16)
+
+
+def test_short_articles_are_never_duplicates():
+    detector = DuplicateDetector(MinHasher(num_perm=128, bands=16))
+    
+    assert asyncio.run(detector.find_canonical("a1", "Too short to judge.")) is None
+
+
+def test_duplicate_group_key_is_stable():
+    original_id = ObjectId()
+    original = {"_id": original_id, "url": "https://a.example/story"}
+    copy = {"id": str(ObjectId()), "duplicate_of": str(original_id)}
+    
+    assert duplicate_group_key(original) == str(original_id)
+    assert duplicate_group_key(copy) == str(original_id)
+    assert duplicate_group_key({"id": str(original_id)}) == duplicate_group_key(original)
+    assert duplicate_group_key(dict(original)) == duplicate_group_key(original)
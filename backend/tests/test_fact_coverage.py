@@ -0,0 +1,84 @@
+import numpy as np
+from app.services.facts.coverage import FactCoverageMatrix
+
+
+def matrix(states, sources=None):
+    states = np.array(states)
+    facts = [{"fact": f"fact {i}"} for i in range(states.shape[0])]
+    sources = sources or [f"S{j}" for j in range(states.shape[1])]
+    articles = [{"url": f"https://{s.lower()}.example/{j}", "source": s} for j, s in enumerate(sources)]
+    return FactCoverageMatrix(facts, articles, states)
+
+
+def test_omission_scores():
+    coverage = matrix([
+        [1, 1, -1, 0],
+        [1, -1, 0, 0],
+        [0, 0, 0, 0],
+    ])
+    
+    assert np.allclose(coverage.omission_scores(), [1 / 3, 1 / 3, 2 / 3, 1.0])
+    assert [f["fact"] for f in coverage.missing_facts(2)] == ["fact 1", "fact 2"]
+
+
+def test_omission_scores_without_facts():
+    coverage = FactCoverageMatrix([], [{"source": "A"}, {"source": "B"}], np.zeros((0, 2)))
+    
+    assert coverage.omission_scores().tolist() == [0.0, 0.0]
+
+
+def test_majority_is_zero_on_a_tie():
+    coverage = matrix([
+        [1, 1, -1, 0],
+        [1, -1, 0, 0],
+        [-1, -1, 1, 0],
+        [0, 0, 0, 0],
+    ])
+    
+    assert coverage.majority().tolist() == [1, 0, -1, 0]
+
+
+def test_consistency_ignores_ties_and_uncovered_facts():
+    coverage = matrix([
+        [1, 1, -1, 0],
+        [1, -1, 0, 0],
+        [1, 1, 1, -1],
+    ])
+    
+    # Fact 1 is a tie and does not count; article 2 disagrees on fact 0, article 3 on fact 2
+    assert np.allclose(coverage.consistency_scores(), [0.0, 0.0, 0.5, 1.0])
+
+
+def test_from_presence_marks_contradicting_urls_and_sources():
+    facts = [
+        {"fact": "a", "contradicting_sources": ["https://b.example/1"]},
+        {"fact": "b", "contradicting_sources": ["C", "B"]},
+        {"fact": "c"},
+    ]
+    articles = [
+        {"url": "https://a.example/0", "source": "A"},
+        {"url": "https://b.example/1", "source": "B"},
+        {"url": "https://c.example/2", "source": "C"},
+    ]
+    presence = np.array([
+        [True, True, True],
+        [True, False, True],
+        [False, True, False],
+    ])
+    
+    coverage = FactCoverageMatrix.from_presence(facts, articles, presence)
+    
+    assert coverage.states.tolist() == [[1, -1, 1], [1, 0, -1], [0, 1, 0]]
+
+
+def test_heatmap_merges_articles_by_source():
+    coverage = matrix([
+        [1, -1, 0],
+        [-1, 0, 1],
+        [0, 0, -1],
+    ], sources=["A", "A", "B"])
+    
+    heatmap = coverage.heatmap()
+    
+    assert heatmap["sources"] == ["A", "B"]
+    assert heatmap["states"] == [[1, 0], [-1, 1], [0, -1]]
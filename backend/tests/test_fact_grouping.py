@@ -0,0 +1,45 @@
+import numpy as np
+from app.services.facts.grouping import group_by_keywords, group_by_embedding, largest_first
+
+
+def keywords(text):
+    return {w.strip(".,").lower() for w in text.split() if len(w) > 3}
+
+
+def test_unrelated_sentences_stay_apart():
+    sentences = [
+        "Minister announced fuel subsidy cuts Monday",
+        "Minister announced fuel subsidy cuts Monday evening",
+        "Flooding closed Mumbai railway stations Monday",
+        "Cricket board announced squad changes Monday",
+        "Monsoon rainfall flooding closed airport runways",
+    ]
+    groups = group_by_keywords([keywords(s) for s in sentences], min_jaccard=0.5, max_postings=50)
+    
+    assert sorted(map(sorted, groups)) == [[0, 1], [2], [3], [4]]
+
+
+def test_overlap_chains_do_not_merge_groups():
+    # Each sentence shares half its keywords with the next, so single linkage would chain them all
+    sentences = [{f"word{i}", f"word{i + 1}", f"word{i + 2}", f"word{i + 3}"} for i in range(0, 40, 2)]
+    groups = group_by_keywords(sentences, min_jaccard=0.5, max_postings=50)
+    
+    assert max(len(members) for members in groups) <= 2
+
+
+def test_zipf_vocabulary_does_not_collapse_into_one_group():
+    rng = np.random.RandomState(0)
+    vocabulary = np.array([f"term{i}" for i in range(5000)])
+    sentences = [set(vocabulary[np.minimum(rng.zipf(1.3, size=12), 5000) - 1]) for _ in range(2000)]
+    groups = group_by_keywords(sentences, min_jaccard=0.5, max_postings=200)
+    
+    assert max(len(members) for members in groups) < 100
+
+
+def test_embedding_groups_compare_with_seed():
+    angles = np.radians([0, 30, 60, 90])
+    embeddings = np.stack([np.cos(angles), np.sin(angles)], axis=1).astype(np.float32)
+    groups = group_by_embedding(embeddings, threshold=0.8)
+    
+    # 30 degrees from the first seed joins it; 60 degrees does not, even though it is 30 from the second fact
+    assert largest_first(groups) == [[0, 1], [2, 3]]
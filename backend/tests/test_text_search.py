@@ -0,0 +1,81 @@
+import asyncio
+import base64
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routes import search as search_routes
+from app.models.article import ARTICLE_RESPONSE_PROJECTION
+from app.services.search.text_search import build_search_pipeline, decode_cursor, encode_cursor, search_articles
+
+
+def test_cursor_round_trip():
+    article_id = ObjectId()
+    cursor = encode_cursor(1.375, article_id)
+    
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert decode_cursor(cursor) == (1.375, article_id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'{"s": 1.0}').decode(),
+    base64.urlsafe_b64encode(b'{"s": 1.0, "id": "nope"}').decode(),
+    base64.urlsafe_b64encode(b'{"s": "high", "id": "5f43a1b2c3d4e5f601234567"}').decode(),
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_pipeline_first_page():
+    pipeline = build_search_pipeline("monsoon flooding", limit=20)
+    
+    assert pipeline == [
+        {"$match": {"$text": {"$search": "monsoon flooding"}}},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+        {"$sort": {"score": -1, "_id": -1}},
+        {"$limit": 21},
+        {"$project": ARTICLE_RESPONSE_PROJECTION}
+    ]
+
+
+def test_pipeline_filters_stay_in_the_text_match():
+    date_from, date_to = datetime(2024, 6, 1), datetime(2024, 9, 1)
+    pipeline = build_search_pipeline("monsoon", date_from=date_from, date_to=date_to, sources=["A", "B"])
+    
+    assert pipeline[0] == {"$match": {
+        "$text": {"$search": "monsoon"},
+        "published_at": {"$gte": date_from, "$lte": date_to},
+        "source": {"$in": ["A", "B"]}
+    }}
+
+
+def test_pipeline_resumes_strictly_after_score_and_id():
+    last_id = ObjectId()
+    pipeline = build_search_pipeline("monsoon", limit=10, after=(2.5, last_id))
+    
+    assert pipeline[2] == {"$match": {"$or": [
+        {"score": {"$lt": 2.5}},
+        {"score": 2.5, "_id": {"$lt": last_id}}
+    ]}}
+    assert pipeline[3] == {"$sort": {"score": -1, "_id": -1}}
+    assert pipeline[4] == {"$limit": 11}
+
+
+def test_blank_query_returns_an_empty_page():
+    assert asyncio.run(search_articles("   ")) == ([], None)
+
+
+def test_malformed_cursor_is_a_400():
+    app = FastAPI()
+    app.include_router(search_routes.router)
+    client = TestClient(app)
+    
+    response = client.post("/search", json={"query": "monsoon", "cursor": "not a cursor!"})
+    
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
@@ -0,0 +1,102 @@
+import asyncio
+from app.core.config import settings
+from app.services.facts.fact_extractor import FactExtractor
+from app.services.facts.verification import format_fact_item, pack_fact_groups, parse_batch_response
+from app.services.llm.client import estimate_tokens
+
+
+def fact_group(i, sources=1, length=40):
+    return [
+        {"fact": f"Fact {i} " + "x" * length, "source_url": f"https://s{j}.example/{i}", "source_name": f"S{j}"}
+        for j in range(sources)
+    ]
+
+
+class ScriptedLLM:
+    """Answers batched prompts with a fixed reply and single-fact prompts with STATUS B"""
+    
+    def __init__(self, batch_reply, single_delay=0.0):
+        self.batch_reply = batch_reply
+        self.single_delay = single_delay
+        self.batch_calls = 0
+        self.single_calls = 0
+    
+    async def chat(self, messages, max_tokens=1000, temperature=0.1, stage="other"):
+        if "JSON array" in messages[-1]["content"]:
+            self.batch_calls += 1
+            return self.batch_reply
+        self.single_calls += 1
+        await asyncio.sleep(self.single_delay)
+        return "STATUS: B\nJUSTIFICATION: sources disagree\nQUOTES: none\nCONTRADICTING: NONE"
+
+
+def verify_with(llm, fact_groups, timeout, monkeypatch):
+    monkeypatch.setattr(settings, "FACT_VERIFY_MODE", "batched")
+    monkeypatch.setattr(settings, "FACT_VERIFY_BATCH_SIZE", 10)
+    monkeypatch.setattr(settings, "FACT_VERIFY_TIMEOUT", timeout)
+    extractor = FactExtractor.__new__(FactExtractor)
+    extractor.llm = llm
+    return asyncio.run(extractor._verify_facts_with_llm(fact_groups, []))
+
+
+def test_pack_fact_groups_respects_budget_and_item_cap():
+    groups = [fact_group(i) for i in range(7)]
+    item_tokens = estimate_tokens(format_fact_item(1, groups[0]))
+    
+    assert pack_fact_groups(groups, token_budget=item_tokens * 3, max_items=10) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert pack_fact_groups(groups, token_budget=10 ** 6, max_items=2) == [[0, 1], [2, 3], [4, 5], [6]]
+    assert pack_fact_groups([], token_budget=100, max_items=2) == []
+
+
+def test_pack_fact_groups_gives_oversized_group_its_own_batch():
+    groups = [fact_group(0), fact_group(1, sources=5, length=2000), fact_group(2)]
+    item_tokens = estimate_tokens(format_fact_item(1, groups[0]))
+    
+    assert pack_fact_groups(groups, token_budget=item_tokens * 2, max_items=10) == [[0], [1], [2]]
+
+
+def test_parse_batch_response_skips_prose_fences_and_stray_brackets():
+    content = (
+        'Reviewing facts [1] and [2]:\n'
+        '```json\n'
+        '[{"id": 1, "status": "A", "justification": "stated"},\n'
+        ' {"id": 2, "status": "contradicted", "contradicting": ["https://b.example"]}]\n'
+        '```\n'
+        'See [1] above.'
+    )
+    items = parse_batch_response(content, expected=2)
+    
+    assert sorted(items) == [1, 2]
+    assert items[1].status == "supported"
+    assert items[2].status == "contradicted"
+    assert items[2].contradicting == ["https://b.example"]
+
+
+def test_parse_batch_response_drops_malformed_and_out_of_range_items():
+    content = '[{"id": 1, "status": "Z"}, {"id": 2, "status": "C"}, {"id": 9, "status": "A"}, {"status": "A"}, 3]'
+    items = parse_batch_response(content, expected=3)
+    
+    assert list(items) == [2]
+    assert items[2].status == "unverified"
+
+
+def test_parse_batch_response_without_an_array():
+    assert parse_batch_response("I could not verify these facts.", expected=2) == {}
+    assert parse_batch_response('[1] [2] {"id": 1, "status": "A"}', expected=2) == {}
+    assert parse_batch_response('[{"id": 1, "status": "A"}', expected=2) == {}
+
+
+def test_dropped_items_are_re_asked_individually(monkeypatch):
+    llm = ScriptedLLM('Here you go [1]: [{"id": 1, "status": "A"}, {"id": 3, "status": "C"}]')
+    results = verify_with(llm, [fact_group(i) for i in range(3)], timeout=5, monkeypatch=monkeypatch)
+    
+    assert [r["status"] for r in results] == ["supported", "contradicted", "unverified"]
+    assert (llm.batch_calls, llm.single_calls) == (1, 1)
+
+
+def test_re_ask_timeout_keeps_batched_answers(monkeypatch):
+    llm = ScriptedLLM('[{"id": 1, "status": "A"}, {"id": 2, "status": "B"}]', single_delay=5)
+    results = verify_with(llm, [fact_group(i) for i in range(3)], timeout=0.2, monkeypatch=monkeypatch)
+    
+    assert [r["status"] for r in results] == ["supported", "contradicted", "unverified"]
+    assert llm.single_calls == 1
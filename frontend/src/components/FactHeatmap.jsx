@@ -1,30 +1,35 @@
 import React from 'react'
 
-function FactHeatmap({ facts, articles }) {
+function FactHeatmap({ facts, articles, coverage }) {
   if (!facts || facts.length === 0 || !articles || articles.length === 0) {
     return (
       <p className="text-sm text-gray-500">No data available for heatmap.</p>
     )
   }
 
-  // Create a matrix: facts (rows) x articles (columns)
-  const sources = [...new Set(articles.map(a => a.source))]
+  // Fact x source states from the backend coverage matrix: 1 present, -1 contradicted, 0 omitted
+  const sources = coverage?.sources || [...new Set(articles.map(a => a.source))]
   
-  // Check which facts are present in which articles
-  const matrix = facts.map(fact => {
+  const matrix = coverage?.states || facts.map(fact => {
     const factText = fact.fact?.toLowerCase() || ''
     return sources.map(source => {
       const article = articles.find(a => a.source === source)
-      if (!article) return false
+      if (!article) return 0
       
-      // Simple keyword matching (in production, use semantic similarity)
+      // Simple keyword matching for clusters analyzed before coverage was stored
       const factKeywords = factText.split(' ').filter(w => w.length > 3)
       const articleText = article.text?.toLowerCase() || ''
       
-      return factKeywords.some(keyword => articleText.includes(keyword))
+      return factKeywords.some(keyword => articleText.includes(keyword)) ? 1 : 0
     })
   })
 
+  const cellStyles = {
+    1: { className: 'bg-green-200', title: 'Fact present', symbol: '✓' },
+    0: { className: 'bg-red-100', title: 'Fact omitted', symbol: '✗' },
+    '-1': { className: 'bg-yellow-200', title: 'Fact contradicted', symbol: '!' },
+  }
+
   return (
     <div className="overflow-x-auto">
       <table className="min-w-full border-collapse">
@@ -53,18 +58,14 @@ function FactHeatmap({ facts, articles }) {
                 </div>
               </td>
               {sources.map((source, sourceIdx) => {
-                const isPresent = matrix[factIdx]?.[sourceIdx]
+                const cell = cellStyles[matrix[factIdx]?.[sourceIdx] ?? 0]
                 return (
                   <td
                     key={sourceIdx}
-                    className={`border p-2 text-center ${
-                      isPresent
-                        ? 'bg-green-200'
-                        : 'bg-red-100'
-                    }`}
-                    title={isPresent ? 'Fact present' : 'Fact omitted'}
+                    className={`border p-2 text-center ${cell.className}`}
+                    title={cell.title}
                   >
-                    {isPresent ? '✓' : '✗'}
+                    {cell.symbol}
                   </td>
                 )
               })}
@@ -81,6 +82,10 @@ function FactHeatmap({ facts, articles }) {
           <div className="w-4 h-4 bg-red-100 mr-2"></div>
           <span>Fact Omitted</span>
         </div>
+        <div className="flex items-center">
+          <div className="w-4 h-4 bg-yellow-200 mr-2"></div>
+          <span>Fact Contradicted</span>
+        </div>
       </div>
     </div>
   )
@@ -82,7 +82,7 @@ function ClusterDetailPage() {
       {cluster.facts && cluster.facts.length > 0 && (
         <div className="bg-white rounded-lg shadow p-6">
           <h3 className="text-lg font-semibold mb-4">Fact Coverage Heatmap</h3>
-          <FactHeatmap facts={cluster.facts} articles={cluster.articles} />
+          <FactHeatmap facts={cluster.facts} articles={cluster.articles} coverage={cluster.coverage} />
         </div>
       )}
 